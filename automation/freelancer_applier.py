@@ -1,12 +1,17 @@
-from selenium import webdriver
+import os
+import sys
+# Project root on sys.path, so the scrapers package resolves when this file is run directly
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 import time
 import logging
+from scrapers.browser_pool import chrome_factory, get_pool
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, 
@@ -15,11 +20,10 @@ logging.basicConfig(level=logging.INFO,
 logger = logging.getLogger(__name__)
 
 def apply_to_freelancer_job(job_link, resume_path, labels, freelancer_email, freelancer_password, debug_mode=False):
-    # Configure Chrome options
-    chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
-    chrome_options.add_argument("--disable-notifications")
-    driver = webdriver.Chrome(options=chrome_options)
+    # Lease a warm Chrome instead of starting one per application
+    pool = get_pool('apply:freelancer', size=1,
+                    factory=chrome_factory(headless=False, extra_args=("--start-maximized", "--disable-notifications")))
+    driver = pool.acquire()
     try:
         logger.info(f"Starting application process for {job_link}")
         driver.get("https://www.freelancer.com/login")
@@ -191,8 +195,8 @@ def apply_to_freelancer_job(job_link, resume_path, labels, freelancer_email, fre
         return False, str(e)
     finally:
         time.sleep(1)
-        driver.quit()
-        logger.info("Driver closed")
+        pool.release(driver)
+        logger.info("Driver returned to the pool")
 
 if __name__ == "__main__":
     import argparse
@@ -1,10 +1,17 @@
-from selenium import webdriver
+import os
+import sys
+# Project root on sys.path, so the scrapers package resolves when this file is run directly
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 import time
+from scrapers.browser_pool import chrome_factory, get_pool
 
 def apply_to_wuzzuf_job(job_link, resume_path, labels, wuzzuf_email, wuzzuf_password):
-    driver = webdriver.Chrome()
+    pool = get_pool('apply:wuzzuf', factory=chrome_factory(headless=False), size=1)
+    driver = pool.acquire()
     try:
         # 1. Log in to Wuzzuf
         driver.get("https://wuzzuf.net/login")
@@ -54,4 +61,4 @@ def apply_to_wuzzuf_job(job_link, resume_path, labels, wuzzuf_email, wuzzuf_pass
     except Exception as e:
         return False, str(e)
     finally:
-        driver.quit() 
\ No newline at end of file
+        pool.release(driver) 
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+DOM extraction benchmark: per-element WebDriver calls vs one execute_script.
+
+Loads pages into headless Chrome and extracts them both ways, counting the
+WebDriver commands each path sends and timing it:
+
+- Upwork feed: the scraper's old path (feed .text plus get_attribute('href') on
+  every /jobs/ link, up to four times each) against dom_extract.extract_feed
+- listing cards: find_element/.text/get_attribute per field of every card against
+  dom_extract.extract_cards on the source's CardSpec
+
+Upwork pages come from archives recorded with CRAWL_RECORD (the scraper records
+each loaded feed); without any, a synthetic feed shaped like the real one is used.
+The listing pages are synthetic LinkedIn and RemoteOK pages from bench_parse.
+Both paths must extract the same values. Needs Chrome; exits with a note without it.
+
+Usage: python benchmarks/bench_dom_extract.py [archive ...] [--posts 50] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.bench_parse import SYNTHETIC_CARDS, page, words
+from scrapers import dom_extract
+from scrapers.browser_pool import chrome_factory
+from scrapers.replay import read_archive
+
+
+class RoundTrips:
+    """Counts the commands a driver sends to chromedriver; element calls go through driver.execute too."""
+
+    def __init__(self, driver):
+        self.count = 0
+        execute = driver.execute
+
+        def counted(*args, **kwargs):
+            self.count += 1
+            return execute(*args, **kwargs)
+        driver.execute = counted
+
+
+def synthetic_feed(posts, rng):
+    """A page whose feed sits at the Upwork FEED_XPATH, with a skill link per post like the real tiles."""
+    tiles = ''.join(
+        f'<section><h2><a href="https://www.upwork.com/jobs/~01{i:08d}/?referrer=feed">{words(rng, 5)}</a></h2>'
+        f'<p>Posted {i % 12 + 1} hours ago</p><p>{words(rng, 60)}</p>'
+        f'<a href="/nx/search/jobs/?ontology_skill_uid={i}">python</a></section>'
+        for i in range(posts))
+    feed = f'<div></div><div></div><div></div><div>Ordered by most relevant.{tiles}</div>'
+    return ('<html><body><div></div><div></div><div></div>'
+            f'<div><div><div><div><main><div></div><div></div><div>{feed}</div></main></div></div></div></div>'
+            '</body></html>')
+
+
+def per_element_feed(driver, feed_xpath):
+    """What UpworkScraper did before: one request for the text, up to four per link."""
+    text = driver.find_elements('xpath', feed_xpath)[-1].text
+    job_links = driver.find_elements('xpath', "//a[contains(@href, '/jobs/')]")
+    job_urls = [link.get_attribute('href') for link in job_links
+                if 'ontology_skill_uid' not in link.get_attribute('href')
+                and 'search/saved' not in link.get_attribute('href')
+                and 'search/jobs/saved' not in link.get_attribute('href')]
+    return text, job_urls
+
+
+def bulk_feed(driver, feed_xpath, link_selector, job_urls):
+    feed = dom_extract.extract_feed(driver, feed_xpath, link_selector)
+    return feed['text'], job_urls(feed['links'])
+
+
+def per_element_cards(driver, spec):
+    cards = []
+    for element in driver.find_elements('css selector', spec.card_selector):
+        card = {}
+        for name, field in spec.fields.items():
+            matches = element.find_elements('css selector', field.selector) if field.selector else [element]
+            values = [m.get_dom_attribute(field.attr) if field.attr else m.text.strip() for m in matches]
+            if field.many:
+                card[name] = values
+            else:
+                card[name] = (values[0] if values else None) or field.default
+        cards.append(card)
+    return cards
+
+
+def measure(counter, fn, repeat):
+    times = []
+    for _ in range(repeat):
+        before = counter.count
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+        trips = counter.count - before
+    return result, trips, statistics.median(times) * 1000
+
+
+def load(driver, tmp, name, html):
+    path = os.path.join(tmp, f'{name}.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    driver.get(f'file://{path}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archives', nargs='*', help='archives with recorded Upwork feeds')
+    parser.add_argument('--posts', type=int, default=50, help='posts in the synthetic Upwork feed')
+    parser.add_argument('--cards', type=int, default=25, help='cards per synthetic listing page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        driver = chrome_factory(headless=True)()
+    except Exception as e:
+        print(f"Skipped: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+        return
+    counter = RoundTrips(driver)
+
+    rng = random.Random(7)
+    try:
+        from scrapers.upwork import FEED_XPATH, JOB_LINK_SELECTOR, job_urls
+        feeds = [(entry['url'], entry['body']) for archive in args.archives
+                 for entry in read_archive(archive) if entry['source'] == 'Upwork' and entry['kind'] == 'feed']
+        if not feeds:
+            feeds = [('synthetic feed', synthetic_feed(args.posts, rng))]
+    except ImportError as e:
+        print(f"Upwork feeds skipped: {e}")
+        feeds = []
+    from scrapers.linkedin import CARDS as LINKEDIN_CARDS
+    from scrapers.remoteok import CARDS as REMOTEOK_CARDS
+    listings = []
+    for source, spec in (('LinkedIn', LINKEDIN_CARDS), ('RemoteOK', REMOTEOK_CARDS)):
+        cards = ''.join(SYNTHETIC_CARDS[source](i, rng) for i in range(args.cards))
+        listings.append((source, spec, page(f'<table>{cards}</table>' if source == 'RemoteOK' else cards, rng)))
+
+    print(f"{'page':34} {'path':14} {'round trips':>12} {'ms':>9}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, (name, html) in enumerate(feeds):
+                load(driver, tmp, f'feed{i}', html)
+                old, old_trips, old_ms = measure(counter, lambda: per_element_feed(driver, FEED_XPATH), args.repeat)
+                new, new_trips, new_ms = measure(
+                    counter, lambda: bulk_feed(driver, FEED_XPATH, JOB_LINK_SELECTOR, job_urls), args.repeat)
+                label = f"Upwork {name}"[:34]
+                print(f"{label:34} {'per element':14} {old_trips:12} {old_ms:9.1f}")
+                print(f"{'':34} {'one script':14} {new_trips:12} {new_ms:9.1f}   {len(new[1])} job links")
+                # Selenium's .text and innerText may differ in whitespace; the posts and links must match
+                if old[1] != new[1] or old[0].count('Posted') != new[0].count('Posted'):
+                    print(f"{'':34} WARNING: the two paths extracted different feeds")
+            for source, spec, html in listings:
+                load(driver, tmp, source, html)
+                old, old_trips, old_ms = measure(counter, lambda: per_element_cards(driver, spec), args.repeat)
+                new, new_trips, new_ms = measure(counter, lambda: dom_extract.extract_cards(driver, spec), args.repeat)
+                print(f"{source + ' listing':34} {'per element':14} {old_trips:12} {old_ms:9.1f}")
+                print(f"{'':34} {'one script':14} {new_trips:12} {new_ms:9.1f}   {len(new)} cards")
+                if old != new:
+                    print(f"{'':34} WARNING: the two paths extracted different cards")
+    finally:
+        driver.quit()
+
+
+if __name__ == '__main__':
+    main()
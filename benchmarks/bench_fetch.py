@@ -0,0 +1,166 @@
+"""
+Fetch benchmark: the pooled HTTP engine vs headless Chrome on the same pages.
+
+Pages are served from a local gzip-capable HTTP server so only the fetch path is
+measured, not the network. They are read from --pages (a directory of recorded
+.html files) or generated as RemoteOK-style listing tables. For each path the
+benchmark reports pages/sec and the resident memory it adds, counting
+chromedriver and Chrome child processes for the browser path. The browser path
+is skipped with a note when Chrome cannot be started.
+
+Usage: python benchmarks/bench_fetch.py [--pages DIR] [--count 200] [--workers 4]
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import gzip
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from scrapers.fetch import BrowserFetcher, http_get
+from scrapers.remoteok import RemoteOKScraper
+
+
+def synthetic_page(page, rows=50):
+    jobs = ''.join(
+        f'<tr class="job" data-href="/remote-jobs/{page}-{i}"><td><h2>Engineer {page}-{i}</h2><h3>Company {i}</h3></td>'
+        f'<td class="description">{"Build and maintain services. " * 20}</td></tr>'
+        for i in range(rows)
+    )
+    return f'<html><head><title>page {page}</title></head><body><table>{jobs}</table></body></html>'
+
+
+def load_pages(pages_dir, count):
+    if pages_dir:
+        paths = sorted(glob.glob(os.path.join(pages_dir, '*.html')))
+        if not paths:
+            raise SystemExit(f"No .html files in {pages_dir}")
+        bodies = [open(path, encoding='utf-8', errors='replace').read() for path in paths]
+    else:
+        bodies = [synthetic_page(i) for i in range(20)]
+    return [bodies[i % len(bodies)].encode() for i in range(count)]
+
+
+def serve(pages):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this keep-alive requests stall on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            body = pages[int(self.path.rsplit('/', 1)[-1]) % len(pages)]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body = gzip.compress(body, 5)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def descendants(pid):
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def tree_rss_mb():
+    pid = os.getpid()
+    return sum(rss_kb(p) for p in [pid] + descendants(pid)) / 1024
+
+
+def bench_http(urls, workers):
+    parser = RemoteOKScraper(storage=None)
+    before = tree_rss_mb()
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = sum(executor.map(lambda url: len(parser.parse_page(http_get(url).text)), urls))
+    elapsed = time.perf_counter() - start
+    return len(urls) / elapsed, tree_rss_mb() - before, jobs
+
+
+def bench_browser(urls):
+    parser = RemoteOKScraper(storage=None)
+    before = tree_rss_mb()
+    browser = BrowserFetcher()
+    try:
+        start = time.perf_counter()
+        jobs = 0
+        peak = 0.0
+        for url in urls:
+            jobs += len(parser.parse_page(browser.fetch(url)))
+            peak = max(peak, tree_rss_mb())
+        elapsed = time.perf_counter() - start
+    finally:
+        browser.close()
+    return len(urls) / elapsed, peak - before, jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', help='directory of recorded .html pages (default: synthetic listings)')
+    parser.add_argument('--count', type=int, default=200, help='pages fetched per path')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent HTTP fetches')
+    parser.add_argument('--browser-count', type=int, default=20, help='pages fetched by the browser path')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.count)
+    server = serve(pages)
+    base = f'http://127.0.0.1:{server.server_address[1]}/page/'
+    urls = [f'{base}{i}' for i in range(args.count)]
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.0f} KB average")
+
+    print(f"\n{'path':24} {'pages/s':>9} {'RSS +MB':>9} {'jobs':>7}")
+    rate, rss, jobs = bench_http(urls, 1)
+    print(f"{'http, 1 worker':24} {rate:9.1f} {rss:9.1f} {jobs:7}")
+    rate, rss, jobs = bench_http(urls, args.workers)
+    print(f"{f'http, {args.workers} workers':24} {rate:9.1f} {rss:9.1f} {jobs:7}")
+    try:
+        rate, rss, jobs = bench_browser(urls[:args.browser_count])
+        print(f"{'headless chrome':24} {rate:9.1f} {rss:9.1f} {jobs:7}")
+    except Exception as e:
+        print(f"{'headless chrome':24} skipped: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Query plans and latencies for the app's queries before and after the index migration.
+
+Builds a synthetic jobs table at schema version 1 (no query indexes), times the
+queries issued by analytics.py, job_search.py, applications.py and crawler.py,
+applies the remaining migrations and times them again.
+
+Usage: python benchmarks/bench_indexes.py [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from migrations import migrate
+
+SOURCES = ['LinkedIn', 'Freelancer', 'Wuzzuf', 'RemoteOK', 'WeWorkRemotely', 'Upwork', 'PeoplePerHour']
+USER = 'bench-user'
+
+QUERIES = [
+    ('analytics: total', "SELECT COUNT(*) FROM jobs", ()),
+    ('analytics: by source', "SELECT source, COUNT(*) as count FROM jobs GROUP BY source", ()),
+    ('analytics: by title', "SELECT title, COUNT(*) as count FROM jobs GROUP BY title ORDER BY count DESC LIMIT 10", ()),
+    ('job_search: saved ids', "SELECT job_id FROM saved_jobs WHERE user = ?", (USER,)),
+    ('saved_jobs: join', "SELECT jobs.* FROM jobs JOIN saved_jobs ON jobs.id = saved_jobs.job_id WHERE saved_jobs.user = ?", (USER,)),
+    ('applications: newest', "SELECT id, title, company, location, link, source, timestamp FROM jobs ORDER BY posted_at DESC LIMIT 100", ()),
+    ('crawler: per source', "SELECT * FROM jobs WHERE source = ? ORDER BY posted_at DESC LIMIT 10", ('Wuzzuf',)),
+    ('job_search: date range', "SELECT COUNT(*) FROM jobs WHERE posted_at BETWEEN ? AND ?", (1740000000, 1741000000)),
+    ('crawler: duplicates', "SELECT link, COUNT(*) as count FROM jobs GROUP BY link HAVING count > 1", ()),
+]
+
+
+def build(db_name, rows):
+    conn = sqlite3.connect(db_name)
+    migrate(conn, target=1)
+    # Later migrations add posted_at/scraped_at; create them up front so the unindexed
+    # table can be queried the same way (the migration only backfills NULLs)
+    conn.execute('ALTER TABLE jobs ADD COLUMN posted_at INTEGER')
+    conn.execute('ALTER TABLE jobs ADD COLUMN scraped_at INTEGER')
+    conn.execute("CREATE TABLE IF NOT EXISTS saved_jobs (user TEXT, job_id TEXT, PRIMARY KEY (user, job_id))")
+    start = datetime(2025, 1, 1)
+    rng = random.Random(42)
+
+    def generate():
+        for i in range(rows):
+            posted = start + timedelta(seconds=rng.randrange(0, 300 * 86400))
+            # Mix both timestamp formats found in the real table
+            timestamp = posted.isoformat(sep='T' if i % 2 else ' ')
+            link = f'https://example.com/jobs/{i}'
+            yield (str(uuid.uuid4()), f'Engineer {rng.randrange(5000)}', 'Build services. ' * 20, link,
+                   f'Company {rng.randrange(20000)}', rng.choice(SOURCES), timestamp, 'Remote',
+                   link, timestamp, int(posted.timestamp()), int(posted.timestamp()))
+
+    with conn:
+        conn.executemany('INSERT INTO jobs (id, title, description, link, company, source, timestamp, location, '
+                         'link_key, last_seen, posted_at, scraped_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', generate())
+        # 50 users with a handful of saved jobs each
+        conn.execute("INSERT INTO saved_jobs SELECT 'user-' || (rowid % 50), id FROM jobs WHERE rowid % 997 = 0")
+        conn.execute("INSERT INTO saved_jobs SELECT ?, id FROM jobs WHERE rowid % 20000 = 0", (USER,))
+    return conn
+
+
+def measure(conn, repeat):
+    results = {}
+    for name, sql, params in QUERIES:
+        plan = ' | '.join(row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params))
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - start)
+        results[name] = (plan, best * 1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.rows} synthetic jobs...")
+        conn = build(os.path.join(tmp, 'bench.db'), args.rows)
+        before = measure(conn, args.repeat)
+        start = time.perf_counter()
+        migrate(conn)
+        print(f"Migrations applied in {time.perf_counter() - start:.1f}s\n")
+        after = measure(conn, args.repeat)
+        conn.close()
+
+    for name, _, _ in QUERIES:
+        print(f"{name}: {before[name][1]:.1f} ms -> {after[name][1]:.1f} ms")
+        print(f"    before: {before[name][0]}")
+        print(f"    after:  {after[name][0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Parser throughput suite: replays recorded pages through each scraper's parse functions.
+
+Reads one or more archives recorded with CRAWL_RECORD (see scrapers/replay.py);
+without any, it builds a synthetic archive with listing pages shaped like each
+board's markup. For every source it reports pages, jobs extracted, ms/page and
+cards/sec. With a baseline (written by --save-baseline) it exits non-zero when a
+source extracts a different number of jobs or parses more than --tolerance
+slower than the baseline. Each source's passes are interleaved with passes of
+a fixed calibration parse and compared as cost relative to it, so a busier or
+slower machine doesn't read as a regression.
+
+Usage:
+  python benchmarks/bench_parse.py [archive ...] --save-baseline   # on the reference revision
+  python benchmarks/bench_parse.py [archive ...]                   # fails on regressions
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from scrapers.replay import PARSED_KINDS, Recorder, parse_entry, read_archive, scraper_for
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'parse_baseline.json')
+
+WORDS = ('python', 'react', 'backend', 'senior', 'data', 'cloud', 'remote', 'platform', 'mobile', 'devops')
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def page(cards, rng):
+    # Navigation, inline scripts and footer around the cards, as on the real boards
+    chrome = ''.join(f'<li class="nav-item"><a href="/c/{i}">{words(rng, 2)}</a></li>' for i in range(80))
+    script = '<script>window.__STATE__ = %s;</script>' % json.dumps({'items': [words(rng, 6) for _ in range(200)]})
+    return (f'<html><head><title>{words(rng, 3)}</title>{script}</head><body><nav><ul>{chrome}</ul></nav>'
+            f'<main>{cards}</main><footer>{words(rng, 200)}</footer></body></html>')
+
+
+SYNTHETIC_CARDS = {
+    'LinkedIn': lambda i, rng: (
+        f'<div class="job-search-card"><a href="https://www.linkedin.com/jobs/view/{i}"></a>'
+        f'<h3 class="base-search-card__title">{words(rng, 4)}</h3>'
+        f'<h4 class="base-search-card__subtitle">Company {i % 97}</h4>'
+        f'<span class="job-search-card__location">Cairo, Egypt</span>'
+        f'<p class="job-search-card__snippet">{words(rng, 30)}</p></div>'),
+    'Freelancer': lambda i, rng: (
+        f'<div class="JobSearchCard-item"><a class="JobSearchCard-primary-heading-link" href="/projects/{i}">'
+        f'{words(rng, 4)}</a><span class="JobSearchCard-primary-heading-meta">{i % 7} days left</span>'
+        f'<p class="JobSearchCard-primary-description">{words(rng, 40)}</p></div>'),
+    'Wuzzuf': lambda i, rng: (
+        f'<div class="css-1gatmva e1v1l3u10"><h2 class="css-m604qf"><a href="/jobs/p/{i}">{words(rng, 4)}</a></h2>'
+        f'<a class="css-17s97q8">Company {i % 61}</a><span class="css-5wys0k">Giza, Egypt</span>'
+        f'<span class="css-1ve4b75 eoyjyou0">Full Time</span><span class="css-o1vzmt eoyjyou0">On-site</span></div>'),
+    'RemoteOK': lambda i, rng: (
+        f'<tr class="job" data-href="/remote-jobs/{i}"><td><h2>{words(rng, 4)}</h2><h3>Company {i % 83}</h3></td>'
+        f'<td class="description">{words(rng, 60)}</td></tr>'),
+    'WeWorkRemotely': lambda i, rng: (
+        f'<li class="new-listing-container"><a href="/remote-jobs/company-{i}">'
+        f'<h4 class="new-listing__header__title">{words(rng, 4)}</h4>'
+        f'<p class="new-listing__company-name">Company {i % 53}</p>'
+        f'<p class="new-listing__company-headquarters">Anywhere</p></a></li>'),
+    'PeoplePerHour': lambda i, rng: (
+        f'<div class="item__container⤍ListItem⤚Fk4RX"><h6 class="item__title⤍ListItem⤚2FRMT">'
+        f'<a href="/freelance-jobs/{i}">{words(rng, 4)}</a></h6>'
+        f'<p class="item__desc⤍ListItem⤚3f4JV">{words(rng, 40)}</p>'
+        f'<div class="card__username⤍ListItem⤚QnBBG">client{i}</div>'
+        f'<div class="card__footer-left⤍ListItem⤚16Odv"><span>{i % 23} hours ago</span><span>3 proposals</span>'
+        f'<span>Remote</span></div></div>'),
+}
+
+
+def synthetic_archive(path, pages_per_source=10, cards_per_page=25):
+    rng = random.Random(42)
+    recorder = Recorder(path)
+    for source, card in SYNTHETIC_CARDS.items():
+        for p in range(pages_per_source):
+            cards = ''.join(card(p * cards_per_page + i, rng) for i in range(cards_per_page))
+            if source == 'RemoteOK':
+                cards = f'<table>{cards}</table>'
+            recorder.record(source, 'listing', f'https://synthetic/{source}/{p}', page(cards, rng))
+    for p in range(pages_per_source):
+        detail = f'<div class="listing-container">{words(rng, 400)}</div>'
+        recorder.record('WeWorkRemotely', 'detail', f'https://synthetic/WeWorkRemotely/detail/{p}', page(detail, rng))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def calibration_parse():
+    """A fixed reference workload: plain BeautifulSoup over the same synthetic page."""
+    from bs4 import BeautifulSoup
+    rng = random.Random(0)
+    html = page(''.join(f'<div class="card"><p>{words(rng, 40)}</p></div>' for _ in range(25)), rng)
+    return lambda: [BeautifulSoup(html, 'html.parser') for _ in range(5)]
+
+
+def run(archives, repeat):
+    entries = defaultdict(list)
+    for archive in archives:
+        for entry in read_archive(archive):
+            if entry['kind'] not in PARSED_KINDS:
+                continue
+            entries[(entry['source'], entry['kind'])].append(entry)
+    reference = calibration_parse()
+    results = {}
+    for (source, kind), group in sorted(entries.items()):
+        try:
+            scraper = scraper_for(source)
+        except (ValueError, ImportError, AttributeError) as e:
+            print(f"  skipping {source}: {e}")
+            continue
+        jobs = sum(len(parse_entry(scraper, entry)) for entry in group)
+        source_times, reference_times = [], []
+        for _ in range(repeat):
+            reference_times.append(timed(reference))
+            source_times.append(timed(lambda: [parse_entry(scraper, entry) for entry in group]))
+        elapsed = statistics.median(source_times)
+        results[f'{source}/{kind}'] = {
+            'pages': len(group),
+            'jobs': jobs,
+            'ms_per_page': round(elapsed * 1000 / len(group), 3),
+            'cards_per_s': round(jobs / elapsed, 1) if elapsed else 0.0,
+            # Parse time in units of the calibration workload; stable across machine speed changes
+            'relative_cost': round(elapsed / statistics.median(reference_times), 4),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    failures = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            failures.append(f"{name}: missing from this run")
+            continue
+        if current['jobs'] != base['jobs']:
+            failures.append(f"{name}: extracted {current['jobs']} jobs, baseline {base['jobs']}")
+        slowdown = current['relative_cost'] / base['relative_cost'] - 1
+        if slowdown > tolerance:
+            failures.append(f"{name}: parsing is {slowdown:.0%} slower than the baseline "
+                            f"({current['cards_per_s']} cards/s now, {base['cards_per_s']} then)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archives', nargs='*', help='recorded archives (default: a synthetic one)')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed throughput drop (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archives = args.archives
+        if not archives:
+            archives = [os.path.join(tmp, 'synthetic.jsonl.gz')]
+            synthetic_archive(archives[0])
+        results = run(archives, args.repeat)
+
+    print(f"{'source/kind':28} {'pages':>6} {'jobs':>6} {'ms/page':>9} {'cards/s':>10}")
+    for name, r in results.items():
+        print(f"{name:28} {r['pages']:6} {r['jobs']:6} {r['ms_per_page']:9.2f} {r['cards_per_s']:10.1f}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        failures = compare(results, json.load(f), args.tolerance)
+    if failures:
+        print("\nREGRESSIONS:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
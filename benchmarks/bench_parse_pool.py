@@ -0,0 +1,91 @@
+"""
+Parse scaling benchmark: parser threads vs parser processes.
+
+Parses every listing and detail page of the archives (recorded with
+CRAWL_RECORD; a synthetic one from bench_parse without any) with N threads of
+this process and with a ParsePool of N worker processes, for N = 1, 2, 4, ... up
+to --max-workers (default: the cores available). Threads share the GIL, so their
+throughput stays flat; processes should scale with the cores until the pages run
+out. Workers are started before timing. Every run must extract the same jobs as
+a plain in-process parse.
+
+Usage: python benchmarks/bench_parse_pool.py [archive ...] [--pages 40] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.bench_parse import synthetic_archive
+from scrapers import parse_pool
+from scrapers.replay import PARSED_KINDS, read_archive
+
+
+def worker_counts(limit):
+    counts, n = [], 1
+    while n < limit:
+        counts.append(n)
+        n *= 2
+    return counts + [limit]
+
+
+def with_threads(pages, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda page: parse_pool.parse(*page), pages))
+
+
+def timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archives', nargs='*', help='recorded archives (default: a synthetic one)')
+    parser.add_argument('--pages', type=int, default=40, help='pages per source in the synthetic archive')
+    parser.add_argument('--max-workers', type=int, default=parse_pool.available_cores())
+    parser.add_argument('--chunksize', type=int, default=4, help='pages sent to a worker process at a time')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archives = args.archives
+        if not archives:
+            archives = [os.path.join(tmp, 'synthetic.jsonl.gz')]
+            synthetic_archive(archives[0], pages_per_source=args.pages)
+        pages = [(entry['source'], entry['kind'], entry['body']) for archive in archives
+                 for entry in read_archive(archive) if entry['kind'] in PARSED_KINDS]
+    if not pages:
+        print("No listing or detail pages in the archives")
+        return
+
+    expected, single = timed(lambda: [parse_pool.parse(*page) for page in pages], args.repeat)
+    jobs = sum(len(result) for result in expected)
+    print(f"{len(pages)} pages, {jobs} jobs, {parse_pool.available_cores()} cores available")
+    print(f"{'mode':10} {'workers':>8} {'pages/s':>9} {'jobs/s':>9} {'speedup':>8}")
+    print(f"{'inline':10} {1:8} {len(pages) / single:9.1f} {jobs / single:9.1f} {1.0:8.2f}")
+
+    for workers in worker_counts(max(1, args.max_workers)):
+        results, elapsed = timed(lambda: with_threads(pages, workers), args.repeat)
+        print(f"{'threads':10} {workers:8} {len(pages) / elapsed:9.1f} {jobs / elapsed:9.1f} {single / elapsed:8.2f}"
+              + ('' if results == expected else '   WARNING: different results'))
+        with parse_pool.ParsePool(workers) as pool:
+            results, elapsed = timed(lambda: list(pool.map(pages, chunksize=args.chunksize)), args.repeat)
+        print(f"{'processes':10} {workers:8} {len(pages) / elapsed:9.1f} {jobs / elapsed:9.1f} {single / elapsed:8.2f}"
+              + ('' if results == expected else '   WARNING: different results'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Analytics benchmark: the original GROUP BY queries vs the rollup tables.
+
+Builds a synthetic jobs table, times the five aggregates the Analytics page used
+to run against jobs and their rollup equivalents, and the cost of keeping the
+rollups current while ingesting batches through DataStorage.
+
+Usage: python benchmarks/bench_rollups.py [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from migrations import migrate
+from models import DataStorage, Job
+from rollups import rebuild_rollups
+
+SOURCES = ['LinkedIn', 'Freelancer', 'Wuzzuf', 'RemoteOK', 'WeWorkRemotely', 'Upwork', 'PeoplePerHour']
+
+QUERIES = [
+    ('total',
+     "SELECT COUNT(*) FROM jobs",
+     "SELECT COALESCE(SUM(count), 0) FROM rollup_source_day"),
+    ('by source',
+     "SELECT source, COUNT(*) as count FROM jobs GROUP BY source",
+     "SELECT source, SUM(count) as count FROM rollup_source_day GROUP BY source"),
+    ('top titles',
+     "SELECT title, COUNT(*) as count FROM jobs GROUP BY title ORDER BY count DESC LIMIT 10",
+     "SELECT title, count FROM rollup_title ORDER BY count DESC LIMIT 10"),
+    ('top companies',
+     "SELECT company, COUNT(*) as count FROM jobs GROUP BY company ORDER BY count DESC LIMIT 10",
+     "SELECT company, count FROM rollup_company ORDER BY count DESC LIMIT 10"),
+    ('top locations',
+     "SELECT location, COUNT(*) as count FROM jobs GROUP BY location ORDER BY count DESC LIMIT 10",
+     "SELECT location, count FROM rollup_location ORDER BY count DESC LIMIT 10"),
+]
+
+
+def build(db_name, rows):
+    conn = sqlite3.connect(db_name)
+    migrate(conn)
+    rng = random.Random(3)
+    start = 1735689600
+
+    def generate():
+        for i in range(rows):
+            posted_at = start + rng.randrange(0, 365 * 86400)
+            yield (str(uuid.uuid4()), f'Engineer {rng.randrange(20000)}', 'Build services.', f'https://example.com/jobs/{i}',
+                   f'Company {rng.randrange(50000)}', rng.choice(SOURCES), 'Benchmark', f'City {rng.randrange(500)}',
+                   f'https://example.com/jobs/{i}', posted_at, posted_at)
+
+    with conn:
+        conn.executemany('INSERT INTO jobs (id, title, description, link, company, source, timestamp, location, '
+                         'link_key, posted_at, scraped_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', generate())
+        start_rebuild = time.perf_counter()
+        rebuild_rollups(conn)
+    print(f"Rollup rebuild over {rows} rows: {time.perf_counter() - start_rebuild:.1f}s")
+    return conn
+
+
+def best_of(conn, sql, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def ingest(db_name, batches, batch_size, with_rollups):
+    import models
+    original = models.update_rollups
+    if not with_rollups:
+        models.update_rollups = lambda conn, jobs: None
+    try:
+        elapsed = 0.0
+        # Flushed explicitly below so only the write itself is timed
+        with DataStorage(db_name=db_name, batch_size=sys.maxsize, flush_interval=float('inf')) as storage:
+            for batch in range(batches):
+                for i in range(batch_size):
+                    storage.add_job(Job(title=f'Ingest {i}', link=f'https://ingest.example/{with_rollups}/{batch}/{i}',
+                                        company='Ingest', source=random.choice(SOURCES), location='Remote'))
+                start = time.perf_counter()
+                storage.flush()
+                elapsed += time.perf_counter() - start
+        return elapsed / batches * 1000
+    finally:
+        models.update_rollups = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        conn = build(db_name, args.rows)
+        print(f"\n{'query':<16}{'jobs ms':>10}{'rollup ms':>12}")
+        for name, original, rollup in QUERIES:
+            print(f"{name:<16}{best_of(conn, original, args.repeat):>10.1f}{best_of(conn, rollup, args.repeat):>12.2f}")
+        conn.close()
+
+        plain = ingest(db_name, batches=20, batch_size=100, with_rollups=False)
+        maintained = ingest(db_name, batches=20, batch_size=100, with_rollups=True)
+        print(f"\nFlush of 100 new jobs: {plain:.1f} ms without rollups, {maintained:.1f} ms with rollups")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Text search benchmark: pandas substring scans vs the jobs_fts full-text index.
+
+Builds a synthetic jobs table, then times the Job Search text filters both ways:
+loading the table into a DataFrame and running apply_filters without a
+connection, and asking the FTS5 index for the matching ids.
+
+Usage: python benchmarks/bench_search.py [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (PROJECT_ROOT, os.path.join(PROJECT_ROOT, 'streamlit_app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pandas as pd
+from migrations import migrate
+from utils.job_filters import apply_filters, search_job_ids
+
+SENIORITY = ['Junior', 'Mid-level', 'Senior', 'Staff', 'Principal', 'Lead', 'Intern']
+STACKS = ['Python', 'Django', 'React', 'Node.js', 'Go', 'Rust', 'Java', 'Kotlin', 'Swift', 'Flutter',
+          'PHP', 'Laravel', 'Ruby', 'Rails', 'C#', '.NET', 'Scala', 'Elixir', 'Vue', 'Angular',
+          'AWS', 'Azure', 'GCP', 'Kubernetes', 'Terraform', 'Spark', 'Kafka', 'Unity', 'Shopify', 'WordPress']
+ROLES = ['Developer', 'Engineer', 'Architect', 'Consultant', 'Data Scientist', 'QA Engineer',
+         'DevOps Engineer', 'Designer', 'Analyst', 'Administrator']
+LOCATIONS = ['Cairo, Egypt', 'Alexandria, Egypt', 'Giza, Egypt', 'Remote', 'Berlin, Germany', 'London, UK',
+             'Austin, TX', 'Dubai, UAE', 'Riyadh, Saudi Arabia', 'Toronto, Canada']
+SYLLABLES = 'ka lo mi ne ra tu vo shi zen por lan dek fi mar sol ber tin qua'.split()
+
+
+def make_vocabulary(rng, size=8000):
+    return list({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size)})
+
+
+SEARCHES = [
+    {'title': 'kotlin'},
+    {'title': 'senior python dev', 'location': 'cairo'},
+    {'description': 'lomizen'},
+    {'description': 'kasol'},
+    {'company': 'company 4217'},
+]
+
+
+def build(db_name, rows):
+    conn = sqlite3.connect(db_name)
+    migrate(conn)
+    rng = random.Random(7)
+    vocabulary = make_vocabulary(rng)
+    # Zipf-like word frequencies, as in real postings: a few very common words, a long tail of rare ones
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def generate():
+        for i in range(rows):
+            title = f'{rng.choice(SENIORITY)} {rng.choice(STACKS)} {rng.choice(ROLES)}'
+            description = ' '.join(rng.choices(vocabulary, weights=weights, k=40))
+            yield (str(uuid.uuid4()), title, description, f'https://example.com/jobs/{i}',
+                   f'Company {rng.randrange(20000)}', 'Benchmark', '2025-05-01 00:00:00',
+                   rng.choice(LOCATIONS), f'https://example.com/jobs/{i}')
+
+    with conn:
+        conn.executemany('INSERT INTO jobs (id, title, description, link, company, source, timestamp, location, '
+                         'link_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', generate())
+    return conn
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.rows} synthetic jobs (triggers keep the index in sync)...")
+        conn = build(os.path.join(tmp, 'bench.db'), args.rows)
+        df, load_ms = timed(lambda: pd.read_sql_query('SELECT * FROM jobs', conn), 1)
+        print(f"Loading the table into pandas: {load_ms:.0f} ms\n")
+        print(f"{'search':<52}{'matches':>10}{'pandas ms':>12}{'fts ms':>10}{'fts top-20 ms':>15}")
+        for search in SEARCHES:
+            filters = {'title': '', 'company': '', 'location': '', 'description': '', 'link': '',
+                       'source': ['All'], 'date_range': None, **search}
+            scanned, pandas_ms = timed(lambda: apply_filters(df, filters), args.repeat)
+            ids, fts_ms = timed(lambda: search_job_ids(conn, filters), args.repeat)
+            _, top_ms = timed(lambda: search_job_ids(conn, filters, limit=20), args.repeat)
+            print(f"{str(search):<52}{len(ids):>10}{pandas_ms:>12.1f}{fts_ms:>10.1f}{top_ms:>15.1f}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Cold-start benchmark for crawler.py: what a run pays in imports before the first page is fetched.
+
+Each case runs in a fresh interpreter under `python -X importtime`, imports the
+crawler and loads the scrapers for one crawl the way main() does, and reports
+the wall time, the cumulative import time and the heavy packages that got
+pulled in. 'all scrapers' loads every scraper through the registry, and
+'eager (before)' is the baseline: what every run paid when crawler.py imported
+every scraper module and pandas at the top level. A scraper module that fails to
+import (undetected_chromedriver missing) is skipped there, where the old crawler
+stopped outright.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5] [--scrapers PeoplePerHourScraper,RemoteOKScraper]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_PACKAGES = ('pandas', 'selenium', 'undetected_chromedriver', 'bs4', 'requests', 'numpy')
+
+SNIPPET = """
+import sys
+import crawler
+from scrapers import registry
+registry.load_selected({names!r})
+print(','.join(sorted(p for p in {heavy!r} if p in sys.modules)))
+"""
+
+# The imports at the top of crawler.py before the registry
+EAGER_SNIPPET = """
+import importlib
+import sys
+import pandas
+import crawler
+from scrapers import registry
+for module in registry.SCRAPERS.values():
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        pass
+print(','.join(sorted(p for p in {heavy!r} if p in sys.modules)))
+"""
+
+
+def run_once(names, eager=False):
+    code = (EAGER_SNIPPET if eager else SNIPPET).format(names=names, heavy=HEAVY_PACKAGES)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    # importtime lines: "import time: self [us] | cumulative | imported package";
+    # top-level imports are the ones without indentation in the package column
+    import_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, package = line[len('import time:'):].split('|')
+        if not package.startswith('  '):
+            import_us += int(cumulative)
+    return wall_ms, import_us / 1000, result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scrapers', default='PeoplePerHourScraper,RemoteOKScraper,WeWorkRemotelyScraper',
+                        help='comma-separated single-source runs to measure')
+    args = parser.parse_args()
+
+    cases = ([(name, [name], False) for name in args.scrapers.split(',')]
+             + [('all scrapers', None, False), ('eager (before)', None, True)])
+    print(f"{'crawl':24} {'wall ms':>9} {'imports ms':>11}  heavy packages loaded")
+    for label, names, eager in cases:
+        runs = [run_once(names, eager) for _ in range(args.repeat)]
+        wall = statistics.median(r[0] for r in runs)
+        imports = statistics.median(r[1] for r in runs)
+        print(f"{label:24} {wall:9.0f} {imports:11.0f}  {runs[-1][2] or '-'}")
+
+
+if __name__ == '__main__':
+    main()
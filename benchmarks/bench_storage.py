@@ -0,0 +1,59 @@
+"""
+Ingest benchmark for DataStorage: single-row transactions vs buffered batches.
+
+Usage: python benchmarks/bench_storage.py [--rows 5000] [--batch-sizes 25,100,500]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models import Job, DataStorage
+
+
+def make_jobs(count):
+    return [
+        Job(
+            title=f'Software Engineer {i}',
+            description='Build and maintain services. ' * 10,
+            link=f'https://example.com/jobs/{i}',
+            company=f'Company {i % 250}',
+            source='Benchmark',
+            location='Remote'
+        )
+        for i in range(count)
+    ]
+
+
+def run(jobs, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'bench.db')
+        start = time.perf_counter()
+        with DataStorage(output_format='sqlite', db_name=db_name, batch_size=batch_size) as storage:
+            for job in jobs:
+                storage.add_job(job)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--batch-sizes', default='25,100,500')
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.rows)
+    print(f"{'mode':<16}{'seconds':>10}{'rows/sec':>14}")
+    for batch_size in [1] + [int(size) for size in args.batch_sizes.split(',')]:
+        elapsed = run(jobs, batch_size)
+        mode = 'single-row' if batch_size == 1 else f'batch={batch_size}'
+        print(f"{mode:<16}{elapsed:>10.3f}{args.rows / elapsed:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
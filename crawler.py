@@ -1,28 +1,39 @@
 import logging
 from models import Job, DataStorage
 from utils import setup_logging, deduplicate_jobs
-from scrapers.linkedin import LinkedInScraper
-from scrapers.freelancer import FreelancerScraper
-from scrapers.wuzzuf import WuzzufScraper
-from scrapers.remoteok import RemoteOKScraper
-from scrapers.weworkremotely import WeWorkRemotelyScraper
-from scrapers.upwork import UpworkScraper
-from scrapers.peopleperhour import PeoplePerHourScraper
+from ingest import JobWriter
+import pipeline
+import supervisor
+from scrapers import registry
+from scrapers import browser_pool, page_cache, throttle
 import concurrent.futures
-from collections import defaultdict
-import pandas as pd
 import os
 
 # Configure logging
 setup_logging()
 
-# Helper to run a scraper with its own DataStorage
-def run_scraper(scraper_class, query, db_name):
-    storage = DataStorage(output_format='sqlite', db_name=db_name)
-    scraper = scraper_class(storage, query=query)
-    scraper.scrape(max_pages=5)
-    # Optionally, call storage.save() if needed (it just logs for sqlite)
-    del storage  # Ensure connection is closed
+# Rows buffered per scraper before they are written in one transaction
+BATCH_SIZE = int(os.environ.get('CRAWL_BATCH_SIZE', '100'))
+
+# 'queue': scrapers push jobs to one writer thread that owns the only write connection
+# 'direct': each scraper thread writes through its own DataStorage connection
+INGEST_MODE = os.environ.get('CRAWL_INGEST', 'queue')
+
+# 'scrapers': each scraper runs its own fetch/parse/store loop in a thread
+# 'pipeline': scrapers that support it feed shared fetch -> parse -> normalize -> persist stages (see pipeline.py)
+# 'processes': each scraper runs in its own child process with limits and a deadline (see supervisor.py)
+CRAWL_MODE = os.environ.get('CRAWL_MODE', 'scrapers')
+
+# Helper to run a scraper with its own DataStorage (or a handle on the shared writer)
+def run_scraper(scraper_class, query, db_name, writer=None):
+    if writer is not None:
+        storage = writer.storage()
+    else:
+        # Buffered storage: rows are flushed on page boundaries, when the batch fills up and on exit
+        storage = DataStorage(output_format='sqlite', db_name=db_name, batch_size=BATCH_SIZE)
+    with storage:
+        scraper = scraper_class(storage, query=query)
+        scraper.scrape(max_pages=5)
     return scraper_class.__name__  # For logging
 
 # Main function to run scrapers
@@ -36,10 +47,7 @@ def main():
 
     # Store initial job counts
     temp_storage = DataStorage(output_format='sqlite', db_name=db_name)
-    initial_counts = pd.read_sql_query(
-        "SELECT source, COUNT(*) as count FROM jobs GROUP BY source", 
-        temp_storage.conn
-    ).set_index('source')['count'].to_dict()
+    initial_counts = dict(temp_storage.conn.execute("SELECT source, COUNT(*) FROM jobs GROUP BY source"))
     del temp_storage
 
     # Remove duplicates at the start (keep the first occurrence by timestamp)
@@ -47,23 +55,40 @@ def main():
     deduplicate_jobs(temp_storage.conn)
     del temp_storage
 
-    # List of scraper classes
-    scraper_classes = [
-        LinkedInScraper,
-        FreelancerScraper,
-        WuzzufScraper,
-        RemoteOKScraper,
-        WeWorkRemotelyScraper,
-        UpworkScraper,
-        PeoplePerHourScraper
-    ]
-    if only_scrapers:
-        only_scraper_names = set(only_scrapers.split(','))
-        scraper_classes = [cls for cls in scraper_classes if cls.__name__ in only_scraper_names]
-
-    # Run scrapers in parallel, each with its own DataStorage/connection
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(scraper_classes)) as executor:
-        futures = {executor.submit(run_scraper, scraper_class, query, db_name): scraper_class.__name__ for scraper_class in scraper_classes}
+    # Only the selected scrapers (all of them by default) are imported
+    scraper_classes = registry.load_selected(only_scrapers.split(',') if only_scrapers else None)
+    if not scraper_classes:
+        logging.error("No scrapers to run")
+        return
+
+    writer = None
+    if INGEST_MODE == 'queue' or CRAWL_MODE in ('pipeline', 'processes'):
+        # The pipeline's persist stage is the writer, and child processes stream their jobs to it
+        writer = JobWriter(db_name=db_name, batch_size=BATCH_SIZE)
+        writer.start()
+
+    crawl = None
+    sources = None
+    standalone = scraper_classes
+    if CRAWL_MODE == 'pipeline':
+        staged = [scraper_class for scraper_class in scraper_classes if pipeline.supports(scraper_class)]
+        standalone = [scraper_class for scraper_class in scraper_classes if scraper_class not in staged]
+        if staged:
+            crawl = pipeline.CrawlPipeline([scraper_class(writer.storage(), query=query) for scraper_class in staged],
+                                           writer, max_pages=max_pages)
+    elif CRAWL_MODE == 'processes':
+        sources = supervisor.SourceSupervisor([scraper_class.__name__ for scraper_class in scraper_classes], writer,
+                                              query=query, max_pages=max_pages, db_name=db_name)
+        standalone = []
+
+    # Run scrapers in parallel, either through the shared writer or each with its own DataStorage/connection;
+    # in pipeline mode only the ones that can't be staged (e.g. Upwork's logged-in feeds), next to the pipeline
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(standalone) + 1) as executor:
+        futures = {executor.submit(run_scraper, scraper_class, query, db_name, writer): scraper_class.__name__ for scraper_class in standalone}
+        if crawl is not None:
+            futures[executor.submit(crawl.run)] = 'Pipeline'
+        if sources is not None:
+            futures[executor.submit(sources.run)] = 'Source processes'
         for future in concurrent.futures.as_completed(futures):
             scraper_name = futures[future]
             try:
@@ -72,40 +97,101 @@ def main():
             except Exception as e:
                 logging.error(f"{scraper_name} generated an exception: {e}")
 
+    # Quit the warm browsers now that every scraper is done with them
+    pools = browser_pool.pool_stats()
+    browser_pool.shutdown_all()
+    if pools:
+        print("\n========== BROWSER POOLS ==========")
+        for name, stats in pools.items():
+            print(f"  {name}: {stats['created']} drivers for {stats['leases']} leases ({stats['reuses']} reused, "
+                  f"{stats['recycled']} recycled, {stats['unhealthy']} unhealthy), "
+                  f"lease wait avg {stats['lease_wait_avg_s']}s / max {stats['lease_wait_max_s']}s")
+
+    hosts = throttle.controller_stats()
+    if hosts:
+        print("\n========== RATE CONTROLLERS ==========")
+        for host, stats in hosts.items():
+            print(f"  {host}: {stats}")
+        throttle.log_state()
+
+    cache = page_cache.cache_report()
+    if cache:
+        print("\n========== PAGE CACHE ==========")
+        print(f"  {cache['hits']} fresh hits, {cache['revalidated']} revalidated (304), {cache['misses']} fetched; "
+              f"hit ratio {cache['hit_ratio']:.0%}")
+        print(f"  {cache['bytes_saved'] / (1024 * 1024):.1f} MB not downloaded; "
+              f"cache holds {cache['size_mb']} MB ({cache['evicted']} pages evicted)")
+        logging.info(f"Page cache stats: {cache}")
+
+    if crawl is not None:
+        report = crawl.report()
+        print(f"\n========== PIPELINE ({report['elapsed_s']}s) ==========")
+        if report['parse_processes']:
+            print(f"  parsing in {report['parse_processes']} worker processes")
+        for name, stats in report['stages'].items():
+            print(f"  {name:10} {stats['workers']:2} workers  {stats['processed']:6} items  {stats['per_s']:8.1f}/s  "
+                  f"busy {stats['busy_s']}s ({stats['utilization']:.0%}), blocked {stats['blocked_s']}s, "
+                  f"max queue {stats['max_queue_depth']}")
+        for name, stats in report['sources'].items():
+            print(f"  {name}: {stats['jobs']} jobs from {stats['pages']} pages "
+                  f"({stats['duplicates']} duplicates, {stats['errors']} failed pages)")
+        logging.info(f"Pipeline stats: {report}")
+
+    if sources is not None:
+        report = sources.report()
+        print(f"\n========== SOURCE PROCESSES ({report['elapsed_s']}s) ==========")
+        for name, stats in report['sources'].items():
+            print(f"  {name}: {stats['status']} after {stats['elapsed_s']}s, {stats['jobs']} jobs in "
+                  f"{stats['batches']} batches, {stats['descriptions']} descriptions")
+        logging.info(f"Source process stats: {report}")
+
+    if writer is not None:
+        writer.stop()
+        stats = writer.report()
+        print("\n========== INGEST WRITER ==========")
+        print(f"  Rows written: {stats['rows_written']} in {stats['commits']} commits, "
+              f"{stats['descriptions_updated']} descriptions updated")
+        print(f"  Queue depth: max {stats['max_queue_depth']}, at exit {stats['final_queue_depth']}")
+        print(f"  Commit latency (ms): p50 {stats['commit_ms_p50']}, p95 {stats['commit_ms_p95']}, max {stats['commit_ms_max']}")
+        if writer.error is not None:
+            print(f"  ERROR: {writer.error}")
+            logging.error(f"Ingest writer failed, rows may be missing from {db_name}: {writer.error}")
+        logging.info(f"Ingest writer stats: {stats}")
+
     # After all threads are done, deduplicate and summarize in main thread
     if push_to_db:
         storage = DataStorage(output_format='sqlite', db_name=db_name)
         deduplicate_jobs(storage.conn)
         # Print summary of jobs found in this run
         print("\n========== NEW JOBS FOUND IN THIS RUN ==========")
-        job_counts = pd.read_sql_query("SELECT source, COUNT(*) as count FROM jobs GROUP BY source", storage.conn)
+        job_counts = storage.conn.execute("SELECT source, COUNT(*) FROM jobs GROUP BY source").fetchall()
         total_new_jobs = 0
         print("\nBreakdown by source:")
-        for _, row in job_counts.iterrows():
-            source = row['source']
-            count = row['count']
+        for source, count in job_counts:
             new_jobs = count - initial_counts.get(source, 0)
             total_new_jobs += max(new_jobs, 0)
             print(f"  {source}: {max(new_jobs, 0)} new jobs")
         print(f"\nTotal new jobs found: {total_new_jobs}")
         print("=============================================")
         # Log job counts per source
-        logging.info(f"Job counts by source:\n{job_counts}")
+        logging.info(f"Job counts by source: {dict(job_counts)}")
         # Check for duplicates
-        df_duplicates = pd.read_sql_query("SELECT link, COUNT(*) as count FROM jobs GROUP BY link HAVING count > 1", storage.conn)
-        logging.info(f"Duplicates found:\n{df_duplicates}")
+        duplicates = storage.conn.execute("SELECT link, COUNT(*) as count FROM jobs GROUP BY link HAVING count > 1").fetchall()
+        logging.info(f"Duplicates found: {len(duplicates)} {duplicates[:20]}")
         # Check for missing fields (now everything should be at least 'non')
-        df_missing = pd.read_sql_query("SELECT * FROM jobs WHERE title IS NULL OR description IS NULL OR link IS NULL OR company IS NULL OR source IS NULL OR location IS NULL", storage.conn)
-        logging.info(f"Jobs with missing fields:\n{df_missing}")
+        missing = storage.conn.execute("SELECT id, source, link FROM jobs WHERE title IS NULL OR description IS NULL OR link IS NULL OR company IS NULL OR source IS NULL OR location IS NULL").fetchall()
+        logging.info(f"Jobs with missing fields: {len(missing)} {missing[:20]}")
         del storage
     else:
         # Just print jobs found by each scraper (no DB write)
         print("\n========== JOBS FOUND (NOT PUSHED TO DB) ==========")
         for scraper_class in scraper_classes:
             storage = DataStorage(output_format='sqlite', db_name=db_name)
-            jobs = pd.read_sql_query(f"SELECT * FROM jobs WHERE source = '{scraper_class.__name__.replace('Scraper','')}' ORDER BY timestamp DESC LIMIT 10", storage.conn)
+            jobs = storage.conn.execute("SELECT title, company, location, link FROM jobs WHERE source = ? ORDER BY posted_at DESC LIMIT 10",
+                                        (scraper_class.__name__.replace('Scraper', ''),)).fetchall()
             print(f"\n--- {scraper_class.__name__} ---")
-            print(jobs[['title','company','location','link']].to_string(index=False))
+            for title, company, location, link in jobs:
+                print(f"  {title} | {company} | {location} | {link}")
             del storage
         print("=============================================")
 
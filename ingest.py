@@ -0,0 +1,186 @@
+"""
+Single-writer ingest for the parallel crawler.
+
+Scrapers get a QueueStorage instead of their own DataStorage. Every job they
+add is pushed onto a bounded, thread-safe queue that a single JobWriter thread
+drains. The writer owns the only write connection to the database (WAL journal,
+synchronous=NORMAL) and commits in batches, so scraper threads never contend
+for the SQLite lock and readers such as the Streamlit pages are not blocked
+while a crawl runs.
+"""
+
+import logging
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from models import DataStorage, described_links
+
+_FLUSH = object()
+_STOP = object()
+
+
+class _Descriptions:
+    """Queue item: (link, description) pairs to write onto already queued jobs."""
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+
+class QueueStorage:
+    """Drop-in replacement for DataStorage that hands jobs to a JobWriter."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.db_name = writer.db_name
+
+    def add_job(self, job):
+        self.writer.put(job)
+
+    def known_links(self, links):
+        # A read on its own connection; WAL lets it run alongside the writer's transactions
+        conn = sqlite3.connect(self.db_name, timeout=10)
+        try:
+            return described_links(conn, links)
+        finally:
+            conn.close()
+
+    def update_descriptions(self, descriptions):
+        # Queued behind the jobs already added, so their rows exist when it is applied
+        self.writer.put(_Descriptions(list(descriptions)))
+
+    def flush(self):
+        # Page boundary: ask the writer to commit what it has buffered so far
+        self.writer.put(_FLUSH)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JobWriter(threading.Thread):
+    def __init__(self, db_name='jobs.db', batch_size=200, flush_interval=2.0, max_queue=10000,
+                 journal_mode='WAL', synchronous='NORMAL'):
+        super().__init__(name='JobWriter', daemon=True)
+        self.db_name = db_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.rows_written = 0
+        self.descriptions_updated = 0
+        self.max_queue_depth = 0
+        self.commit_latencies = []
+        self.error = None
+        # Set once run() has returned: nothing drains the queue any more
+        self.dead = threading.Event()
+
+    def _enqueue(self, item):
+        # A full queue would block forever behind a dead writer, so keep checking on it
+        while not self.dead.is_set():
+            try:
+                self.queue.put(item, timeout=1.0)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def put(self, item):
+        if not self._enqueue(item):
+            raise RuntimeError(f"JobWriter for {self.db_name} is not running: {self.error}")
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def storage(self):
+        """Return a storage handle for one scraper thread."""
+        return QueueStorage(self)
+
+    def stop(self):
+        if self.is_alive():
+            self._enqueue(_STOP)
+        self.join()
+
+    def _commit(self, storage):
+        if not storage.pending:
+            return
+        start = time.perf_counter()
+        self.rows_written += storage.flush()
+        self.commit_latencies.append(time.perf_counter() - start)
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = e
+            logging.error(f"JobWriter for {self.db_name} stopped: {e}")
+        finally:
+            self.dead.set()
+
+    def _run(self):
+        # Thresholds are enforced here, so the storage itself never flushes on its own
+        storage = DataStorage(output_format='sqlite', db_name=self.db_name, batch_size=sys.maxsize,
+                              flush_interval=float('inf'), journal_mode=self.journal_mode,
+                              synchronous=self.synchronous)
+        try:
+            last_commit = time.monotonic()
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = _FLUSH
+                if item is _STOP:
+                    break
+                if isinstance(item, _Descriptions):
+                    try:
+                        self._commit(storage)
+                        self.descriptions_updated += storage.update_descriptions(item.pairs)
+                    except Exception as e:
+                        self.error = e
+                        logging.error(f"JobWriter description update failed, {len(item.pairs)} rows skipped: {e}")
+                        storage.pending.clear()
+                    last_commit = time.monotonic()
+                    continue
+                if item is not _FLUSH:
+                    storage.add_job(item)
+                    storage.jobs.clear()  # the writer never exports csv/json, don't keep rows around
+                if (item is _FLUSH or len(storage.pending) >= self.batch_size
+                        or time.monotonic() - last_commit >= self.flush_interval):
+                    try:
+                        self._commit(storage)
+                    except Exception as e:
+                        self.error = e
+                        logging.error(f"JobWriter commit failed, {len(storage.pending)} rows dropped: {e}")
+                        storage.pending.clear()
+                    last_commit = time.monotonic()
+            self._commit(storage)
+        finally:
+            storage.close()
+
+    def report(self):
+        latencies = sorted(self.commit_latencies)
+        if latencies:
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            worst = latencies[-1] * 1000
+        else:
+            p50 = p95 = worst = 0.0
+        return {
+            'rows_written': self.rows_written,
+            'descriptions_updated': self.descriptions_updated,
+            'commits': len(latencies),
+            'max_queue_depth': self.max_queue_depth,
+            'final_queue_depth': self.queue.qsize(),
+            'commit_ms_p50': round(p50, 2),
+            'commit_ms_p95': round(p95, 2),
+            'commit_ms_max': round(worst, 2),
+            'error': None if self.error is None else str(self.error),
+        }
@@ -0,0 +1,241 @@
+"""
+Versioned schema migrations for jobs.db.
+
+The schema version is kept in ``PRAGMA user_version``. ``migrate`` applies every
+step newer than the stored version, in order, each inside its own transaction
+together with the version bump, so a failed step leaves the database on the
+previous version. Steps must also cope with databases that were changed by hand
+or by older code before versioning existed.
+
+To change the schema, append a new ``(version, description, function)`` entry to
+MIGRATIONS; never edit a step that has already shipped.
+"""
+
+import logging
+import sqlite3
+import time
+from scrapers.utils.job_helpers import canonical_link, to_epoch
+from rollups import rebuild_rollups
+
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _link_unique_jobs(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            title TEXT,
+            description TEXT,
+            link TEXT,
+            company TEXT,
+            source TEXT,
+            timestamp TEXT,
+            location TEXT
+        )
+    """)
+    columns = _columns(conn, 'jobs')
+    if 'link_key' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN link_key TEXT')
+    if 'last_seen' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN last_seen TEXT')
+    conn.create_function('canonical_link', 1, canonical_link, deterministic=True)
+    conn.execute('UPDATE jobs SET link_key = canonical_link(link), last_seen = COALESCE(last_seen, timestamp)')
+    # Collapse duplicates onto the oldest row for each canonical link
+    conn.execute("""
+        CREATE TEMP TABLE duplicate_jobs AS
+        SELECT jobs.id AS id, keep.id AS keep_id
+        FROM jobs
+        JOIN (
+            SELECT link_key, MIN(rowid) AS keep_rowid
+            FROM jobs
+            WHERE link_key IS NOT NULL
+            GROUP BY link_key
+            HAVING COUNT(*) > 1
+        ) AS groups ON groups.link_key = jobs.link_key AND jobs.rowid <> groups.keep_rowid
+        JOIN jobs AS keep ON keep.rowid = groups.keep_rowid
+    """)
+    # Point saved jobs at the surviving row before its duplicates go away
+    if _table_exists(conn, 'saved_jobs'):
+        conn.execute("""
+            UPDATE OR IGNORE saved_jobs
+            SET job_id = (SELECT keep_id FROM duplicate_jobs WHERE duplicate_jobs.id = saved_jobs.job_id)
+            WHERE job_id IN (SELECT id FROM duplicate_jobs)
+        """)
+        conn.execute('DELETE FROM saved_jobs WHERE job_id IN (SELECT id FROM duplicate_jobs)')
+    removed = conn.execute('DELETE FROM jobs WHERE id IN (SELECT id FROM duplicate_jobs)').rowcount
+    conn.execute('DROP TABLE duplicate_jobs')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_link_key ON jobs (link_key)')
+    if removed:
+        logging.info(f"Removed {removed} duplicate jobs")
+
+
+def _query_indexes(conn):
+    # One timestamp format ('YYYY-MM-DD HH:MM:SS.ffffff', as Upwork rows and Job() now
+    # produce) so that text ordering and the timestamp indexes agree
+    conn.execute("""
+        UPDATE jobs SET timestamp = replace(timestamp, 'T', ' ')
+        WHERE timestamp GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T*'
+    """)
+    # GROUP BY source (analytics, crawler summary) and WHERE source = ? ORDER BY timestamp (crawler)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_source_timestamp ON jobs (source, timestamp)')
+    # ORDER BY timestamp DESC (applications)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_timestamp ON jobs (timestamp)')
+    # GROUP BY link duplicate report (crawler)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_link ON jobs (link)')
+    # The (user, job_id) primary key doubles as the index for WHERE user = ? and the saved jobs join
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS saved_jobs (
+            user TEXT,
+            job_id TEXT,
+            PRIMARY KEY (user, job_id)
+        )
+    """)
+    conn.execute('ANALYZE')
+
+
+def _full_text_index(conn):
+    # External-content FTS5 index: the text lives only in jobs, jobs_fts maps rowids to tokens.
+    # jobs has no INTEGER PRIMARY KEY, so a VACUUM may renumber rowids; run
+    # rebuild_search_index() after one.
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                title, company, location, description,
+                content='jobs', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: text filters fall back to scanning in pandas
+        logging.warning(f"Full-text search unavailable: {e}")
+        return
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, company, location, description)
+            VALUES (new.rowid, new.title, new.company, new.location, new.description);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description)
+            VALUES ('delete', old.rowid, old.title, old.company, old.location, old.description);
+        END
+    """)
+    # Only text edits touch the index; upserts that bump last_seen do not
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, location, description ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description)
+            VALUES ('delete', old.rowid, old.title, old.company, old.location, old.description);
+            INSERT INTO jobs_fts (rowid, title, company, location, description)
+            VALUES (new.rowid, new.title, new.company, new.location, new.description);
+        END
+    """)
+    rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn):
+    conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+
+
+def _posted_at(conn):
+    columns = _columns(conn, 'jobs')
+    if 'posted_at' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN posted_at INTEGER')
+    if 'scraped_at' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN scraped_at INTEGER')
+    # Backfill: last_seen is the best record of when a row was scraped, and relative
+    # timestamps ('3 days ago') are counted back from it
+    now = int(time.time())
+    conn.create_function('to_epoch', 2, to_epoch)
+    conn.execute('UPDATE jobs SET scraped_at = COALESCE(to_epoch(last_seen, ?), ?) WHERE scraped_at IS NULL', (now, now))
+    conn.execute('UPDATE jobs SET posted_at = COALESCE(to_epoch(timestamp, scraped_at), scraped_at) WHERE posted_at IS NULL')
+    # Date filters, newest-first ordering and keyset pagination now use posted_at
+    conn.execute('DROP INDEX IF EXISTS idx_jobs_timestamp')
+    conn.execute('DROP INDEX IF EXISTS idx_jobs_source_timestamp')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_posted_at ON jobs (posted_at, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_source_posted_at ON jobs (source, posted_at)')
+    conn.execute('ANALYZE')
+
+
+def _resumes(conn):
+    # Created here rather than by the Resume Manager page, whose reads go through query-only connections
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resumes (
+            user TEXT,
+            filename TEXT,
+            labels TEXT,
+            content BLOB,
+            PRIMARY KEY (user, filename)
+        )
+    """)
+
+
+def _redirect_link_keys(conn):
+    # Login-redirect links (Freelancer's /login?goto=...) all used to get the login page's key;
+    # give them their target's key, folding the ones whose target is already stored into that row
+    conn.create_function('canonical_link', 1, canonical_link, deterministic=True)
+    rows = conn.execute("SELECT id, canonical_link(link) FROM jobs WHERE link LIKE '%goto=%' ORDER BY rowid").fetchall()
+    conn.execute('CREATE TEMP TABLE duplicate_jobs (id TEXT, keep_id TEXT)')
+    for job_id, key in rows:
+        keep = conn.execute('SELECT id FROM jobs WHERE link_key = ? AND id <> ?', (key, job_id)).fetchone()
+        if keep is None:
+            conn.execute('UPDATE jobs SET link_key = ? WHERE id = ?', (key, job_id))
+        else:
+            conn.execute('INSERT INTO duplicate_jobs VALUES (?, ?)', (job_id, keep[0]))
+    if _table_exists(conn, 'saved_jobs'):
+        conn.execute("""
+            UPDATE OR IGNORE saved_jobs
+            SET job_id = (SELECT keep_id FROM duplicate_jobs WHERE duplicate_jobs.id = saved_jobs.job_id)
+            WHERE job_id IN (SELECT id FROM duplicate_jobs)
+        """)
+        conn.execute('DELETE FROM saved_jobs WHERE job_id IN (SELECT id FROM duplicate_jobs)')
+    removed = conn.execute('DELETE FROM jobs WHERE id IN (SELECT id FROM duplicate_jobs)').rowcount
+    conn.execute('DROP TABLE duplicate_jobs')
+    if removed:
+        rebuild_rollups(conn)
+    if rows:
+        logging.info(f"Re-keyed {len(rows) - removed} login-redirect links, removed {removed} duplicates")
+
+
+MIGRATIONS = [
+    (1, 'link-unique jobs table', _link_unique_jobs),
+    (2, 'indexes for the Streamlit and crawler queries', _query_indexes),
+    (3, 'full-text search index on jobs', _full_text_index),
+    (4, 'normalized posted_at/scraped_at epochs', _posted_at),
+    (5, 'resumes table', _resumes),
+    (6, 'analytics rollups', rebuild_rollups),
+    (7, 'login-redirect link keys', _redirect_link_keys),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, target=SCHEMA_VERSION):
+    """Bring the database up to ``target`` and return the resulting schema version."""
+    current = schema_version(conn)
+    for version, description, step in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        # Take the write lock up front and re-check, another process may have migrated meanwhile
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            logging.info(f"Applying migration {version}: {description}")
+            step(conn)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return schema_version(conn)
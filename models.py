@@ -1,8 +1,42 @@
 import sqlite3
-import pandas as pd
 from datetime import datetime
 import uuid
 import logging
+import time
+from scrapers.utils.job_helpers import canonical_link, to_epoch
+from migrations import migrate
+from rollups import update_rollups
+
+JOB_COLUMNS = ('id', 'title', 'description', 'link', 'company', 'source', 'timestamp', 'location', 'posted_at', 'scraped_at')
+# Columns written on insert: the job itself plus the dedupe key and when it was last scraped
+ROW_COLUMNS = JOB_COLUMNS + ('link_key', 'last_seen')
+
+# Jobs are unique by canonical link. Re-scraping a known posting keeps its original
+# row and id and only records that it was seen again.
+UPSERT_JOB_SQL = (
+    f'INSERT INTO jobs ({", ".join(ROW_COLUMNS)}) '
+    f'VALUES ({", ".join("?" for _ in ROW_COLUMNS)}) '
+    'ON CONFLICT(link_key) DO UPDATE SET last_seen = excluded.last_seen'
+)
+
+# Placeholder descriptions: rows stored with one of these still need their detail page
+MISSING_DESCRIPTIONS = ('', 'non')
+
+
+def described_links(conn, links):
+    """The links (as given) whose job row already has a real description."""
+    keys = {}
+    for link in links:
+        keys.setdefault(canonical_link(link), []).append(link)
+    found = set()
+    key_list = list(keys)
+    for start in range(0, len(key_list), 500):
+        chunk = key_list[start:start + 500]
+        found.update(row[0] for row in conn.execute(
+            f'SELECT link_key FROM jobs WHERE link_key IN ({", ".join("?" for _ in chunk)}) '
+            f'AND description NOT IN ({", ".join("?" for _ in MISSING_DESCRIPTIONS)})',
+            chunk + list(MISSING_DESCRIPTIONS)))
+    return {link for key in found for link in keys[key]}
 
 class Job:
     def __init__(self, title=None, description=None, link=None, company=None, source=None, timestamp=None, location=None):
@@ -12,8 +46,12 @@ class Job:
         self.link = link or 'non'
         self.company = company or 'non'
         self.source = source or 'non'
-        self.timestamp = timestamp or datetime.now().isoformat()
+        self.timestamp = timestamp or datetime.now().isoformat(sep=' ')
         self.location = location or 'non'
+        # Canonical UTC epochs: when we saw the job, and when it was posted (raw timestamp
+        # normalized once here, falling back to the scrape time when it can't be parsed)
+        self.scraped_at = int(time.time())
+        self.posted_at = to_epoch(self.timestamp, reference=self.scraped_at) or self.scraped_at
 
     def to_dict(self):
         return {
@@ -24,45 +62,91 @@ class Job:
             'company': self.company,
             'source': self.source,
             'timestamp': self.timestamp,
-            'location': self.location
+            'location': self.location,
+            'posted_at': self.posted_at,
+            'scraped_at': self.scraped_at
         }
 
 class DataStorage:
-    def __init__(self, output_format='sqlite', db_name='jobs.db'):
+    """SQLite job store.
+
+    With ``batch_size=1`` (the default) every ``add_job`` is written in its own
+    transaction. A larger ``batch_size`` turns on buffered mode: rows are kept in
+    memory and written with one ``executemany`` per transaction once the batch
+    is full, once ``flush_interval`` seconds have passed since the last flush,
+    or whenever ``flush()``/``close()`` is called. Use the storage as a context
+    manager so pending rows are flushed on exit.
+
+    ``journal_mode`` and ``synchronous`` are applied as PRAGMAs on connect, e.g.
+    ``journal_mode='WAL', synchronous='NORMAL'`` for the crawler's single writer.
+    """
+
+    def __init__(self, output_format='sqlite', db_name='jobs.db', batch_size=1, flush_interval=5.0,
+                 journal_mode=None, synchronous=None):
         self.jobs = []
+        self.pending = []
         self.output_format = output_format
         self.db_name = db_name
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
         self.conn = sqlite3.connect(self.db_name)
+        # WAL is persistent in the database file, so readers opened later benefit from it too
+        if journal_mode:
+            self.conn.execute(f'PRAGMA journal_mode={journal_mode}')
+        if synchronous:
+            self.conn.execute(f'PRAGMA synchronous={synchronous}')
         self.create_table()
 
     def create_table(self):
-        with self.conn:
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id TEXT PRIMARY KEY,
-                    title TEXT,
-                    description TEXT,
-                    link TEXT,
-                    company TEXT,
-                    source TEXT,
-                    timestamp TEXT,
-                    location TEXT
-                )
-            """)
+        migrate(self.conn)
 
     def add_job(self, job):
         job_dict = job.to_dict()
         self.jobs.append(job_dict)
+        row = tuple(job_dict[column] for column in JOB_COLUMNS)
+        self.pending.append(row + (canonical_link(job_dict['link']), datetime.now().isoformat(sep=' ')))
+        if len(self.pending) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows in a single transaction and return how many were written."""
+        count = len(self.pending)
+        if count:
+            with self.conn:
+                self.conn.executemany(UPSERT_JOB_SQL, self.pending)
+                update_rollups(self.conn, self._inserted(self.pending))
+            self.pending.clear()
+        self.last_flush = time.monotonic()
+        return count
+
+    def _inserted(self, rows):
+        """Rows of this batch that became new jobs; the others were upserts onto an existing link."""
+        inserted = set()
+        for start in range(0, len(rows), 500):
+            ids = [row[0] for row in rows[start:start + 500]]
+            inserted.update(row[0] for row in self.conn.execute(
+                f'SELECT id FROM jobs WHERE id IN ({", ".join("?" for _ in ids)})', ids))
+        return [dict(zip(ROW_COLUMNS, row)) for row in rows if row[0] in inserted]
+
+    def known_links(self, links):
+        """Links that are already stored with a description, so their detail pages can be skipped."""
+        self.flush()
+        return described_links(self.conn, links)
+
+    def update_descriptions(self, descriptions):
+        """Set the description of stored jobs from (link, description) pairs in one transaction."""
+        self.flush()
         with self.conn:
-            self.conn.execute(
-                'INSERT OR IGNORE INTO jobs (id, title, description, link, company, source, timestamp, location) '
-                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-                (job_dict['id'], job_dict['title'], job_dict['description'], 
-                 job_dict['link'], job_dict['company'], job_dict['source'], job_dict['timestamp'], job_dict['location'])
-            )
+            cursor = self.conn.executemany(
+                'UPDATE jobs SET description = ? WHERE link_key = ?',
+                [(description, canonical_link(link)) for link, description in descriptions])
+        return cursor.rowcount
 
     def save(self):
+        self.flush()
         if self.output_format == 'csv':
+            import pandas as pd
             df = pd.DataFrame(self.jobs)
             filename = f'job_listings_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
             df.to_csv(filename, index=False)
@@ -75,5 +159,20 @@ class DataStorage:
             logging.info(f"Data saved to {filename}")
         logging.info(f"Data saved to {self.db_name}")
 
+    def close(self):
+        if getattr(self, 'conn', None) is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def __del__(self):
-        self.conn.close() 
\ No newline at end of file
+        self.close()
@@ -0,0 +1,320 @@
+"""
+Staged streaming crawl: fetch -> parse -> normalize/dedupe -> persist.
+
+Instead of every scraper fetching, parsing and storing its pages in one loop,
+the pages of all sources flow through shared stages, each with its own worker
+threads and connected by bounded queues, so page loads, parsing and database
+writes overlap. A stage that falls behind fills its inbox and the stage feeding
+it blocks (backpressure) instead of buffering without limit.
+
+- fetch (CRAWL_FETCH_WORKERS): the source's PageFetcher, so pacing, caching,
+  network capture and record/replay apply as in the scrapers
+- parse (CRAWL_PARSE_WORKERS): the scraper's parse_page(html); an HTTP page that
+  parses to nothing and looks blocked goes back to fetch once for the browser, and
+  an empty page ends that source's results, so its later pages are skipped. With
+  CRAWL_PARSE_PROCESSES the parsing itself runs in a process pool
+  (scrapers/parse_pool.py) and the stage's threads only hand pages to it
+- normalize (CRAWL_NORMALIZE_WORKERS): builds Job objects and drops postings
+  already seen in this run (by canonical link)
+- persist: the ingest JobWriter, the single writer connection
+
+A scraper plugs in with its parse_page and its fetch plan: fetch_plan(max_pages)
+if it has one, page_url(0..max_pages-1) otherwise, plus the fetch settings it
+already declares (needs_js, listing_selector, cache_ttl, browser_fallback,
+capture). A scraper with an enrich(fetcher, stubs) stage runs it on its stored
+jobs once the pipeline has drained. Per-stage throughput, busy and blocked time
+and queue depths are reported by CrawlPipeline.report().
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+
+from models import Job
+from scrapers.fetch import PageFetcher, looks_blocked
+from scrapers.parse_pool import PARSE_PROCESSES, ParsePool
+from scrapers.utils.job_helpers import canonical_link
+
+FETCH_WORKERS = int(os.environ.get('CRAWL_FETCH_WORKERS', '8'))
+PARSE_WORKERS = int(os.environ.get('CRAWL_PARSE_WORKERS', '2'))
+NORMALIZE_WORKERS = int(os.environ.get('CRAWL_NORMALIZE_WORKERS', '1'))
+# Items each stage's inbox holds before the stage feeding it blocks
+QUEUE_SIZE = int(os.environ.get('CRAWL_STAGE_QUEUE', '64'))
+
+_STOP = object()
+_WAKE = object()
+
+
+def supports(scraper_class):
+    """Whether a scraper can run as a pipeline source (it has a parse function and a fetch plan)."""
+    return hasattr(scraper_class, 'parse_page') and (
+        hasattr(scraper_class, 'fetch_plan') or hasattr(scraper_class, 'page_url'))
+
+
+class Stage:
+    """A pool of worker threads taking items from a bounded inbox.
+
+    handle(item, emit) processes one item and passes results on with emit(),
+    which blocks while the next stage's inbox is full.
+    """
+
+    def __init__(self, name, handle, workers=1, maxsize=QUEUE_SIZE):
+        self.name = name
+        self.handle = handle
+        self.workers = max(1, workers)
+        self.inbox = queue.Queue(maxsize=maxsize)
+        # Items sent back to this stage by a later one; taken before new work and never blocks
+        self.retries = queue.Queue()
+        self.downstream = None
+        self.threads = []
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.emitted = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.max_depth = 0
+        self.started = None
+        self.finished = None
+
+    def put(self, item):
+        self.inbox.put(item)
+        depth = self.inbox.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def requeue(self, item):
+        self.retries.put(item)
+        try:
+            # Wake a worker that is waiting on an empty inbox
+            self.inbox.put_nowait(_WAKE)
+        except queue.Full:
+            pass
+
+    def emit(self, item):
+        start = time.perf_counter()
+        self.downstream(item)
+        with self.lock:
+            self.emitted += 1
+            self.blocked += time.perf_counter() - start
+
+    def start(self):
+        self.started = time.monotonic()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'{self.name}-{i}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _next(self):
+        try:
+            return self.retries.get_nowait()
+        except queue.Empty:
+            return self.inbox.get()
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is _STOP:
+                break
+            if item is _WAKE:
+                continue
+            start = time.perf_counter()
+            try:
+                self.handle(item, self.emit)
+            except Exception as e:
+                logging.error(f"Pipeline {self.name} stage failed on {item}: {e}")
+            with self.lock:
+                self.processed += 1
+                self.busy += time.perf_counter() - start
+
+    def close(self):
+        """Stop the workers once they have drained the inbox."""
+        for _ in self.threads:
+            self.inbox.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+        self.finished = time.monotonic()
+
+    def stats(self):
+        elapsed = ((self.finished or time.monotonic()) - self.started) if self.started else 0.0
+        # Time spent waiting on a full downstream inbox is not work
+        working = max(0.0, self.busy - self.blocked)
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'emitted': self.emitted,
+            'per_s': round(self.processed / elapsed, 1) if elapsed else 0.0,
+            'busy_s': round(working, 2),
+            'blocked_s': round(self.blocked, 2),
+            'utilization': round(working / (elapsed * self.workers), 3) if elapsed else 0.0,
+            'max_queue_depth': self.max_depth,
+        }
+
+
+class Page:
+    def __init__(self, source, index, url):
+        self.source = source
+        self.index = index
+        self.url = url
+        self.browser = False
+        self.html = None
+        self.items = None
+
+    def __repr__(self):
+        return f'{self.source.name} page {self.index + 1}'
+
+
+class Source:
+    """One scraper feeding the pipeline."""
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.name = type(scraper).__name__.replace('Scraper', '')
+        self.fetcher = PageFetcher(
+            self.name, needs_js=getattr(scraper, 'needs_js', False), proxy=getattr(scraper, 'proxy', None),
+            wait_selector=getattr(scraper, 'listing_selector', None),
+            browser_fallback=getattr(scraper, 'browser_fallback', True),
+            cache_ttl=getattr(scraper, 'cache_ttl', None), capture=getattr(scraper, 'capture', None))
+        # Index of the first empty page; later pages are past the end of the results
+        self.end = float('inf')
+        self.stubs = [] if hasattr(scraper, 'enrich') else None
+        self.pages = self.jobs = self.duplicates = self.errors = 0
+
+    def plan(self, max_pages):
+        if hasattr(self.scraper, 'fetch_plan'):
+            return self.scraper.fetch_plan(max_pages)
+        return [self.scraper.page_url(page) for page in range(max_pages)]
+
+
+class CrawlPipeline:
+    def __init__(self, scrapers, writer, max_pages=5, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS,
+                 normalize_workers=NORMALIZE_WORKERS, queue_size=QUEUE_SIZE, parse_processes=PARSE_PROCESSES):
+        self.sources = [Source(scraper) for scraper in scrapers]
+        self.writer = writer
+        self.max_pages = max_pages
+        self.parse_pool = ParsePool(parse_processes) if parse_processes else None
+        if self.parse_pool is not None:
+            # Two pages in flight per process, so a worker isn't idle while the last result comes back
+            parse_workers = max(parse_workers, 2 * self.parse_pool.processes)
+        self.fetch = Stage('fetch', self._fetch, fetch_workers, queue_size)
+        self.parse = Stage('parse', self._parse, parse_workers, queue_size)
+        self.normalize = Stage('normalize', self._normalize, normalize_workers, queue_size)
+        self.fetch.downstream = self.parse.put
+        self.parse.downstream = self.normalize.put
+        self.normalize.downstream = writer.put
+        self.stages = (self.fetch, self.parse, self.normalize)
+        self.seen = set()
+        self.seen_lock = threading.Lock()
+        self.outstanding = 0
+        self.cond = threading.Condition()
+        self.elapsed = 0.0
+
+    def _done(self, page):
+        with self.cond:
+            self.outstanding -= 1
+            self.cond.notify_all()
+
+    def _fetch(self, page, emit):
+        source = page.source
+        if page.index >= source.end:
+            self._done(page)
+            return
+        try:
+            if not page.browser:
+                page.items = source.fetcher.capture_items(page.url)
+            if page.items is None:
+                page.html = source.fetcher.fetch(page.url, kind='listing', browser=page.browser)
+        except Exception as e:
+            with self.cond:
+                source.errors += 1
+            logging.error(f"{page} failed: {e}")
+            self._done(page)
+            return
+        emit(page)
+
+    def _parse(self, page, emit):
+        source = page.source
+        try:
+            if page.items is not None:
+                items = page.items
+            elif self.parse_pool is not None:
+                items = self.parse_pool.parse(source.name, page.html)
+            else:
+                items = source.scraper.parse_page(page.html)
+            if (not items and page.html is not None and not page.browser and source.fetcher.falls_back()
+                    and looks_blocked(page.html)):
+                source.fetcher.reject(page.url)
+                logging.info(f"{source.name}: no listings over HTTP for {page.url}; fetching it in the browser")
+                page.browser, page.html = True, None
+                self.fetch.requeue(page)
+                return
+            with self.cond:
+                source.pages += 1
+                if not items:
+                    # The results ran out: don't fetch this source's later pages
+                    source.end = min(source.end, page.index)
+            logging.info(f"{source.name} page {page.index + 1}: {len(items)} jobs found ({page.url})")
+            for job in items:
+                emit((source, job))
+        except Exception:
+            self._done(page)
+            raise
+        self._done(page)
+
+    def _normalize(self, item, emit):
+        source, fields = item
+        key = canonical_link(fields.get('link'))
+        with self.seen_lock:
+            if key is not None:
+                if key in self.seen:
+                    source.duplicates += 1
+                    return
+                self.seen.add(key)
+            source.jobs += 1
+            if source.stubs is not None:
+                source.stubs.append(fields)
+        emit(Job(**fields))
+
+    def run(self):
+        started = time.monotonic()
+        if self.parse_pool is not None:
+            self.parse_pool.start()
+        for stage in self.stages:
+            stage.start()
+        try:
+            # Sources are interleaved page by page so one slow site doesn't hold up the others' first pages
+            plans = [(source, source.plan(self.max_pages)) for source in self.sources]
+            for index in range(max((len(urls) for _, urls in plans), default=0)):
+                for source, urls in plans:
+                    if index < len(urls):
+                        with self.cond:
+                            self.outstanding += 1
+                        self.fetch.put(Page(source, index, urls[index]))
+            with self.cond:
+                while self.outstanding:
+                    self.cond.wait()
+        finally:
+            for stage in self.stages:
+                stage.close()
+            if self.parse_pool is not None:
+                self.parse_pool.close()
+        for source in self.sources:
+            if source.stubs:
+                try:
+                    source.scraper.enrich(source.fetcher, source.stubs)
+                except Exception as e:
+                    logging.error(f"{source.name} enrichment failed: {e}")
+            source.fetcher.close()
+        self.writer.storage().flush()
+        self.elapsed = time.monotonic() - started
+
+    def report(self):
+        return {
+            'elapsed_s': round(self.elapsed, 2),
+            'parse_processes': self.parse_pool.processes if self.parse_pool is not None else 0,
+            'stages': {stage.name: stage.stats() for stage in self.stages},
+            'sources': {source.name: {'pages': source.pages, 'jobs': source.jobs,
+                                      'duplicates': source.duplicates, 'errors': source.errors}
+                        for source in self.sources},
+        }
@@ -0,0 +1,98 @@
+"""
+Pre-aggregated analytics rollups.
+
+The Analytics page reads these small tables instead of grouping the whole jobs
+table on every view:
+
+- rollup_source_day: jobs per source per UTC posting day (totals, per-source
+  counts and the daily trend charts)
+- rollup_title, rollup_company, rollup_location: jobs per value (top-10 lists)
+
+DataStorage.flush() calls update_rollups() with the rows a batch actually
+inserted, in the same transaction, so the rollups move with the data. If they
+drift (rows deleted or edited by hand), rebuild them from scratch:
+
+    python rollups.py rebuild [path/to/jobs.db]
+"""
+
+import logging
+import sqlite3
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+# rollup table -> jobs column it counts
+VALUE_ROLLUPS = {
+    'rollup_title': 'title',
+    'rollup_company': 'company',
+    'rollup_location': 'location',
+}
+
+
+def create_rollup_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_source_day (
+            source TEXT,
+            day TEXT,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (source, day)
+        )
+    """)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_rollup_source_day_day ON rollup_source_day (day)')
+    for table, column in VALUE_ROLLUPS.items():
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({column} TEXT PRIMARY KEY, count INTEGER NOT NULL)')
+        # Top-N reads walk this index and stop after N rows
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_count ON {table} (count)')
+
+
+def _day(posted_at):
+    return datetime.fromtimestamp(int(posted_at), timezone.utc).strftime('%Y-%m-%d')
+
+
+def update_rollups(conn, jobs):
+    """Add newly inserted jobs (dicts with source, posted_at, title, company and location) to the rollups."""
+    if not jobs:
+        return
+    by_source_day = Counter((job['source'], _day(job['posted_at'])) for job in jobs)
+    conn.executemany("""
+        INSERT INTO rollup_source_day (source, day, count) VALUES (?, ?, ?)
+        ON CONFLICT(source, day) DO UPDATE SET count = count + excluded.count
+    """, [(source, day, count) for (source, day), count in by_source_day.items()])
+    for table, column in VALUE_ROLLUPS.items():
+        counts = Counter(job[column] for job in jobs)
+        conn.executemany(f"""
+            INSERT INTO {table} ({column}, count) VALUES (?, ?)
+            ON CONFLICT({column}) DO UPDATE SET count = count + excluded.count
+        """, list(counts.items()))
+
+
+def rebuild_rollups(conn):
+    """Recompute every rollup from the jobs table (caller handles the transaction)."""
+    create_rollup_tables(conn)
+    conn.execute('DELETE FROM rollup_source_day')
+    conn.execute("""
+        INSERT INTO rollup_source_day (source, day, count)
+        SELECT source, date(posted_at, 'unixepoch'), COUNT(*) FROM jobs GROUP BY 1, 2
+    """)
+    for table, column in VALUE_ROLLUPS.items():
+        conn.execute(f'DELETE FROM {table}')
+        conn.execute(f'INSERT INTO {table} ({column}, count) SELECT {column}, COUNT(*) FROM jobs GROUP BY 1')
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != 'rebuild':
+        print('Usage: python rollups.py rebuild [path/to/jobs.db]')
+        sys.exit(1)
+    db_name = sys.argv[2] if len(sys.argv) > 2 else 'jobs.db'
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    conn = sqlite3.connect(db_name)
+    try:
+        with conn:
+            rebuild_rollups(conn)
+        logging.info(f"Rebuilt analytics rollups in {db_name}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
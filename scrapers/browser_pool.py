@@ -0,0 +1,286 @@
+"""
+Warm pool of WebDriver instances shared by the scrapers and the appliers.
+
+Starting Chrome and chromedriver takes seconds and hundreds of MB, so drivers are
+leased from a named pool and returned to it instead of being built and quit for
+every scrape or application. Between leases a driver is reset (extra tabs
+closed, cookies cleared unless the pool keeps per-source state) and health
+checked; it is recycled after max_uses leases or once its process tree grows past
+max_rss_mb (measured with psutil when it is installed).
+
+    pool = get_pool('scrapers', factory=chrome_factory(headless=True))
+    with pool.lease() as driver:
+        driver.get(url)
+
+Pools are shut down by shutdown_all(), which also runs at interpreter exit.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+POOL_SIZE = int(os.environ.get('CRAWL_BROWSERS', '3'))
+MAX_USES = int(os.environ.get('CRAWL_BROWSER_MAX_USES', '50'))
+MAX_RSS_MB = float(os.environ.get('CRAWL_BROWSER_MAX_RSS_MB', '1024'))
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+
+
+def chrome_factory(headless=True, proxy=None, extra_args=(), performance_log=False):
+    """Factory building a selenium Chrome driver.
+
+    Headless drivers get the flags the scrapers have always used; visible ones (the
+    appliers) start with Chrome's defaults plus extra_args. performance_log turns on
+    the network events scrapers/network_capture.py reads.
+    """
+    def create():
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        options = Options()
+        if headless:
+            options.add_argument('--headless')
+            options.add_argument('--disable-gpu')
+            options.add_argument('--disable-dev-shm-usage')
+            options.add_argument('--no-sandbox')
+            options.add_argument(f'user-agent={USER_AGENT}')
+            options.add_argument('--disable-webrtc')
+        if proxy:
+            options.add_argument(f'--proxy-server={proxy}')
+        for arg in extra_args:
+            options.add_argument(arg)
+        if performance_log:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return webdriver.Chrome(options=options)
+    return create
+
+
+def driver_rss_mb(driver):
+    """Resident memory of chromedriver and the browser processes it started, or None without psutil."""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        return sum(p.memory_info().rss for p in [process] + process.children(recursive=True)) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class PooledDriver:
+    """Bookkeeping for one driver in a pool."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created = time.monotonic()
+
+
+class BrowserPool:
+    def __init__(self, name, factory, size=POOL_SIZE, max_uses=MAX_USES, max_rss_mb=MAX_RSS_MB, keep_state=False):
+        self.name = name
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        # keep_state: leave cookies and storage in place between leases, e.g. to stay logged in to one source
+        self.keep_state = keep_state
+        self.idle = []
+        self.leased = {}
+        # Drivers being started, health-checked, reset or quit: neither idle nor leased, but alive
+        self.busy = 0
+        self.closed = False
+        self.cond = threading.Condition()
+        self.metrics = {
+            'leases': 0,
+            'lease_wait_total_s': 0.0,
+            'lease_wait_max_s': 0.0,
+            'created': 0,
+            'recycled': 0,
+            'unhealthy': 0,
+            'reuses': 0,
+        }
+
+    # Leasing
+
+    def acquire(self, timeout=None):
+        """Lease a driver, starting one if the pool has room; blocks while all are leased."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            with self.cond:
+                while True:
+                    if self.closed:
+                        raise RuntimeError(f"Browser pool {self.name} is shut down")
+                    if self.idle:
+                        entry = self.idle.pop()
+                        break
+                    if len(self.leased) + self.busy < self.size:
+                        entry = None
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No browser free in pool {self.name} after {timeout}s")
+                    self.cond.wait(remaining)
+                # Counted against size until it is leased or quit
+                self.busy += 1
+            if entry is None:
+                try:
+                    entry = PooledDriver(self.factory())
+                except Exception:
+                    self._done_with(None)
+                    raise
+                with self.cond:
+                    self.metrics['created'] += 1
+            elif not self._healthy(entry):
+                self._quit(entry)
+                with self.cond:
+                    self.metrics['unhealthy'] += 1
+                self._done_with(None)
+                continue
+            break
+        waited = time.monotonic() - start
+        with self.cond:
+            self.busy -= 1
+            self.leased[id(entry.driver)] = entry
+            self.metrics['leases'] += 1
+            self.metrics['lease_wait_total_s'] += waited
+            self.metrics['lease_wait_max_s'] = max(self.metrics['lease_wait_max_s'], waited)
+            if entry.uses:
+                self.metrics['reuses'] += 1
+        return entry.driver
+
+    def _done_with(self, entry):
+        """A busy driver is settled: back to idle (entry) or gone (None); either frees its slot."""
+        with self.cond:
+            self.busy -= 1
+            keep = entry is not None and not self.closed
+            if keep:
+                self.idle.append(entry)
+            self.cond.notify()
+        if entry is not None and not keep:
+            self._quit(entry)
+
+    def release(self, driver):
+        """Return a leased driver; it is reset for the next lease or recycled."""
+        with self.cond:
+            entry = self.leased.pop(id(driver), None)
+            if entry is None:
+                return
+            # Still counted against size while it is reset or quit
+            self.busy += 1
+        entry.uses += 1
+        recycle = self.closed or entry.uses >= self.max_uses
+        if not recycle:
+            rss = driver_rss_mb(driver)
+            if rss is not None and rss > self.max_rss_mb:
+                logging.info(f"Browser pool {self.name}: recycling driver at {rss:.0f} MB after {entry.uses} uses")
+                recycle = True
+        if not recycle and not self._reset(entry):
+            with self.cond:
+                self.metrics['unhealthy'] += 1
+            recycle = True
+        if recycle:
+            with self.cond:
+                self.metrics['recycled'] += 1
+            self._quit(entry)
+            entry = None
+        self._done_with(entry)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    # Driver upkeep
+
+    def _healthy(self, entry):
+        try:
+            entry.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, entry):
+        driver = entry.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            if not self.keep_state:
+                driver.delete_all_cookies()
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            logging.warning(f"Browser pool {self.name}: reset failed: {e}")
+            return False
+
+    def _quit(self, entry):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self.cond:
+            stats = dict(self.metrics)
+            stats['idle'] = len(self.idle)
+            stats['leased'] = len(self.leased)
+            stats['busy'] = self.busy
+            stats['uses_per_driver'] = [entry.uses for entry in self.idle]
+        stats['lease_wait_avg_s'] = round(stats['lease_wait_total_s'] / stats['leases'], 3) if stats['leases'] else 0.0
+        stats['lease_wait_total_s'] = round(stats['lease_wait_total_s'], 3)
+        stats['lease_wait_max_s'] = round(stats['lease_wait_max_s'], 3)
+        return stats
+
+    def shutdown(self):
+        """Quit the idle drivers now; drivers still leased are quit when they are returned."""
+        with self.cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, factory=None, **kwargs):
+    """The named pool, created on first use with the given factory (headless Chrome by default)."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None or pool.closed:
+            pool = BrowserPool(name, factory or chrome_factory(), **kwargs)
+            _pools[name] = pool
+        return pool
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
+
+def shutdown_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+        logging.info(f"Browser pool {pool.name} stats: {pool.stats()}")
+
+
+atexit.register(shutdown_all)
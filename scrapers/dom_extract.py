@@ -0,0 +1,55 @@
+"""
+Bulk extraction from a live browser page in one WebDriver round trip.
+
+Every find_element, .text or get_attribute call is a separate HTTP request to
+chromedriver, so reading a few fields from each of a hundred cards costs hundreds
+of round trips. The helpers here run a single execute_script that walks the DOM
+in the page and returns everything as one JSON value:
+
+- extract_cards(driver, spec) evaluates a CardSpec (scrapers/parsing.py) against
+  the live DOM and returns the same list of dicts spec.parse(html) would
+- extract_feed(driver, root_xpath, link_selector) returns the text of a feed
+  container and the href of every matching link, for feeds that are parsed as text
+"""
+
+EXTRACT_CARDS_JS = """
+const [cardSelector, fields] = arguments;
+const value = (el, attr) => el === null ? null : (attr ? el.getAttribute(attr) : el.innerText.trim());
+return Array.from(document.querySelectorAll(cardSelector), card => {
+    const out = {};
+    for (const [name, selector, attr, many] of fields) {
+        if (many) {
+            out[name] = Array.from(selector ? card.querySelectorAll(selector) : [card], el => value(el, attr));
+        } else {
+            out[name] = value(selector ? card.querySelector(selector) : card, attr);
+        }
+    }
+    return out;
+});
+"""
+
+EXTRACT_FEED_JS = """
+const [rootXPath, linkSelector] = arguments;
+const roots = document.evaluate(rootXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const root = roots.snapshotLength ? roots.snapshotItem(roots.snapshotLength - 1) : null;
+return {
+    text: root === null ? null : root.innerText,
+    links: Array.from(document.querySelectorAll(linkSelector), a => a.href),
+};
+"""
+
+
+def extract_cards(driver, spec):
+    """Field values of every card matching spec.card_selector on the current page, in page order."""
+    fields = [[name, field.selector, field.attr, field.many] for name, field in spec.fields.items()]
+    cards = driver.execute_script(EXTRACT_CARDS_JS, spec.card_selector, fields) or []
+    for card in cards:
+        for name, field in spec.fields.items():
+            if not field.many:
+                card[name] = card[name] or field.default
+    return cards
+
+
+def extract_feed(driver, root_xpath, link_selector):
+    """{'text': text of the last element matching root_xpath (None if absent), 'links': absolute hrefs}."""
+    return driver.execute_script(EXTRACT_FEED_JS, root_xpath, link_selector)
@@ -0,0 +1,419 @@
+"""
+Page fetching for the scrapers: plain HTTP first, a headless browser only when needed.
+
+Most job boards render their listing pages on the server, so a keep-alive HTTP
+session gets the same HTML as Chrome at a fraction of the time and memory. A
+scraper declares `needs_js` for pages that only exist after scripts run; for the
+others PageFetcher uses HTTP and falls back to the browser for a page only when
+the HTTP response fails or its content check does not pass: it has no listings
+and looks like a bot wall or a client-rendered shell (looks_blocked). A results
+page that simply has no cards left is the end of the results, not a failure.
+
+Requests are paced by the per-host controllers in scrapers/throttle.py and failed
+pages are retried with its RetryPolicy; fetch_pages() fetches a scraper's pages
+in parallel within those limits. HTTP responses go through the on-disk page cache
+(scrapers/page_cache.py). Pages can be recorded to, and replayed from, an
+archive (scrapers/replay.py).
+"""
+
+import collections
+import concurrent.futures
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scrapers.browser_pool import USER_AGENT, chrome_factory, get_pool
+from scrapers.page_cache import cached_get, get_cache
+from scrapers.replay import get_recorder, get_replayer
+from scrapers.throttle import THROTTLE_STATUSES, RetryPolicy, get_controller
+
+# 'auto': HTTP with browser fallback, 'http': never start a browser, 'browser': always use the browser
+FETCH_MODE = os.environ.get('CRAWL_FETCH', 'auto')
+HTTP_TIMEOUT = float(os.environ.get('CRAWL_HTTP_TIMEOUT', '30'))
+# Keep-alive connections kept per host
+HTTP_POOL_SIZE = int(os.environ.get('CRAWL_HTTP_POOL', '10'))
+# Pages of one scraper fetched at once; the host's controller decides how many actually run
+PAGE_WORKERS = int(os.environ.get('CRAWL_PAGE_WORKERS', '4'))
+# Detail pages of one scraper fetched at once, bounded the same way
+DETAIL_WORKERS = int(os.environ.get('CRAWL_DETAIL_WORKERS', '8'))
+
+# Challenge pages of the common bot-protection services, in the markup or the visible text
+BLOCK_MARKUP = re.compile(r'cf-chl|challenge-platform|/cdn-cgi/challenge|px-captcha|captcha-delivery|_Incapsula_Resource')
+BLOCK_TEXT = re.compile(r'just a moment|access denied|are you a robot|verify you are (a )?human|unusual traffic'
+                        r'|enable javascript and cookies', re.IGNORECASE)
+# Visible characters below which a page is a client-rendered shell rather than a results page
+MIN_PAGE_TEXT = 500
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def looks_blocked(html):
+    """Whether a response without listings is a bot wall or an empty shell, not a results page past the end."""
+    if not html or BLOCK_MARKUP.search(html):
+        return True
+    text = ' '.join(re.sub(r'(?is)<(script|style|noscript)\b.*?</\1>|<[^>]+>', ' ', html).split())
+    return len(text) < MIN_PAGE_TEXT or bool(BLOCK_TEXT.search(text[:2000]))
+
+
+def get_session():
+    """Process-wide requests.Session with pooled keep-alive connections and retries."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Only reconnect once on a dropped keep-alive connection here; status-based retries
+            # go through RetryPolicy so the host's controller sees them
+            retry = Retry(total=1, connect=1, read=0, status=0, backoff_factor=0)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Accept-Encoding': 'gzip, deflate',
+            })
+            _session = session
+        return _session
+
+
+def http_get(url, **kwargs):
+    """GET through the shared session within the host's rate and concurrency limits.
+
+    Returns the response after raise_for_status(); the outcome is fed back to the
+    host's controller.
+    """
+    controller = get_controller(url)
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    with controller.slot():
+        try:
+            response = get_session().get(url, **kwargs)
+        except requests.RequestException:
+            controller.record('error')
+            raise
+    if response.status_code in THROTTLE_STATUSES:
+        controller.record('throttled')
+    elif response.ok:
+        controller.record('ok')
+    else:
+        controller.record('error')
+    response.raise_for_status()
+    return response
+
+
+class BrowserFetcher:
+    """Headless Chrome leased from the shared browser pool for each page."""
+
+    def __init__(self, proxy=None):
+        self.proxy = proxy
+        # Drivers are started with the proxy baked into their options, so each proxy gets its own pool
+        self.pool_name = f'scrapers:{proxy}' if proxy else 'scrapers'
+
+    def fetch(self, url, wait_selector=None, stats=None):
+        # Imported here so HTTP-only runs never load selenium
+        from scrapers import waits
+        pool = get_pool(self.pool_name, factory=chrome_factory(headless=True, proxy=self.proxy))
+        with get_controller(url).slot(), pool.lease() as driver:
+            started = time.monotonic()
+            driver.get(url)
+            if wait_selector:
+                if not waits.wait_for_listings(driver, wait_selector):
+                    logging.warning(f"Timed out waiting for {wait_selector} on {url}")
+            else:
+                waits.wait_for_ready_state(driver)
+                waits.wait_for_quiet_dom(driver)
+            waits.politeness_floor(started)
+            if stats is not None:
+                stats.record(time.monotonic() - started)
+            return driver.page_source
+
+    def capture(self, url, spec):
+        """Jobs from the listing payloads the page fetches while loading (see network_capture)."""
+        from scrapers import network_capture
+        # Performance logging is a launch option, so capturing drivers live in their own pool
+        pool = get_pool(f'{self.pool_name}:capture',
+                        factory=chrome_factory(headless=True, proxy=self.proxy, performance_log=True))
+        with get_controller(url).slot(), pool.lease() as driver:
+            network_capture.clear(driver)
+            driver.get(url)
+            return network_capture.collect(driver, spec)
+
+    def close(self):
+        # The drivers belong to the pool and stay warm for the next scraper
+        pass
+
+
+class PageFetcher:
+    """Fetches a scraper's pages over HTTP, falling back to the browser per page.
+
+    fetch_items(url, parse) runs `parse(html)` on the HTTP response; an error, or an
+    empty result from a page that looks_blocked, counts as a failed content check
+    and the page is fetched again in the browser (unless browser_fallback is off). Throttled pages (429) are retried
+    with backoff instead. With a CaptureSpec and capture turned on for the source
+    (CRAWL_CAPTURE), listing pages are read from the JSON the page fetches instead,
+    falling back to the path above when nothing is captured. Counters of pages
+    served by each path are kept for the run log.
+    """
+
+    def __init__(self, name, needs_js=False, proxy=None, wait_selector=None, browser_fallback=True, cache_ttl=None,
+                 capture=None):
+        self.name = name
+        # CaptureSpec for network_capture; only used when CRAWL_CAPTURE includes this source
+        self.capture = capture
+        # Seconds a cached 'listing' or 'detail' page is used without asking the server (see page_cache)
+        self.cache_ttl = cache_ttl
+        self.needs_js = needs_js
+        self.wait_selector = wait_selector
+        self.browser_fallback = browser_fallback
+        self.proxies = {'http': proxy, 'https': proxy} if proxy else None
+        self.browser = BrowserFetcher(proxy=proxy)
+        self.retry = RetryPolicy()
+        self.stats = {'http': 0, 'browser': 0, 'fallbacks': 0, 'captured': 0}
+        self.stats_lock = threading.Lock()
+        self.wait_stats = None
+
+    def _count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def _use_http(self):
+        if FETCH_MODE == 'browser':
+            return False
+        return FETCH_MODE == 'http' or not self.needs_js
+
+    def _use_capture(self):
+        if self.capture is None or FETCH_MODE == 'http':
+            return False
+        from scrapers import network_capture
+        return network_capture.enabled(self.name)
+
+    def _can_fall_back(self):
+        return self.browser_fallback and FETCH_MODE != 'http'
+
+    def _http_text(self, url, kind):
+        fetched = {}
+
+        def fetch(url, headers):
+            response = http_get(url, proxies=self.proxies, headers=headers)
+            fetched['status'], fetched['headers'] = response.status_code, response.headers
+            return response
+
+        html = cached_get(url, kind=kind, ttl=self.cache_ttl, fetch=fetch)
+        self._record(kind, url, html, fetched.get('status', 200), fetched.get('headers'))
+        return html
+
+    def _record(self, kind, url, html, status=200, headers=None):
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record(self.name, kind, url, html, status, headers)
+
+    def fetch(self, url, kind='detail', browser=False):
+        """Raw HTML of a page, over HTTP unless the scraper needs JS (or browser is set)."""
+        replayer = get_replayer()
+        if replayer is not None:
+            return replayer.body(url)
+        return self.retry.call(self._fetch_once, url, kind, browser, label=f"{self.name} {url}")
+
+    def _fetch_once(self, url, kind, browser=False):
+        if self._use_http() and not browser:
+            html = self._http_text(url, kind)
+            self._count('http')
+            return html
+        return self._browser_fetch(url, kind)
+
+    def fetch_items(self, url, parse):
+        """parse(html) for the page, re-fetched in the browser if HTTP yields nothing."""
+        replayer = get_replayer()
+        if replayer is not None:
+            return parse(replayer.body(url))
+        return self.retry.call(self._fetch_items_once, url, parse, label=f"{self.name} {url}")
+
+    def capture_items(self, url):
+        """Jobs captured from the page's network payloads, or None when capture is off or found nothing."""
+        if not self._use_capture():
+            return None
+        items = self.browser.capture(url, self.capture)
+        if items:
+            self._count('captured')
+            return items
+        logging.info(f"{self.name}: nothing captured from {url}; parsing the page instead")
+        return None
+
+    def reject(self, url):
+        """An HTTP response was a bot wall or a shell: drop it from the cache and tell the host's controller."""
+        # Don't keep serving a bot wall or an empty shell from the cache
+        cache = get_cache()
+        if cache is not None:
+            cache.discard(url)
+        # A bot wall means the host wants us to slow down
+        get_controller(url).record('empty')
+
+    def falls_back(self):
+        """Whether a listing page that came back blocked over HTTP is tried again in the browser."""
+        return self._use_http() and self._can_fall_back()
+
+    def _fetch_items_once(self, url, parse):
+        items = self.capture_items(url)
+        if items:
+            return items
+        if self._use_http():
+            try:
+                html = self._http_text(url, 'listing')
+                items = parse(html)
+                self._count('http')
+                if items or not looks_blocked(html):
+                    # No cards on a real results page: past the end, nothing to retry or slow down for
+                    return items
+                self.reject(url)
+                if not self._can_fall_back():
+                    return items
+                reason = 'the HTTP response looks like a bot wall or an empty shell'
+            except requests.HTTPError as e:
+                if (e.response is not None and e.response.status_code == 429) or not self._can_fall_back():
+                    raise
+                reason = str(e)
+            except requests.RequestException as e:
+                if not self._can_fall_back():
+                    raise
+                reason = str(e)
+            self._count('fallbacks')
+            logging.info(f"{self.name}: falling back to the browser for {url} ({reason})")
+        return parse(self._browser_fetch(url, 'listing'))
+
+    def fetch_pages(self, urls, parse, workers=PAGE_WORKERS):
+        """Fetch and parse several pages in parallel; yields (url, items, error) in the order of urls.
+
+        At most `workers` pages are in flight, and no page after one that parses to
+        nothing (the end of the results) is started.
+        """
+        def fetch_one(url):
+            try:
+                return url, self.fetch_items(url, parse), None
+            except Exception as e:
+                return url, None, e
+        urls = list(urls)
+        workers = max(1, min(workers, len(urls)))
+        ended = threading.Event()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            remaining = iter(urls)
+            while True:
+                while not ended.is_set() and len(pending) < workers:
+                    url = next(remaining, None)
+                    if url is None:
+                        break
+                    future = executor.submit(fetch_one, url)
+                    # Flag the end as soon as any page finds it, not when it reaches the front
+                    future.add_done_callback(lambda f: ended.set() if f.result()[2] is None and not f.result()[1] else None)
+                    pending.append(future)
+                if not pending:
+                    break
+                yield pending.popleft().result()
+
+    def fetch_sharded(self, page_url, parse, max_pages, shards=PAGE_WORKERS, page_size=None, key=None):
+        """Fetch pages 0..max_pages-1 of a paginated search on several workers at once.
+
+        Shard i fetches pages i, i+shards, i+2*shards, ... so all shards move through
+        the results front to back together. Yields (page, url, items, error) as pages
+        complete; with `key`, items only holds the ones whose key(item) no page
+        yielded before (the seen set is shared by all shards). A page that comes back
+        empty or shorter than page_size marks the end of the results, and so does one
+        whose keys all came from lower pages; no shard fetches beyond it. Pages finish
+        out of order, so a page is never judged against the higher pages that happened
+        to finish first.
+        """
+        seen = set()
+        # Lowest page each key was found on
+        first_page = {}
+        end = [max_pages]
+        lock = threading.Lock()
+        results = queue.Queue()
+
+        def shard(first):
+            try:
+                for page in range(first, max_pages, shards):
+                    with lock:
+                        if page >= end[0]:
+                            break
+                    url = page_url(page)
+                    try:
+                        items = self.fetch_items(url, parse)
+                    except Exception as e:
+                        results.put((page, url, None, e))
+                        continue
+                    with lock:
+                        repeated = False
+                        if key is not None:
+                            keys = [key(item) for item in items]
+                            repeated = bool(keys) and all(first_page.get(k, page) < page for k in keys)
+                            for k in keys:
+                                first_page[k] = min(first_page.get(k, page), page)
+                            fresh = []
+                            for k, item in zip(keys, items):
+                                if k not in seen:
+                                    seen.add(k)
+                                    fresh.append(item)
+                        else:
+                            fresh = items
+                        if not items or repeated or (page_size and len(items) < page_size):
+                            if page + 1 < end[0]:
+                                end[0] = page + 1
+                                logging.info(f"{self.name}: results end at page {page+1}, stopping all shards")
+                    results.put((page, url, fresh, None))
+            finally:
+                results.put(None)
+
+        shards = max(1, min(shards, max_pages))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=shards) as executor:
+            for first in range(shards):
+                executor.submit(shard, first)
+            running = shards
+            while running:
+                result = results.get()
+                if result is None:
+                    running -= 1
+                else:
+                    yield result
+
+    def fetch_details(self, urls, parse, workers=DETAIL_WORKERS):
+        """Fetch detail pages in parallel; yields (url, parse(html), error) as each one completes."""
+        def fetch_one(url):
+            try:
+                return url, parse(self.fetch(url, kind='detail')), None
+            except Exception as e:
+                return url, None, e
+        if not urls:
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as executor:
+            for future in concurrent.futures.as_completed([executor.submit(fetch_one, url) for url in urls]):
+                yield future.result()
+
+    def _browser_fetch(self, url, kind):
+        with self.stats_lock:
+            if self.wait_stats is None:
+                from scrapers.waits import WaitStats
+                self.wait_stats = WaitStats(self.name)
+        html = self.browser.fetch(url, wait_selector=self.wait_selector, stats=self.wait_stats)
+        self._count('browser')
+        self._record(kind, url, html)
+        return html
+
+    def close(self):
+        self.browser.close()
+        logging.info(f"{self.name} fetch stats: {self.stats}")
+        if self.wait_stats is not None:
+            self.wait_stats.log()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,66 +1,67 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
-import random
+from scrapers.parsing import CardSpec, Field
 import logging
+import os
+import time
 from models import Job
+from scrapers.fetch import PAGE_WORKERS, PageFetcher
+from scrapers.utils.job_helpers import canonical_link
+
+# Workers splitting LinkedIn's page range between them
+SHARDS = int(os.environ.get('CRAWL_LINKEDIN_SHARDS', str(PAGE_WORKERS)))
+
+CARDS = CardSpec('.job-search-card', strain={'class_': 'job-search-card'}, fields={
+    'title': Field('.base-search-card__title', default='Unknown'),
+    'description': Field('.job-search-card__snippet', default='Unknown'),
+    'link': Field('a', attr='href', default='Unknown'),
+    'company': Field('.base-search-card__subtitle', default='Unknown'),
+    'location': Field('.job-search-card__location', default='Unknown'),
+})
 
 class LinkedInScraper:
+    # The public job search is rendered on the server
+    needs_js = False
+    listing_selector = '.job-search-card'
+    # Cards per search page; a shorter page is the last one
+    page_size = 25
+
     def __init__(self, storage, query='software engineer', proxy=None):
         self.storage = storage
         self.query = query.replace(' ', '%20')
         self.base_url = 'https://www.linkedin.com/jobs/search/'
-        self.options = Options()
-        self.options.add_argument('--headless')
-        self.options.add_argument('--disable-gpu')
-        self.options.add_argument('--disable-dev-shm-usage')
-        self.options.add_argument('--no-sandbox')
-        self.options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        self.options.add_argument('--disable-webrtc')
-        if proxy:
-            self.options.add_argument(f'--proxy-server={proxy}')
+        self.proxy = proxy
+
+    def page_url(self, page):
+        return f"{self.base_url}?keywords={self.query}&start={page*25}"
+
+    def parse_page(self, html):
+        jobs = []
+        for card in CARDS.parse(html):
+            if card['title'] and card['link'] and card['company'] and card['location']:
+                jobs.append(dict(card, source='LinkedIn'))
+        return jobs
 
-    def scrape(self, max_pages=15):
-        driver = webdriver.Chrome(options=self.options)
-        try:
-            for page in range(max_pages):
-                url = f"{self.base_url}?keywords={self.query}&start={page*25}"
-                logging.info(f"Scraping LinkedIn page {page+1}: {url}")
-                driver.get(url)
-                time.sleep(random.uniform(3, 5))
-                try:
-                    load_more = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Show more')]"))
-                    )
-                    load_more.click()
-                    time.sleep(2)
-                except:
-                    pass
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                jobs_found = 0
-                for job in soup.select('.job-search-card'):
-                    title = job.select_one('.base-search-card__title') and job.select_one('.base-search-card__title').text.strip() or 'Unknown'
-                    description = job.select_one('.job-search-card__snippet') and job.select_one('.job-search-card__snippet').text.strip() or 'Unknown'
-                    link = job.select_one('a') and job.select_one('a')['href'] or 'Unknown'
-                    company = job.select_one('.base-search-card__subtitle') and job.select_one('.base-search-card__subtitle').text.strip() or 'Unknown'
-                    location = job.select_one('.job-search-card__location') and job.select_one('.job-search-card__location').text.strip() or 'Unknown'
-                    if title and link and company and location:
-                        job_data = Job(
-                            title=title,
-                            description=description,
-                            link=link,
-                            company=company,
-                            location=location,
-                            source='LinkedIn'
-                        )
-                        self.storage.add_job(job_data)
-                        jobs_found += 1
-                logging.info(f"LinkedIn page {page+1}: {jobs_found} jobs found")
-        except Exception as e:
-            logging.error(f"LinkedIn scraping error: {e}")
-        finally:
-            driver.quit() 
\ No newline at end of file
+    def scrape(self, max_pages=15, shards=SHARDS):
+        with PageFetcher('LinkedIn', needs_js=self.needs_js, proxy=self.proxy,
+                         wait_selector=self.listing_selector) as fetcher:
+            try:
+                # The page range is split across shards (paced per host by the fetch layer); postings
+                # LinkedIn repeats on later pages are dropped before they reach storage. Links carry
+                # per-load position/refId/trackingId params, so they are compared canonicalized
+                started = time.monotonic()
+                pages = total = 0
+                for page, url, jobs, error in fetcher.fetch_sharded(self.page_url, self.parse_page, max_pages,
+                                                                    shards=shards, page_size=self.page_size,
+                                                                    key=lambda job: canonical_link(job['link'])):
+                    if error is not None:
+                        logging.error(f"LinkedIn page {page+1} failed: {error}")
+                        continue
+                    for job in jobs:
+                        self.storage.add_job(Job(**job))
+                    pages += 1
+                    total += len(jobs)
+                    logging.info(f"LinkedIn page {page+1}: {len(jobs)} new jobs found ({url})")
+                    self.storage.flush()
+                logging.info(f"LinkedIn: {total} jobs from {pages} pages on {shards} shards "
+                             f"in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                logging.error(f"LinkedIn scraping error: {e}")
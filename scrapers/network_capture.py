@@ -0,0 +1,143 @@
+"""
+Network-payload capture: read listings from the JSON a board's own front end fetches.
+
+Boards that render their listings client-side fetch them as structured JSON
+first. With Chrome's performance log on (goog:loggingPrefs), every response the
+page receives shows up as a Network.responseReceived event; the ones whose URL
+matches a source's CaptureSpec are read back with the CDP Network.getResponseBody
+command and mapped straight to Job kwargs, so neither the rendered DOM nor its
+text has to be waited for and parsed.
+
+Capture is opt-in per source with CRAWL_CAPTURE (a comma-separated list of source
+names, or 'all'). A source whose capture comes back empty - the endpoint moved,
+the payload changed shape - falls back to its normal fetch and parse path.
+"""
+
+import base64
+import json
+import logging
+import os
+import re
+import time
+
+CAPTURE_SOURCES = {name.strip().lower() for name in os.environ.get('CRAWL_CAPTURE', '').split(',') if name.strip()}
+
+# Chrome capability that turns on the performance log capture reads from
+LOGGING_PREFS = {'performance': 'ALL'}
+
+
+def enabled(source):
+    return 'all' in CAPTURE_SOURCES or source.lower() in CAPTURE_SOURCES
+
+
+class CaptureSpec:
+    """Which responses carry a source's listings, and how to turn one into Job kwargs.
+
+    to_jobs(payload, url) gets the decoded JSON (or the text, for non-JSON bodies)
+    of one matching response and returns a list of Job kwarg dicts.
+    """
+
+    def __init__(self, source, url_pattern, to_jobs):
+        self.source = source
+        self.url_pattern = re.compile(url_pattern)
+        self.to_jobs = to_jobs
+
+    def matches(self, url):
+        return bool(self.url_pattern.search(url))
+
+
+def dig(record, *paths, default=None):
+    """First non-empty value among dotted paths ('client.location.country') of a nested dict."""
+    for path in paths:
+        value = record
+        for key in path.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+            if value is None:
+                break
+        if value not in (None, '', [], {}):
+            return value
+    return default
+
+
+def find_records(payload, *keys):
+    """Every dict anywhere in payload that has all of keys, outermost first."""
+    found = []
+    stack = [payload]
+    while stack:
+        value = stack.pop(0)
+        if isinstance(value, dict):
+            if all(key in value for key in keys):
+                found.append(value)
+            else:
+                stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return found
+
+
+def clear(driver):
+    """Drop buffered log entries, so a capture only sees the page loaded after this."""
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def _responses(driver, spec, seen):
+    """(request id, url, mime type) of newly received matching responses, and request ids finished loading."""
+    matched, finished = [], set()
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        params = message.get('params', {})
+        if message.get('method') == 'Network.responseReceived':
+            response = params.get('response', {})
+            url = response.get('url', '')
+            if params['requestId'] not in seen and response.get('status') == 200 and spec.matches(url):
+                seen.add(params['requestId'])
+                matched.append((params['requestId'], url, response.get('mimeType', '')))
+        elif message.get('method') == 'Network.loadingFinished':
+            finished.add(params.get('requestId'))
+    return matched, finished
+
+
+def _body(driver, request_id):
+    result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+    body = result.get('body', '')
+    if result.get('base64Encoded'):
+        body = base64.b64decode(body).decode('utf-8', errors='replace')
+    return body
+
+
+def collect(driver, spec, timeout=15.0, settle=1.0):
+    """Jobs from the matching responses the page has received, deduplicated by link.
+
+    Polls the performance log until at least one matching response has finished
+    loading and no new one arrived for `settle` seconds, or until timeout.
+    """
+    started = time.monotonic()
+    seen, pending, finished = set(), {}, set()
+    jobs, links = [], set()
+    last_match = None
+    while time.monotonic() - started < timeout:
+        matched, done = _responses(driver, spec, seen)
+        finished |= done
+        for request_id, url, mime in matched:
+            pending[request_id] = (url, mime)
+            last_match = time.monotonic()
+        for request_id in [r for r in pending if r in finished]:
+            url, mime = pending.pop(request_id)
+            try:
+                body = _body(driver, request_id)
+                payload = json.loads(body) if 'json' in mime or body.lstrip()[:1] in ('{', '[') else body
+                for job in spec.to_jobs(payload, url):
+                    if job.get('link') and job['link'] not in links:
+                        links.add(job['link'])
+                        jobs.append(job)
+            except Exception as e:
+                logging.warning(f"{spec.source}: couldn't read captured response {url}: {e}")
+        if last_match is not None and not pending and time.monotonic() - last_match >= settle:
+            break
+        time.sleep(0.1)
+    logging.info(f"{spec.source}: captured {len(jobs)} jobs from {len(seen)} responses "
+                 f"in {time.monotonic() - started:.1f}s")
+    return jobs
@@ -0,0 +1,222 @@
+"""
+On-disk cache of fetched pages, so repeated crawls don't download the same pages again.
+
+Bodies are stored zlib-compressed in a small SQLite file, keyed by the
+normalized URL, together with the ETag/Last-Modified validators the server sent.
+How an entry is used depends on the kind of page and the source's TTLs:
+
+- listing pages (TTL 0 by default) are revalidated with a conditional request
+  and served from the cache on 304 Not Modified
+- detail pages are served straight from the cache while younger than their
+  TTL (a week by default), and revalidated after that
+
+The cache is capped at CRAWL_CACHE_MAX_MB and evicts least recently used pages.
+Set CRAWL_CACHE=off to disable it or to a path to move it.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CACHE_PATH = os.environ.get('CRAWL_CACHE', os.path.join(PROJECT_ROOT, '.crawl_cache', 'pages.db'))
+MAX_BYTES = int(float(os.environ.get('CRAWL_CACHE_MAX_MB', '200')) * 1024 * 1024)
+
+DEFAULT_TTL = {
+    'listing': float(os.environ.get('CRAWL_CACHE_LISTING_TTL', '0')),
+    'detail': float(os.environ.get('CRAWL_CACHE_DETAIL_TTL', str(7 * 24 * 3600))),
+}
+
+
+def cache_key(url):
+    """URL with a lowercased scheme/host, sorted query parameters and no fragment."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+
+class CachedPage:
+    def __init__(self, key, body, etag, last_modified, fetched_at):
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    @property
+    def text(self):
+        return zlib.decompress(self.body).decode('utf-8')
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def validators(self):
+        """Headers for a conditional request revalidating this page."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed_at ON pages(accessed_at)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM pages").fetchone()[0]
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+
+    def get(self, url):
+        key = cache_key(url)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+        return CachedPage(key, *row) if row else None
+
+    def _touch(self, page, refetched=False):
+        now = time.time()
+        with self.lock, self.conn:
+            if refetched:
+                self.conn.execute("UPDATE pages SET accessed_at = ?, fetched_at = ? WHERE key = ?", (now, now, page.key))
+            else:
+                self.conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (now, page.key))
+
+    def hit(self, page, size):
+        """Served a fresh page without a request."""
+        self._touch(page)
+        with self.lock:
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += size
+
+    def revalidated(self, page, size):
+        """The server answered 304: the cached page is current again."""
+        self._touch(page, refetched=True)
+        with self.lock:
+            self.stats['revalidated'] += 1
+            self.stats['bytes_saved'] += size
+
+    def miss(self):
+        with self.lock:
+            self.stats['misses'] += 1
+
+    def store(self, url, text, etag=None, last_modified=None):
+        body = zlib.compress(text.encode('utf-8'), 6)
+        now = time.time()
+        key = cache_key(url)
+        with self.lock:
+            with self.conn:
+                old = self.conn.execute("SELECT LENGTH(body) FROM pages WHERE key = ?", (key,)).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO pages (key, body, size, etag, last_modified, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, body, len(text), etag, last_modified, now, now)
+                )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            self.stats['stored'] += 1
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def discard(self, url):
+        key = cache_key(url)
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT LENGTH(body) FROM pages WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.total_bytes -= row[0]
+
+    def _evict(self):
+        # Drop least recently used pages until the cache is back under 90% of its cap
+        target = self.max_bytes * 0.9
+        with self.conn:
+            for key, size in self.conn.execute(
+                    "SELECT key, LENGTH(body) FROM pages ORDER BY accessed_at").fetchall():
+                if self.total_bytes <= target:
+                    break
+                self.conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.total_bytes -= size
+                self.stats['evicted'] += 1
+
+    def report(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['size_mb'] = round(self.total_bytes / (1024 * 1024), 2)
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_ratio'] = round((stats['hits'] + stats['revalidated']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide page cache, or None when CRAWL_CACHE=off or it can't be opened."""
+    global _cache
+    if CACHE_PATH.lower() in ('off', '0', 'none', ''):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = PageCache()
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Page cache disabled: {e}")
+                _cache = False
+        return _cache or None
+
+
+def cached_get(url, kind='listing', ttl=None, fetch=None):
+    """Text of the page at url, from the cache when fresh or still valid.
+
+    fetch(url, headers) performs the request and returns a requests.Response;
+    ttl maps page kinds to seconds and defaults to DEFAULT_TTL.
+    """
+    cache = get_cache()
+    if cache is None:
+        return fetch(url, {}).text
+    max_age = (ttl or DEFAULT_TTL).get(kind, DEFAULT_TTL.get(kind, 0))
+    page = cache.get(url)
+    if page is not None and page.age < max_age:
+        text = page.text
+        cache.hit(page, len(text))
+        return text
+    response = fetch(url, page.validators() if page is not None else {})
+    if response.status_code == 304 and page is not None:
+        text = page.text
+        cache.revalidated(page, len(text))
+        return text
+    cache.miss()
+    cache.store(url, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return response.text
+
+
+def cache_report():
+    cache = get_cache()
+    return cache.report() if cache is not None else None
@@ -0,0 +1,87 @@
+"""
+Page parsing in worker processes.
+
+BeautifulSoup parsing is CPU-bound and holds the GIL, so however many parser
+threads the crawl runs, they share one core. A ParsePool hands the raw page HTML
+to a ProcessPoolExecutor instead. Each worker process builds the scraper of a
+source once (replay.scraper_for, without storage) and runs its parse functions;
+only the page text goes in and plain Job kwarg dicts come out, so pickling stays
+cheap next to the parse itself.
+
+CRAWL_PARSE_PROCESSES sets the worker count: 'auto' for the cores this process
+may run on, a number, or 0 (the default) to parse in the calling thread.
+Workers are spawned rather than forked, since the crawler forks from a process
+full of fetch and writer threads.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from scrapers.replay import parse_entry, scraper_for
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def process_count(setting=None):
+    """Worker processes for a CRAWL_PARSE_PROCESSES value ('auto', a number, '0'/'' for none)."""
+    if setting is None:
+        setting = os.environ.get('CRAWL_PARSE_PROCESSES', '0')
+    setting = str(setting).strip().lower()
+    if setting == 'auto':
+        return available_cores()
+    return max(0, int(setting or 0))
+
+
+PARSE_PROCESSES = process_count()
+
+# Scrapers built so far in this worker process, by source name
+_scrapers = {}
+
+
+def parse(source, kind, html):
+    """Jobs one page of `source` parses to ([{'description': ...}] for a detail page); runs in a worker."""
+    scraper = _scrapers.get(source)
+    if scraper is None:
+        scraper = _scrapers[source] = scraper_for(source)
+    return parse_entry(scraper, {'kind': kind, 'body': html})
+
+
+def _ready(_):
+    return os.getpid()
+
+
+class ParsePool:
+    def __init__(self, processes=None):
+        self.processes = processes or available_cores()
+        self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'))
+
+    def start(self):
+        """Start every worker now (spawning one imports the parsers), instead of on the first pages."""
+        list(self.executor.map(_ready, range(self.processes)))
+        return self
+
+    def submit(self, source, html, kind='listing'):
+        return self.executor.submit(parse, source, kind, html)
+
+    def parse(self, source, html, kind='listing'):
+        return self.submit(source, html, kind).result()
+
+    def map(self, pages, chunksize=1):
+        """Results of (source, kind, html) pages, in order."""
+        sources, kinds, bodies = zip(*pages) if pages else ((), (), ())
+        return self.executor.map(parse, sources, kinds, bodies, chunksize=chunksize)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,88 @@
+"""
+Declarative listing parsers.
+
+A scraper describes its cards once, as a CardSpec: the card selector, the
+fields to pull out of each card and, optionally, a SoupStrainer scope. Selectors
+are compiled once at import time and each field is evaluated once per card.
+Pages are parsed with lxml when it is installed (html.parser otherwise), and a
+strained page only builds the tree for the cards themselves instead of the whole
+document with its navigation, scripts and footer.
+
+    CARDS = CardSpec('tr.job', strain={'name': 'tr', 'class_': 'job'}, fields={
+        'title': Field('h2'),
+        'link': Field(attr='data-href'),   # no selector: the card element itself
+    })
+    for card in CARDS.parse(html):
+        ...
+"""
+
+import re
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+
+class Field:
+    """One value of a card: the stripped text (or an attribute) of the first element matching selector.
+
+    Missing elements and empty values give `default`; with many=True the field is
+    the list of values of every match.
+    """
+
+    def __init__(self, selector=None, attr=None, default=None, many=False):
+        self.selector = selector
+        self.attr = attr
+        self.default = default
+        self.many = many
+        self.compiled = soupsieve.compile(selector) if selector else None
+
+    def _value(self, element):
+        if self.attr:
+            return element.get(self.attr)
+        return element.get_text().strip()
+
+    def extract(self, card):
+        if self.many:
+            elements = self.compiled.select(card) if self.compiled else [card]
+            return [self._value(element) for element in elements]
+        element = self.compiled.select_one(card) if self.compiled else card
+        if element is None:
+            return self.default
+        return self._value(element) or self.default
+
+
+def class_token(name):
+    """Strainer matcher for one class of a multi-class attribute.
+
+    SoupStrainer sees the raw attribute value while parsing ("base-card job-search-card"),
+    so a plain string only matches elements whose class is exactly that name.
+    """
+    return re.compile(r'(?:^|\s)%s(?:\s|$)' % re.escape(name))
+
+
+class CardSpec:
+    def __init__(self, card_selector, fields, strain=None):
+        self.card_selector = card_selector
+        self.compiled = soupsieve.compile(card_selector)
+        self.fields = fields
+        # SoupStrainer keyword arguments matching the card elements, e.g. {'name': 'tr', 'class_': 'job'}
+        if strain and isinstance(strain.get('class_'), str):
+            strain = dict(strain, class_=class_token(strain['class_']))
+        self.strainer = SoupStrainer(**strain) if strain else None
+
+    def soup(self, html):
+        return BeautifulSoup(html, PARSER, parse_only=self.strainer)
+
+    def cards(self, html):
+        return self.compiled.select(self.soup(html))
+
+    def parse(self, html):
+        """A dict of field values per card, in page order."""
+        fields = self.fields.items()
+        return [{name: field.extract(card) for name, field in fields} for card in self.cards(html)]
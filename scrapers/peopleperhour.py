@@ -1,10 +1,23 @@
-import requests
-from bs4 import BeautifulSoup
 from models import Job
+from scrapers.fetch import PageFetcher
 import logging
 import urllib.parse
+from scrapers.parsing import CardSpec, Field
+
+CARDS = CardSpec('.item__container⤍ListItem⤚Fk4RX', strain={'class_': 'item__container⤍ListItem⤚Fk4RX'}, fields={
+    'title': Field('h6.item__title⤍ListItem⤚2FRMT a', default='non'),
+    'href': Field('h6.item__title⤍ListItem⤚2FRMT a', attr='href', default=''),
+    'description': Field('p.item__desc⤍ListItem⤚3f4JV', default='non'),
+    'company': Field('.card__username⤍ListItem⤚QnBBG', default='PeoplePerHour Client'),
+    'footer': Field('.card__footer-left⤍ListItem⤚16Odv span', many=True),
+})
 
 class PeoplePerHourScraper:
+    needs_js = False
+    listing_selector = '.item__container⤍ListItem⤚Fk4RX'
+    # HTTP only: an empty page here means the results ran out, not that scripts are needed
+    browser_fallback = False
+
     def __init__(self, storage, query='software', proxy=None):
         self.storage = storage
         self.query = query
@@ -12,68 +25,56 @@ class PeoplePerHourScraper:
         self.base_url = "https://www.peopleperhour.com"
         self.logger = logging.getLogger(__name__)
 
-    def scrape(self, max_pages=1):
+    def page_url(self, page):
         query_slug = urllib.parse.quote(self.query.replace(' ', '-'))
-        headers = {
-            "User-Agent": "Mozilla/5.0"
-        }
-        total_jobs = 0
-        for page in range(1, max_pages + 1):
-            if page == 1:
-                url = f"{self.base_url}/freelance-{query_slug}-jobs"
-            else:
-                url = f"{self.base_url}/freelance-{query_slug}-jobs?page={page}"
-            try:
-                response = requests.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, "html.parser")
-                job_items = soup.select('.item__container⤍ListItem⤚Fk4RX')
-                for item in job_items:
-                    # Title and link
-                    title_tag = item.select_one('h6.item__title⤍ListItem⤚2FRMT a')
-                    title = title_tag.text.strip() if title_tag else 'non'
-                    link = title_tag['href'] if title_tag and title_tag.has_attr('href') else ''
-                    if link and not link.startswith('http'):
-                        link = self.base_url + link
+        if page == 1:
+            return f"{self.base_url}/freelance-{query_slug}-jobs"
+        return f"{self.base_url}/freelance-{query_slug}-jobs?page={page}"
 
-                    # Description
-                    description_tag = item.select_one('p.item__desc⤍ListItem⤚3f4JV')
-                    description = description_tag.text.strip() if description_tag else 'non'
+    def fetch_plan(self, max_pages):
+        # Pages are numbered from 1
+        return [self.page_url(page) for page in range(1, max_pages + 1)]
 
-                    # User/company
-                    user_tag = item.select_one('.card__username⤍ListItem⤚QnBBG')
-                    company = user_tag.text.strip() if user_tag else 'PeoplePerHour Client'
+    def parse_page(self, html):
+        jobs = []
+        for card in CARDS.parse(html):
+            link = card['href']
+            if link and not link.startswith('http'):
+                link = self.base_url + link
 
-                    # Posted date, proposals, location
-                    footer = item.select_one('.card__footer-left⤍ListItem⤚16Odv')
-                    posted_date = ''
-                    proposals = ''
-                    location = 'Unknown'
-                    if footer:
-                        spans = footer.find_all('span')
-                        if len(spans) > 0:
-                            posted_date = spans[0].text.strip()
-                        if len(spans) > 1:
-                            proposals = spans[1].text.strip()
-                        if len(spans) > 2:
-                            location = 'Remote' if 'Remote' in spans[2].text else spans[2].text.strip()
+            # Posted date, proposals, location
+            footer = card['footer']
+            posted_date = footer[0] if len(footer) > 0 else ''
+            location = 'Unknown'
+            if len(footer) > 2:
+                location = 'Remote' if 'Remote' in footer[2] else footer[2]
 
-                    job = Job(
-                        title=title,
-                        description=description,
-                        link=link,
-                        company=company,
-                        source='PeoplePerHour',
-                        timestamp=posted_date,
-                        location=location
-                    )
-                    self.storage.add_job(job)
-                total_jobs += len(job_items)
-                self.logger.info(f"PeoplePerHour: Scraped {len(job_items)} jobs from {url}.")
+            jobs.append(dict(
+                title=card['title'],
+                description=card['description'],
+                link=link,
+                company=card['company'],
+                source='PeoplePerHour',
+                timestamp=posted_date,
+                location=location
+            ))
+        return jobs
+
+    def scrape(self, max_pages=1):
+        total_jobs = 0
+        with PageFetcher('PeoplePerHour', needs_js=self.needs_js, proxy=self.proxy,
+                         browser_fallback=self.browser_fallback) as fetcher:
+            urls = self.fetch_plan(max_pages)
+            for page, (url, jobs, error) in enumerate(fetcher.fetch_pages(urls, self.parse_page), start=1):
+                if error is not None:
+                    self.logger.error(f"PeoplePerHour scraping error on page {page}: {error}")
+                    break
+                for job in jobs:
+                    self.storage.add_job(Job(**job))
+                self.storage.flush()
+                total_jobs += len(jobs)
+                self.logger.info(f"PeoplePerHour: Scraped {len(jobs)} jobs from {url}.")
                 # Stop if there are no more jobs on this page
-                if not job_items:
+                if not jobs:
                     break
-            except Exception as e:
-                self.logger.error(f"PeoplePerHour scraping error on page {page}: {e}")
-                break
-        self.logger.info(f"PeoplePerHour: Scraped a total of {total_jobs} jobs.") 
\ No newline at end of file
+        self.logger.info(f"PeoplePerHour: Scraped a total of {total_jobs} jobs.")
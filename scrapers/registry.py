@@ -0,0 +1,56 @@
+"""
+Registry of the available scrapers.
+
+Maps each scraper's class name (the names CRAWL_SCRAPERS uses) to the module it
+lives in, so a crawl only imports the scrapers it actually runs. Importing a
+scraper module pulls in its browser and parsing stack (selenium,
+undetected_chromedriver, BeautifulSoup), which a single-source run should not
+pay for.
+"""
+
+import importlib
+import logging
+
+SCRAPERS = {
+    'LinkedInScraper': 'scrapers.linkedin',
+    'FreelancerScraper': 'scrapers.freelancer',
+    'WuzzufScraper': 'scrapers.wuzzuf',
+    'RemoteOKScraper': 'scrapers.remoteok',
+    'WeWorkRemotelyScraper': 'scrapers.weworkremotely',
+    'UpworkScraper': 'scrapers.upwork',
+    'PeoplePerHourScraper': 'scrapers.peopleperhour',
+}
+
+
+def available():
+    return list(SCRAPERS)
+
+
+def load(name):
+    """Import the scraper's module and return its class."""
+    try:
+        module_path = SCRAPERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown scraper {name!r}, expected one of: {', '.join(SCRAPERS)}")
+    return getattr(importlib.import_module(module_path), name)
+
+
+def load_selected(names=None):
+    """Classes for the given scraper names (all of them if names is empty), in registry order.
+
+    Unknown names are logged and skipped; a scraper whose module fails to import
+    (e.g. a missing optional dependency) is logged and skipped too, so it does not
+    take the other scrapers down with it.
+    """
+    wanted = set(names) if names else set(SCRAPERS)
+    for name in wanted - set(SCRAPERS):
+        logging.warning(f"Ignoring unknown scraper {name!r}")
+    classes = []
+    for name in SCRAPERS:
+        if name not in wanted:
+            continue
+        try:
+            classes.append(load(name))
+        except ImportError as e:
+            logging.error(f"Could not load {name}: {e}")
+    return classes
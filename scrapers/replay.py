@@ -0,0 +1,137 @@
+"""
+Record and replay fetched pages, so the parsers can be exercised without live sites.
+
+Record: set CRAWL_RECORD=<archive.jsonl.gz> and every page a PageFetcher returns
+(source, page kind, URL, status, headers and body) is appended to a gzip'd JSON
+lines archive.
+
+Replay: set CRAWL_REPLAY=<archive> and PageFetcher serves pages from the archive
+instead of the network or a browser; a URL that was not recorded fails like a
+network error. Or feed the archive straight to the scrapers' parse functions:
+
+    python -m scrapers.replay <archive> [--source RemoteOK]
+
+prints the jobs extracted per page. benchmarks/bench_parse.py builds its
+throughput suite on the same archives.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+
+from scrapers.page_cache import cache_key
+
+RECORD_PATH = os.environ.get('CRAWL_RECORD')
+REPLAY_PATH = os.environ.get('CRAWL_REPLAY')
+
+# Page kinds the scrapers' parse functions handle; other recordings (e.g. Upwork's live
+# feeds, see benchmarks/bench_dom_extract.py) are replayed into a browser instead
+PARSED_KINDS = ('listing', 'detail')
+
+
+class Recorder:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def record(self, source, kind, url, body, status=200, headers=None):
+        entry = {
+            'source': source,
+            'kind': kind,
+            'url': url,
+            'status': status,
+            'headers': dict(headers or {}),
+            'recorded_at': time.time(),
+            'body': body,
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        # Each append is its own gzip member; readers see one continuous stream
+        with self.lock, open(self.path, 'ab') as f:
+            f.write(gzip.compress(line))
+
+
+def read_archive(path):
+    """Recorded entries, oldest first."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Replayer:
+    def __init__(self, path):
+        self.pages = {}
+        for entry in read_archive(path):
+            # Later recordings of a URL win
+            self.pages[cache_key(entry['url'])] = entry
+
+    def body(self, url):
+        entry = self.pages.get(cache_key(url))
+        if entry is None:
+            raise LookupError(f"{url} is not in the replay archive")
+        return entry['body']
+
+
+_recorder = None
+_replayer = None
+_lock = threading.Lock()
+
+
+def get_recorder():
+    global _recorder
+    if not RECORD_PATH:
+        return None
+    with _lock:
+        if _recorder is None:
+            _recorder = Recorder(RECORD_PATH)
+        return _recorder
+
+
+def get_replayer():
+    global _replayer
+    if not REPLAY_PATH:
+        return None
+    with _lock:
+        if _replayer is None:
+            _replayer = Replayer(REPLAY_PATH)
+        return _replayer
+
+
+def scraper_for(source):
+    """A scraper instance (without storage) whose parse functions handle pages of `source`."""
+    from scrapers import registry
+    return registry.load(f'{source}Scraper')(storage=None)
+
+
+def parse_entry(scraper, entry):
+    """Jobs (or the description) the scraper extracts from one recorded page."""
+    if entry['kind'] == 'detail':
+        return [{'description': scraper.parse_description(entry['body'])}]
+    return scraper.parse_page(entry['body'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded archive through the scrapers\' parsers.')
+    parser.add_argument('archive')
+    parser.add_argument('--source', help='only pages of this source (e.g. RemoteOK)')
+    parser.add_argument('--show', type=int, default=0, help='print the first N jobs of each page')
+    args = parser.parse_args()
+
+    scrapers = {}
+    for entry in read_archive(args.archive):
+        if (args.source and entry['source'] != args.source) or entry['kind'] not in PARSED_KINDS:
+            continue
+        if entry['source'] not in scrapers:
+            scrapers[entry['source']] = scraper_for(entry['source'])
+        jobs = parse_entry(scrapers[entry['source']], entry)
+        print(f"{entry['source']:16} {entry['kind']:8} {len(jobs):4} jobs  {entry['url']}")
+        for job in jobs[:args.show]:
+            print(f"    {job}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Per-domain politeness and throughput control for the fetch layer.
+
+Every request to a host goes through that host's DomainController:
+
+- a token bucket caps the request rate (CRAWL_RATE requests/s to start with)
+- an AIMD concurrency limit decides how many requests may be in flight: it grows
+  by about one per window of healthy responses and halves on a throttling
+  signal (429/403, or a page that parsed to nothing, which is what captcha and
+  bot-wall pages look like); the request rate follows the same rule, between
+  CRAWL_MIN_RATE and CRAWL_MAX_RATE
+- RetryPolicy retries failed pages with jittered exponential backoff
+
+so scrapers can fetch several pages of one source in parallel and settle at the
+highest rate the site tolerates. controller_stats() / log_state() report each
+controller's state for the run log.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+
+RATE = float(os.environ.get('CRAWL_RATE', '2'))
+MIN_RATE = float(os.environ.get('CRAWL_MIN_RATE', '0.2'))
+MAX_RATE = float(os.environ.get('CRAWL_MAX_RATE', '10'))
+INITIAL_CONCURRENCY = int(os.environ.get('CRAWL_INITIAL_CONCURRENCY', '2'))
+MAX_CONCURRENCY = int(os.environ.get('CRAWL_MAX_CONCURRENCY', '8'))
+RETRY_ATTEMPTS = int(os.environ.get('CRAWL_HTTP_RETRIES', '3'))
+
+# Statuses a site uses to tell us to slow down
+THROTTLE_STATUSES = (403, 429)
+# Statuses worth trying again; other 4xx mean the page itself is wrong
+RETRY_STATUSES = (403, 408, 429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class DomainController:
+    """Token bucket plus AIMD concurrency limit for one host."""
+
+    # Back off at most once per this many seconds, so one burst of 429s only halves the limit once
+    DECREASE_COOLDOWN = 1.0
+
+    def __init__(self, host, rate=RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 initial_concurrency=INITIAL_CONCURRENCY, max_concurrency=MAX_CONCURRENCY):
+        self.host = host
+        self.bucket = TokenBucket(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate * 0.1
+        self.limit = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.peak_active = 0
+        self.last_decrease = 0.0
+        self.outcomes = Counter()
+        self.cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the host's concurrency slots and a rate token for the duration of a request."""
+        with self.cond:
+            while self.active >= int(self.limit):
+                self.cond.wait()
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            self.bucket.take()
+            yield
+        finally:
+            with self.cond:
+                self.active -= 1
+                self.cond.notify_all()
+
+    def record(self, outcome):
+        """Feed back how a request went: 'ok', 'throttled', 'empty' or 'error'."""
+        with self.cond:
+            self.outcomes[outcome] += 1
+            if outcome == 'ok':
+                # Additive increase: roughly +1 slot per window of `limit` healthy responses
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.bucket.rate = min(self.max_rate, self.bucket.rate + self.rate_step)
+            elif outcome in ('throttled', 'empty'):
+                now = time.monotonic()
+                if now - self.last_decrease >= self.DECREASE_COOLDOWN:
+                    self.last_decrease = now
+                    self.limit = max(1.0, self.limit / 2)
+                    self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+                    logging.info(f"{self.host}: backing off after {outcome} response "
+                                 f"(concurrency {int(self.limit)}, {self.bucket.rate:.2f} req/s)")
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return {
+                'concurrency': int(self.limit),
+                'peak_in_flight': self.peak_active,
+                'rate': round(self.bucket.rate, 2),
+                **dict(self.outcomes),
+            }
+
+
+class RetryPolicy:
+    """Retries with full-jitter exponential backoff: sleep uniform(0, min(cap, base * 2**attempt))."""
+
+    def __init__(self, attempts=RETRY_ATTEMPTS, base=1.0, cap=30.0):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    @staticmethod
+    def retryable(error):
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in RETRY_STATUSES
+        return True
+
+    def call(self, fn, *args, label=None, **kwargs):
+        for attempt in range(self.attempts):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.attempts - 1 or not self.retryable(e):
+                    raise
+                delay = self.delay(attempt)
+                logging.warning(f"{label or fn.__name__} attempt {attempt+1} failed: {e}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(url):
+    host = urlsplit(url).netloc
+    with _controllers_lock:
+        if host not in _controllers:
+            _controllers[host] = DomainController(host)
+        return _controllers[host]
+
+
+def controller_stats():
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    return {controller.host: controller.stats() for controller in controllers}
+
+
+def log_state():
+    for host, stats in controller_stats().items():
+        logging.info(f"Rate controller {host}: {stats}")
@@ -4,6 +4,7 @@ import sys
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)  # Insert at beginning of path list for priority
+import hashlib
 import time
 from datetime import datetime
 import logging
@@ -15,6 +16,9 @@ from selenium.webdriver.common.keys import Keys
 from scrapers.utils.job_helpers import parse_job_details
 from scrapers.utils.database import create_db, connect_to_db
 from scrapers.settings import config
+from scrapers.browser_pool import get_pool
+from scrapers import dom_extract, network_capture, waits
+from scrapers.replay import get_recorder
 from models import Job
 
 
@@ -22,40 +26,97 @@ from models import Job
 
 # Create logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-# Get paths
-scriptdir = os.path.dirname(os.path.abspath(__file__))
-logdir = os.path.join(scriptdir, 'log')
-if not os.path.exists(logdir):
-    os.makedirs(logdir)
-mypath = os.path.join(logdir, 'upwork_best_matches_scraper.log')
-# Create file handler which logs even DEBUG messages
-fh = logging.FileHandler(mypath)
-fh.setLevel(logging.DEBUG)
-# Create console handler
-ch = logging.StreamHandler(sys.stdout)
-ch.setLevel(logging.DEBUG)
-# create formatter and add it to the handlers
-formatter = logging.Formatter('[%(levelname)s. %(name)s, (line #%(lineno)d) - %(asctime)s] %(message)s')
-fh.setFormatter(formatter)
-ch.setFormatter(formatter)
-# add handlers to logger
-logger.addHandler(fh)
-logger.addHandler(ch)
+
+
+def init_logging():
+    """Attach the file and stdout handlers; called when a scraper is created rather than on import."""
+    if logger.handlers:
+        return
+    logger.setLevel(logging.DEBUG)
+    # Get paths
+    scriptdir = os.path.dirname(os.path.abspath(__file__))
+    logdir = os.path.join(scriptdir, 'log')
+    os.makedirs(logdir, exist_ok=True)
+    mypath = os.path.join(logdir, 'upwork_best_matches_scraper.log')
+    # Create file handler which logs even DEBUG messages
+    fh = logging.FileHandler(mypath)
+    fh.setLevel(logging.DEBUG)
+    # Create console handler
+    ch = logging.StreamHandler(sys.stdout)
+    ch.setLevel(logging.DEBUG)
+    # create formatter and add it to the handlers
+    formatter = logging.Formatter('[%(levelname)s. %(name)s, (line #%(lineno)d) - %(asctime)s] %(message)s')
+    fh.setFormatter(formatter)
+    ch.setFormatter(formatter)
+    # add handlers to logger
+    logger.addHandler(fh)
+    logger.addHandler(ch)
+
+
+# Job feed container and the job links inside it
+FEED_XPATH = '/html/body/div[4]/div/div/div/main/div[3]/div[4]'
+JOB_LINK_SELECTOR = "a[href*='/jobs/']"
+
+LOGIN_URL = 'https://www.upwork.com/ab/account-security/login'
+# Chrome profiles (cookies, local storage) kept between runs, one per Upwork account; 'off' disables
+PROFILE_DIR = os.environ.get('CRAWL_PROFILE_DIR', os.path.join(PROJECT_ROOT, '.crawl_profiles'))
 
 
 # FUNCTIONS
 
-def get_driver_with_retry(max_attempts=3, chrome_path=None):
+def job_urls(links):
+    """Job posting links of a feed, without the skill and saved-search links that also contain /jobs/."""
+    return [href for href in links
+            if 'ontology_skill_uid' not in href
+            and 'search/saved' not in href
+            and 'search/jobs/saved' not in href]
+
+
+def feed_jobs(text, links):
+    """Job kwargs from a feed's text (one post per 'Posted' block) paired with its job links in order."""
+    # Get rid of the right panel (the user's mini bio), then the top panel
+    text = text.split(config.UPWORK_USER_NAME)[0]
+    text = text.split('Ordered by most relevant.')[-1]
+    jobs = []
+    for post, url in zip(text.split('Posted')[1:], job_urls(links)):
+        job_details = parse_job_details(post.split('\n'))
+        jobs.append(dict(
+            title=job_details.get('job_title', 'non'),
+            description=job_details.get('job_description', 'non'),
+            link=url.split('/?')[0],
+            company='Upwork',
+            source='Upwork',
+            timestamp=job_details.get('posted_date', datetime.now().isoformat()),
+            location='Remote'  # Upwork jobs are typically remote
+        ))
+    return jobs
+
+
+def profile_path(account):
+    """Profile directory for an account, or None when profiles are off."""
+    if PROFILE_DIR.lower() in ('off', '0', 'none', '') or not account:
+        return None
+    digest = hashlib.sha1(account.lower().encode('utf-8')).hexdigest()[:12]
+    return os.path.join(PROFILE_DIR, f'upwork-{digest}')
+
+
+def get_driver_with_retry(max_attempts=3, chrome_path=None, user_data_dir=None, performance_log=False):
     for attempt in range(max_attempts):
         try:
             logger.info(f'Attempt #{attempt+1}/{max_attempts}')
             options = uc.ChromeOptions()
             options.headless = False
+            if performance_log:
+                options.set_capability('goog:loggingPrefs', network_capture.LOGGING_PREFS)
+            kwargs = {}
+            if user_data_dir:
+                # uc keeps a directory it was given, so the login survives the browser
+                os.makedirs(user_data_dir, exist_ok=True)
+                kwargs['user_data_dir'] = user_data_dir
             if chrome_path:
-                return uc.Chrome(options=options, browser_executable_path=chrome_path)
+                return uc.Chrome(options=options, browser_executable_path=chrome_path, **kwargs)
             else:
-                return uc.Chrome(options=options)
+                return uc.Chrome(options=options, **kwargs)
         except Exception as e:
             logger.error(f"Failed to launch Chrome driver. Retrying...")
             logger.error(f"Error details: {e}")
@@ -64,20 +125,96 @@ def get_driver_with_retry(max_attempts=3, chrome_path=None):
     return None
 
 
+def get_upwork_pool():
+    """Pool of undetected Chrome drivers for Upwork.
+
+    Cookies are kept between leases, and on disk in the account's profile between runs.
+    """
+    def create():
+        driver = get_driver_with_retry(max_attempts=getattr(config, 'MAX_ATTEMPTS', 3),
+                                       chrome_path=getattr(config, 'CHROME_PATH', None),
+                                       user_data_dir=profile_path(getattr(config, 'UPWORK_USERNAME', None)),
+                                       performance_log=network_capture.enabled('Upwork'))
+        if driver is None:
+            raise RuntimeError("Unable to launch Chrome driver")
+        return driver
+    return get_pool('upwork', factory=create, size=1, keep_state=True)
+
+
+def lease_driver(pool):
+    try:
+        return pool.acquire()
+    except Exception as e:
+        logger.error(f"Couldn't lease a driver: {e}")
+        return None
+
+
+def capture_jobs(payload, url):
+    """Jobs from the feed payloads (GraphQL and find-work feed API) behind the Upwork job feeds."""
+    jobs = []
+    for record in network_capture.find_records(payload, 'title', 'ciphertext'):
+        jobs.append(dict(
+            title=record['title'],
+            description=network_capture.dig(record, 'description', default='non'),
+            link=f"https://www.upwork.com/jobs/{record['ciphertext']}",
+            company='Upwork',
+            source='Upwork',
+            timestamp=network_capture.dig(record, 'publishedDateTime', 'publishedOn', 'createdDateTime', 'createdOn'),
+            location=network_capture.dig(record, 'client.location.country', default='Remote')
+        ))
+    return jobs
+
+
+CAPTURE = network_capture.CaptureSpec('Upwork', r'upwork\.com/(api/graphql|ab/find-work/api/feeds)', capture_jobs)
+
+
 class UpworkScraper:
+    # The feeds sit behind a login and are rendered client-side, so this scraper always drives a browser
+    needs_js = True
+
     def __init__(self, storage, query='software engineer', proxy=None):
+        init_logging()
         self.storage = storage
         self.query = query
         self.proxy = proxy
 
+    @staticmethod
+    def session_probe(driver, timeout=15):
+        """True when the current page is behind a valid session, False when Upwork sent us to the login page."""
+        try:
+            WebDriverWait(driver, timeout).until(
+                lambda d: 'login' in d.current_url or d.find_elements(By.XPATH, FEED_XPATH))
+        except Exception:
+            pass
+        return 'login' not in driver.current_url
+
+    def ensure_session(self, driver, url):
+        """Open url, logging in first only if the stored session no longer works."""
+        started = time.monotonic()
+        driver.get(url)
+        waits.wait_for_ready_state(driver, timeout=30)
+        if self.session_probe(driver):
+            logger.info(f'Stored session is valid ({time.monotonic() - started:.1f}s probe); skipping login')
+            return True
+        logger.info('No valid session; logging in')
+        if not self.login_to_upwork(driver):
+            return False
+        driver.get(url)
+        waits.wait_for_ready_state(driver, timeout=30)
+        if not self.session_probe(driver):
+            logger.error('Still not logged in after submitting credentials')
+            return False
+        logger.info(f'Logged in and opened {url} in {time.monotonic() - started:.1f}s')
+        return True
+
     def login_to_upwork(self, driver):
         """Helper method to handle Upwork login process"""
         try:
-            user_login_page = 'https://www.upwork.com/ab/account-security/login'
+            user_login_page = LOGIN_URL
             logger.info(f'Navigating to `{user_login_page}`')
             driver.get(user_login_page)
-            logger.info('Pausing for windows to fully load')
-            time.sleep(25)
+            logger.info('Waiting for the login page to load')
+            waits.wait_for_ready_state(driver, timeout=30)
 
             logger.info('Switching to main window')
             all_windows = driver.window_handles
@@ -121,146 +258,121 @@ class UpworkScraper:
             )
             password_field.send_keys(Keys.ENTER)
 
-            logger.info(f'Pausing for {getattr(config, "VERIFICATION_PAUSE", 10)} seconds for credentials verification')
-            time.sleep(getattr(config, "VERIFICATION_PAUSE", 10))
+            # Wait (up to VERIFICATION_PAUSE) for the redirect away from the login page rather than sleeping it out
+            pause = getattr(config, "VERIFICATION_PAUSE", 10)
+            logger.info(f'Waiting up to {pause} seconds for credentials verification')
+            try:
+                WebDriverWait(driver, pause).until(lambda d: 'login' not in d.current_url)
+            except Exception:
+                logger.info('Still on the login page; continuing')
             return True
         except Exception as e:
             logger.error(f"Failed to login: {e}")
             return False
 
+    def load_feed(self, driver, url, timeout=300, navigate=True):
+        """Open a job feed and scroll until no more jobs load; returns the seconds spent waiting.
+
+        With navigate=False the feed is already open (see ensure_session).
+        """
+        started = time.monotonic()
+        if navigate:
+            driver.get(url)
+        logger.info(f'Waiting for the job feed to load (max timeout set to {timeout} seconds)...')
+        if not waits.wait_for_selector(driver, FEED_XPATH, timeout=timeout):
+            raise TimeoutError(f"Job feed did not load: {url}")
+        logger.info('Scrolling down page')
+        count = waits.scroll_until_stable(driver, JOB_LINK_SELECTOR)
+        waits.politeness_floor(started)
+        logger.info(f'{count} job links loaded')
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record('Upwork', 'feed', url, driver.page_source)
+        return time.monotonic() - started
+
+    def store_feed(self, driver):
+        """Store every job in the open feed and return how many there were.
+
+        The feed text and all job links come back from one script call instead of a
+        WebDriver request per link and attribute.
+        """
+        feed = dom_extract.extract_feed(driver, FEED_XPATH, JOB_LINK_SELECTOR)
+        if feed['text'] is None:
+            raise RuntimeError('Job feed container not found')
+        jobs = feed_jobs(feed['text'], feed['links'])
+        for job in jobs:
+            self.storage.add_job(Job(**job))
+        self.storage.flush()
+        return len(jobs)
+
+    def read_feed(self, driver, url, wait_stats):
+        """Store the jobs of the feed ensure_session opened and return how many there were.
+
+        With capture on they come from the feed's JSON payloads; otherwise, or when
+        nothing was captured, the rendered feed is scrolled through and read.
+        """
+        if network_capture.enabled('Upwork'):
+            counter = self.store_captured(driver)
+            if counter:
+                return counter
+            logger.info('Nothing captured; reading the rendered feed')
+        wait_stats.record(self.load_feed(driver, url, navigate=False))
+        return self.store_feed(driver)
+
+    def store_captured(self, driver):
+        jobs = network_capture.collect(driver, CAPTURE)
+        for job in jobs:
+            self.storage.add_job(Job(**job))
+        self.storage.flush()
+        return len(jobs)
+
     def scrape(self, max_pages=1):
+        pool = get_upwork_pool()
+        driver = None
+        wait_stats = waits.WaitStats('Upwork')
         try:
             # First scrape best matches
-            logger.info('Launching driver for best matches')
-            chrome_path = getattr(config, 'CHROME_PATH', None)
-            driver = get_driver_with_retry(max_attempts=getattr(config, 'MAX_ATTEMPTS', 3), chrome_path=chrome_path)
+            logger.info('Leasing driver for best matches')
+            driver = lease_driver(pool)
 
             if driver:
-                # Login for best matches
-                if not self.login_to_upwork(driver):
+                # Open best matches with the stored session, logging in only if it has expired
+                best_matches = 'https://www.upwork.com/nx/find-work/best-matches'
+                network_capture.clear(driver)
+                if not self.ensure_session(driver, best_matches):
                     logger.error("Failed to login for best matches")
-                    driver.quit()
+                    pool.release(driver)
+                    driver = None
                     return
 
-                # Go to target url
-                logger.info("Redirecting to Best Matches")
-                driver.get('https://www.upwork.com/nx/find-work/best-matches')
-                time.sleep(10)
-
-                # Scroll down using keyboard actions
-                logger.info('Scrolling down page')
-                body = driver.find_elements('xpath', "/html/body")
-                for i in range(0, 12):
-                    body[-1].send_keys(Keys.PAGE_DOWN)
-                    time.sleep(2)
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                timeout_wait = 300
-
-                # Wait for element to load
-                logger.info(f'Waiting for element to load (max timeout set to {timeout_wait} seconds)...')
-                wait = WebDriverWait(driver, timeout_wait)
-                wait.until(EC.element_to_be_clickable((By.XPATH, f'/html/body/div[4]/div/div/div/main/div[3]/div[4]')))
-
-                # Get all text as a wall of text (including user's mini bio on the top-right panel)
-                text = driver.find_elements('xpath', f'/html/body/div[4]/div/div/div/main/div[3]/div[4]')[-1].text
-                # Get rid of the right panel
-                text_1 = text.split(config.UPWORK_USER_NAME)[0]
-                # Get rid of the top panel
-                text_2 = text_1.split('Ordered by most relevant.')[-1]
-                # Get all job posts
-                job_posts = text_2.split('Posted')[1:]
-
-                # Get urls
-                job_links = driver.find_elements("xpath", "//a[contains(@href, '/jobs/')]")
-                job_urls = [link.get_attribute("href") for link in job_links
-                            if 'ontology_skill_uid' not in link.get_attribute("href")
-                            and 'search/saved' not in link.get_attribute("href")
-                            and 'search/jobs/saved' not in link.get_attribute("href")
-                            ]
-
                 # Scrape jobs
                 print('Scraping jobs...')
-                counter = 0
                 logger.info(f"Adding jobs to database: {self.storage.db_name}")
-                for j in job_posts:
-                    job_details = parse_job_details(j.split('\n'))
-                    job_id = job_details.get('job_id')
-                    job_url = job_urls[counter].split('/?')[0]
-                    
-                    # Create a Job instance using the storage's schema
-                    job = Job(
-                        title=job_details.get('job_title', 'non'),
-                        description=job_details.get('job_description', 'non'),
-                        link=job_url,
-                        company='Upwork',
-                        source='Upwork',
-                        timestamp=job_details.get('posted_date', datetime.now().isoformat()),
-                        location='Remote'  # Upwork jobs are typically remote
-                    )
-                    # Add job to storage
-                    self.storage.add_job(job)
-                    counter += 1
-
+                counter = self.read_feed(driver, best_matches, wait_stats)
                 logger.info(f"Added {counter} jobs to the database")
 
-                # Close the browser
-                logger.info('Closing browser for best matches...')
-                driver.quit()
+                # Return the browser to the pool
+                logger.info('Returning browser for best matches...')
+                pool.release(driver)
+                driver = None
 
-                # Now scrape most recent jobs with a fresh login
-                logger.info('Launching driver for most recent jobs')
-                driver = get_driver_with_retry(max_attempts=getattr(config, 'MAX_ATTEMPTS', 3), chrome_path=chrome_path)
+                # Now scrape most recent jobs; the pooled driver still holds the session
+                logger.info('Leasing driver for most recent jobs')
+                driver = lease_driver(pool)
                 if not driver:
                     logger.error("Couldn't load driver for most recent jobs")
                     return
 
-                # Login again for most recent jobs
-                if not self.login_to_upwork(driver):
+                most_recent = 'https://www.upwork.com/nx/find-work/most-recent'
+                network_capture.clear(driver)
+                if not self.ensure_session(driver, most_recent):
                     logger.error("Failed to login for most recent jobs")
-                    driver.quit()
+                    pool.release(driver)
+                    driver = None
                     return
 
-                driver.get('https://www.upwork.com/nx/find-work/most-recent')
-                time.sleep(10)
                 logger.info('Scrolling down and scraping most recent jobs')
-                body = driver.find_elements('xpath', "/html/body")
-                # Initial scroll to load jobs
-                for _ in range(12):
-                    body[-1].send_keys(Keys.PAGE_DOWN)
-                    time.sleep(2)
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                # Scrape jobs on first load
-                def extract_jobs_from_most_recent():
-                    text = driver.find_elements('xpath', f'/html/body/div[4]/div/div/div/main/div[3]/div[4]')[-1].text
-                    text_1 = text.split(config.UPWORK_USER_NAME)[0]
-                    text_2 = text_1.split('Ordered by most relevant.')[-1]
-                    job_posts = text_2.split('Posted')[1:]
-                    job_links = driver.find_elements("xpath", "//a[contains(@href, '/jobs/')]")
-                    job_urls = [link.get_attribute("href") for link in job_links
-                                if 'ontology_skill_uid' not in link.get_attribute("href")
-                                and 'search/saved' not in link.get_attribute("href")
-                                and 'search/jobs/saved' not in link.get_attribute("href")
-                                ]
-                    counter = 0
-                    for j in job_posts:
-                        job_details = parse_job_details(j.split('\n'))
-                        job_id = job_details.get('job_id')
-                        job_url = job_urls[counter].split('/?')[0]
-                        job = Job(
-                            title=job_details.get('job_title', 'non'),
-                            description=job_details.get('job_description', 'non'),
-                            link=job_url,
-                            company='Upwork',
-                            source='Upwork',
-                            timestamp=job_details.get('posted_date', datetime.now().isoformat()),
-                            location='Remote'
-                        )
-                        self.storage.add_job(job)
-                        counter += 1
-                    logger.info(f"Added {counter} jobs from most recent page")
-
-                extract_jobs_from_most_recent()
+                logger.info(f"Added {self.read_feed(driver, most_recent, wait_stats)} jobs from most recent page")
                 # Now click 'Load More Jobs' for each page
                 for page in range(1, max_pages):
                     try:
@@ -268,19 +380,27 @@ class UpworkScraper:
                             EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[data-test="load-more-button"]'))
                         )
                         driver.execute_script("arguments[0].scrollIntoView();", load_more_btn)
-                        time.sleep(1)
+                        started = time.monotonic()
+                        network_capture.clear(driver)
                         load_more_btn.click()
                         logger.info(f"Clicked Load More Jobs for page {page+1}")
-                        time.sleep(5)
-                        # Scroll to bottom to trigger more loading
-                        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(2)
-                        extract_jobs_from_most_recent()
+                        if network_capture.enabled('Upwork'):
+                            counter = self.store_captured(driver)
+                            if counter:
+                                logger.info(f"Added {counter} captured jobs from most recent page")
+                                continue
+                        # Wait for the new jobs to render, then scroll until nothing more loads
+                        waits.wait_for_quiet_dom(driver, JOB_LINK_SELECTOR)
+                        waits.scroll_until_stable(driver, JOB_LINK_SELECTOR)
+                        waits.politeness_floor(started)
+                        wait_stats.record(time.monotonic() - started)
+                        logger.info(f"Added {self.store_feed(driver)} jobs from most recent page")
                     except Exception as e:
                         logger.error(f"Error clicking Load More Jobs on page {page+1}: {e}")
                         break
-                logger.info('Closing browser for most recent jobs...')
-                driver.quit()
+                logger.info('Returning browser for most recent jobs...')
+                pool.release(driver)
+                driver = None
             else:
                 logger.error("Couldn't load driver")
             
@@ -288,4 +408,8 @@ class UpworkScraper:
             logger.error(e)
 
         finally:
+            # Hand the driver back if scraping failed half way through
+            if driver is not None:
+                pool.release(driver)
+            wait_stats.log()
             logger.info('Finished UpworkScraper')
\ No newline at end of file
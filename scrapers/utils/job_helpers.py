@@ -1,7 +1,16 @@
+import base64
+import binascii
 import hashlib
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import re
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+# Placeholders scrapers store when a card has no link; these must never collide with each other
+MISSING_LINKS = {'', 'non', 'unknown'}
+
+# Query param of a login redirect that carries the posting itself (Freelancer's /login?goto=...)
+REDIRECT_PARAM = 'goto'
 
 
 def generate_job_id(job_title):
@@ -95,3 +104,109 @@ def parse_job_details(r):
         'job_tags': json.dumps(clean_skills(r[6:-6])),
         'job_id': generate_job_id(r[1])
     }
+
+
+def redirect_target(value):
+    """The URL a login redirect's goto value points at, or None.
+
+    Freelancer sends private projects through /login?goto=<base64>, where the
+    decoded value is a hash followed by the project URL and ',' pads instead of '='.
+    """
+    if value.startswith(('http://', 'https://')):
+        return value
+    # A '+' of plain base64 arrives as a space once the query is decoded
+    padded = value.replace(',', '=').replace(' ', '+')
+    padded += '=' * (-len(padded) % 4)
+    try:
+        decoded = base64.urlsafe_b64decode(padded).decode('utf-8')
+    except (binascii.Error, ValueError):
+        return None
+    start = decoded.find('http')
+    return decoded[start:] if start >= 0 else None
+
+
+def canonical_link(link):
+    """Return the key used to detect duplicate postings, or None if the job has no usable link.
+
+    Scheme, ``www.``, query string, fragment and trailing slash are dropped: every
+    source identifies a posting by its path, and the query only carries tracking
+    parameters (LinkedIn's refId/trackingId, Upwork's referrer, ...). Login
+    redirects are the exception, their path is the login page: they are keyed on
+    the decoded goto target, or on the goto value itself when it doesn't decode.
+    """
+    if link is None:
+        return None
+    link = str(link).strip()
+    if link.lower() in MISSING_LINKS:
+        return None
+    parts = urlsplit(link)
+    if not parts.netloc:
+        return link
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/') or '/'
+    goto = parse_qs(parts.query).get(REDIRECT_PARAM)
+    if goto:
+        target = redirect_target(goto[0])
+        if target and REDIRECT_PARAM not in urlsplit(target).query:
+            return canonical_link(target)
+        return urlunsplit(('https', host, path, f'{REDIRECT_PARAM}={goto[0]}', ''))
+    return urlunsplit(('https', host, path, '', ''))
+
+
+RELATIVE_UNITS = {
+    'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600, 'hr': 3600,
+    'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400,
+    'h': 3600, 'd': 86400, 'w': 7 * 86400,
+}
+RELATIVE_PATTERN = re.compile(r'\b(\d+|an?|one)\s*(second|sec|minute|min|hour|hr|day|week|month|year|h|d|w)s?\b')
+ABSOLUTE_FORMATS = ('%d %b %Y', '%d %B %Y', '%b %d, %Y', '%B %d, %Y', '%d/%m/%Y', '%Y/%m/%d')
+
+
+def to_epoch(value, reference=None):
+    """
+    Convert a posting date as scraped into a UTC epoch timestamp.
+
+    Parameters:
+    - value: a datetime, an epoch number, an ISO/absolute date string or a relative
+      string such as '3 days ago', 'an hour ago', 'yesterday' or 'Posted last week'.
+      Naive datetimes are taken to be local time, like datetime.now() produces.
+    - reference (int): epoch that relative strings are counted back from (defaults to now).
+
+    Returns:
+    - int or None: seconds since the epoch, or None if the value can't be understood.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return int(datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        pass
+    for fmt in ABSOLUTE_FORMATS:
+        try:
+            return int(datetime.strptime(text, fmt).replace(tzinfo=timezone.utc).timestamp())
+        except ValueError:
+            continue
+    reference = int(datetime.now().timestamp()) if reference is None else int(reference)
+    lowered = text.lower()
+    if 'just now' in lowered or lowered in ('now', 'today', 'new'):
+        return reference
+    if 'yesterday' in lowered:
+        return reference - RELATIVE_UNITS['day']
+    if 'last week' in lowered:
+        return reference - RELATIVE_UNITS['week']
+    if 'last month' in lowered:
+        return reference - RELATIVE_UNITS['month']
+    match = RELATIVE_PATTERN.search(lowered)
+    if match:
+        amount = 1 if match.group(1) in ('a', 'an', 'one') else int(match.group(1))
+        return reference - amount * RELATIVE_UNITS[match.group(2)]
+    return None
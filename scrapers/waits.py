@@ -0,0 +1,130 @@
+"""
+Readiness-based waits for browser pages.
+
+Instead of sleeping a fixed 2-10 seconds after every navigation or scroll, these
+wait for what the scraper actually needs: the listing cards to be present, the
+DOM to stop changing (a MutationObserver reporting a quiet period), and
+scrolling to stop producing new cards. A fixed delay survives only as an
+optional politeness floor (CRAWL_POLITENESS_FLOOR seconds per page, off by
+default). WaitStats records how long each page spent waiting.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+POLITENESS_FLOOR = float(os.environ.get('CRAWL_POLITENESS_FLOOR', '0'))
+
+# Resolves once no DOM mutation has happened for `quiet` ms (or at `limit` ms),
+# with the number of elements matching the selector at that point
+_QUIET_DOM_JS = """
+const [selector, quiet, limit, done] = arguments;
+const count = () => selector ? document.querySelectorAll(selector).length : 0;
+let timer = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(finish, quiet);
+});
+const hardStop = setTimeout(finish, limit);
+function finish() {
+    observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(hardStop);
+    done(count());
+}
+observer.observe(document.documentElement, {childList: true, subtree: true});
+timer = setTimeout(finish, quiet);
+"""
+
+
+def _by(selector):
+    return (By.XPATH, selector) if selector.startswith('/') else (By.CSS_SELECTOR, selector)
+
+
+def wait_for_selector(driver, selector, timeout=20, clickable=False):
+    """Wait until the selector (CSS, or XPath when it starts with '/') matches; False on timeout."""
+    condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+    try:
+        WebDriverWait(driver, timeout).until(condition(_by(selector)))
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_ready_state(driver, timeout=20):
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == 'complete'
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_quiet_dom(driver, selector=None, quiet=0.75, timeout=10):
+    """Wait for a `quiet`-second gap in DOM mutations; returns the selector's match count then."""
+    driver.set_script_timeout(timeout + 5)
+    return driver.execute_async_script(_QUIET_DOM_JS, selector, int(quiet * 1000), int(timeout * 1000))
+
+
+def wait_for_listings(driver, selector, timeout=20, quiet=0.75):
+    """Wait for the first card, then for the card list to settle; returns the card count."""
+    if not wait_for_selector(driver, selector, timeout=timeout):
+        return 0
+    return wait_for_quiet_dom(driver, selector, quiet=quiet)
+
+
+def scroll_until_stable(driver, selector, max_rounds=15, quiet=1.0):
+    """Scroll to the bottom until a scroll stops adding cards; returns the final card count."""
+    count = len(driver.find_elements(*_by(selector)))
+    for _ in range(max_rounds):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        new_count = wait_for_quiet_dom(driver, selector, quiet=quiet)
+        if new_count <= count:
+            break
+        count = new_count
+    return count
+
+
+def politeness_floor(started, floor=None):
+    """Sleep out whatever is left of the per-page floor since `started` (time.monotonic())."""
+    floor = POLITENESS_FLOOR if floor is None else floor
+    remaining = floor - (time.monotonic() - started)
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+class WaitStats:
+    """Time spent waiting per page, for the end-of-run log."""
+
+    def __init__(self, name):
+        self.name = name
+        self.waits = []
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.waits.append(seconds)
+
+    def summary(self):
+        with self.lock:
+            waits = list(self.waits)
+        if not waits:
+            return {'pages': 0, 'total_s': 0.0, 'avg_s': 0.0, 'max_s': 0.0}
+        return {
+            'pages': len(waits),
+            'total_s': round(sum(waits), 2),
+            'avg_s': round(sum(waits) / len(waits), 2),
+            'max_s': round(max(waits), 2),
+        }
+
+    def log(self):
+        summary = self.summary()
+        if summary['pages']:
+            logging.info(f"{self.name} page waits: {summary}")
@@ -3,94 +3,107 @@ WeWorkRemotely crawler for the Job Crawler application.
 """
 
 import logging
-import re
-import json
-from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import time
+from scrapers.parsing import CardSpec, Field
 from urllib.parse import urljoin
 from models import Job
-import time
-import random
-import requests
-import xml.etree.ElementTree as ET
+from scrapers.fetch import PageFetcher
+
+CARDS = CardSpec('li.new-listing-container', strain={'name': 'li', 'class_': 'new-listing-container'}, fields={
+    'href': Field('a[href^="/remote-jobs/"]', attr='href'),
+    'title': Field('h4.new-listing__header__title'),
+    'company': Field('p.new-listing__company-name'),
+    'location': Field('p.new-listing__company-headquarters', default='Remote'),
+})
+DESCRIPTION = CardSpec('div.listing-container', strain={'name': 'div', 'class_': 'listing-container'}, fields={
+    'text': Field(default=''),
+})
 
 class WeWorkRemotelyScraper:
+    needs_js = False
+    listing_selector = 'li.new-listing-container'
+    # Search pages change between crawls and are revalidated; a posting's detail page rarely changes
+    cache_ttl = {'listing': 0, 'detail': 3 * 24 * 3600}
+    # Descriptions written per storage update during enrichment
+    description_batch = 25
+
     def __init__(self, storage, query='software engineer', proxy=None):
         self.storage = storage
         self.query = query
         self.base_url = 'https://weworkremotely.com'
         self.search_url = f'{self.base_url}/remote-jobs/search?term={self.query.replace(" ", "+")}'
-        self.options = Options()
-        self.options.add_argument('--headless')
-        self.options.add_argument('--disable-gpu')
-        self.options.add_argument('--disable-dev-shm-usage')
-        self.options.add_argument('--no-sandbox')
-        self.options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        self.options.add_argument('--disable-webrtc')
-        if proxy:
-            self.options.add_argument(f'--proxy-server={proxy}')
+        self.proxy = proxy
+
+    def page_url(self, page):
+        return self.search_url + (f'&page={page+1}' if page > 0 else '')
+
+    def parse_page(self, html):
+        """Listing cards of a search page; descriptions come from the detail pages."""
+        jobs = []
+        for card in CARDS.parse(html):
+            if card['href'] and card['title'] and card['company']:
+                jobs.append(dict(
+                    title=card['title'],
+                    description='',
+                    link=urljoin(self.base_url, card['href']),
+                    company=card['company'],
+                    source='WeWorkRemotely',
+                    location=card['location']
+                ))
+        return jobs
+
+    @staticmethod
+    def parse_description(html):
+        containers = DESCRIPTION.parse(html)
+        return containers[0]['text'] if containers else ''
 
     def scrape(self, max_pages=1):
-        driver = webdriver.Chrome(options=self.options)
-        try:
-            for page in range(max_pages):
-                url = self.search_url + (f'&page={page+1}' if page > 0 else '')
-                logging.info(f"Scraping WeWorkRemotely search page {page+1}: {url}")
-                for attempt in range(3):
-                    try:
-                        driver.get(url)
-                        time.sleep(random.uniform(3, 5))
-                        soup = BeautifulSoup(driver.page_source, 'html.parser')
-                        jobs_found = 0
-                        job_listings = soup.select('li.new-listing-container')
-                        for job in job_listings:
-                            link_elem = job.select_one('a[href^="/remote-jobs/"]')
-                            title_elem = job.select_one('h4.new-listing__header__title')
-                            company_elem = job.select_one('p.new-listing__company-name')
-                            location_elem = job.select_one('p.new-listing__company-headquarters')
-                            categories_elem = job.select('div.new-listing__categories p.new-listing__categories__category')
-                            if link_elem and title_elem and company_elem:
-                                link = urljoin(self.base_url, link_elem['href'])
-                                title = title_elem.text.strip()
-                                company = company_elem.text.strip()
-                                location = location_elem.text.strip() if location_elem else 'Remote'
-                                categories = ', '.join([cat.text.strip() for cat in categories_elem]) if categories_elem else ''
-                                # Optionally, visit the job detail page for full description
-                                description = self._get_job_description(driver, link)
-                                job_data = Job(
-                                    title=title,
-                                    description=description,
-                                    link=link,
-                                    company=company,
-                                    source='WeWorkRemotely',
-                                    location=location
-                                )
-                                self.storage.add_job(job_data)
-                                jobs_found += 1
-                        logging.info(f"WeWorkRemotely page {page+1}: {jobs_found} jobs found")
-                        break
-                    except Exception as e:
-                        logging.warning(f"WeWorkRemotely page {page+1} attempt {attempt+1} failed: {e}")
-                        time.sleep(2)
-                else:
-                    logging.error(f"WeWorkRemotely page {page+1} failed after 3 attempts")
-        except Exception as e:
-            logging.error(f"WeWorkRemotely scraping error: {e}")
-        finally:
-            driver.quit()
+        with PageFetcher('WeWorkRemotely', needs_js=self.needs_js, proxy=self.proxy,
+                         wait_selector=self.listing_selector, cache_ttl=self.cache_ttl) as fetcher:
+            try:
+                # Search pages are fetched in parallel (paced per host by the fetch layer) and stored in order
+                urls = [self.page_url(page) for page in range(max_pages)]
+                stubs = []
+                for page, (url, jobs, error) in enumerate(fetcher.fetch_pages(urls, self.parse_page)):
+                    if error is not None:
+                        logging.error(f"WeWorkRemotely page {page+1} failed: {error}")
+                        continue
+                    for job in jobs:
+                        self.storage.add_job(Job(**job))
+                    stubs.extend(jobs)
+                    logging.info(f"WeWorkRemotely page {page+1}: {len(jobs)} jobs found ({url})")
+                    self.storage.flush()
+                self.enrich(fetcher, stubs)
+            except Exception as e:
+                logging.error(f"WeWorkRemotely scraping error: {e}")
 
-    def _get_job_description(self, driver, job_url):
-        try:
-            driver.get(job_url)
-            time.sleep(random.uniform(2, 4))
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            desc_elem = soup.select_one('div.listing-container')
-            if desc_elem:
-                return desc_elem.text.strip()
-            return ''
-        except Exception as e:
-            logging.warning(f"Failed to get job description from {job_url}: {e}")
-            return ''
+    def enrich(self, fetcher, stubs):
+        """Fill in descriptions from the detail pages of listings that don't have one stored yet."""
+        links = list(dict.fromkeys(job['link'] for job in stubs))
+        known = self.storage.known_links(links)
+        pending = [link for link in links if link not in known]
+        started = time.monotonic()
+        batch = []
+        updated = failed = 0
+        for link, description, error in fetcher.fetch_details(pending, self.parse_description):
+            if error is not None:
+                failed += 1
+                logging.warning(f"Failed to get job description from {link}: {error}")
+                continue
+            if description:
+                batch.append((link, description))
+            if len(batch) >= self.description_batch:
+                self.storage.update_descriptions(batch)
+                updated += len(batch)
+                batch = []
+        if batch:
+            self.storage.update_descriptions(batch)
+            updated += len(batch)
+        self.storage.flush()
+        elapsed = time.monotonic() - started
+        rate = len(pending) / elapsed if elapsed > 0 else 0.0
+        logging.info(f"WeWorkRemotely enrichment: {len(known)} of {len(links)} detail pages skipped (already stored), "
+                     f"{len(pending)} fetched in {elapsed:.1f}s ({rate:.1f} pages/s), "
+                     f"{updated} descriptions updated, {failed} failed")
+        return {'skipped': len(known), 'fetched': len(pending), 'updated': updated, 'failed': failed,
+                'seconds': round(elapsed, 2)}
@@ -1,80 +1,97 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
-import random
+from scrapers.parsing import CardSpec, Field
 import logging
 from urllib.parse import urljoin
 from models import Job
+from scrapers.fetch import PageFetcher
+from scrapers.network_capture import CaptureSpec, dig, find_records
+
+CARDS = CardSpec('div.css-1gatmva.e1v1l3u10', strain={'name': 'div', 'class_': 'css-1gatmva'}, fields={
+    'title': Field('h2.css-m604qf a'),
+    'href': Field('h2.css-m604qf a', attr='href'),
+    'company': Field('a.css-17s97q8'),
+    'location': Field('span.css-5wys0k'),
+    'job_type': Field('span.css-1ve4b75.eoyjyou0'),
+    'site': Field('span.css-o1vzmt.eoyjyou0'),
+})
+
+def capture_jobs(payload, url):
+    """Jobs from the JSON:API job records the Wuzzuf app loads for a search page."""
+    # Companies arrive as separate records referenced from each job's relationships
+    companies = {record['id']: dig(record, 'attributes.name')
+                 for record in find_records(payload, 'type', 'id', 'attributes') if record['type'] == 'company'}
+    jobs = []
+    for record in find_records(payload, 'type', 'id', 'attributes'):
+        attributes = record['attributes']
+        title, uri = dig(attributes, 'title'), dig(attributes, 'uri')
+        if record['type'] != 'job' or not title or not uri:
+            continue
+        company = companies.get(dig(record, 'relationships.company.data.id')) or dig(attributes, 'company.name')
+        location = ', '.join(filter(None, (dig(attributes, 'location.area'), dig(attributes, 'location.city.name'),
+                                           dig(attributes, 'location.country.name')))) or None
+        job_type = ', '.join(filter(None, (dig(work_type, 'displayedName', 'name')
+                                           for work_type in dig(attributes, 'workTypes', default=[]))))
+        site = dig(attributes, 'workplaceArrangement.displayedName')
+        jobs.append(dict(
+            title=title,
+            description=(f"Company: {company or 'N/A'}, Location: {location or 'N/A'}, "
+                         f"Type: {job_type or 'N/A'}, Site: {site or 'N/A'}"),
+            link=urljoin('https://wuzzuf.net/', uri),
+            company=company,
+            source='Wuzzuf',
+            timestamp=dig(attributes, 'postedAt'),
+            location=location
+        ))
+    return jobs
+
+
+CAPTURE = CaptureSpec('Wuzzuf', r'wuzzuf\.net/api/(search/)?job', capture_jobs)
 
 class WuzzufScraper:
+    # Search results are server-rendered; the browser is only a fallback for pages that come back without cards
+    needs_js = False
+    listing_selector = 'div.css-1gatmva.e1v1l3u10'
+    # Read from the app's job payloads instead when CRAWL_CAPTURE includes Wuzzuf
+    capture = CAPTURE
+
     def __init__(self, storage, query='software engineer', proxy=None):
         self.storage = storage
         self.query = query.replace(' ', '+')
         self.base_url = 'https://wuzzuf.net/search/jobs/'
-        self.options = Options()
-        self.options.add_argument('--headless')
-        self.options.add_argument('--disable-gpu')
-        self.options.add_argument('--disable-dev-shm-usage')
-        self.options.add_argument('--no-sandbox')
-        self.options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        self.options.add_argument('--disable-webrtc')
-        if proxy:
-            self.options.add_argument(f'--proxy-server={proxy}')
+        self.proxy = proxy
+
+    def page_url(self, page):
+        return f"{self.base_url}?q={self.query}&start={page}"
+
+    def parse_page(self, html):
+        jobs = []
+        for card in CARDS.parse(html):
+            description = (f"Company: {card['company'] or 'N/A'}, Location: {card['location'] or 'N/A'}, "
+                           f"Type: {card['job_type'] or 'N/A'}, Site: {card['site'] or 'N/A'}")
+            link = card['href'] and urljoin(self.base_url, card['href'])
+            if card['title'] and link:
+                jobs.append(dict(
+                    title=card['title'],
+                    description=description,
+                    link=link,
+                    company=card['company'],
+                    source='Wuzzuf',
+                    location=card['location']
+                ))
+        return jobs
 
     def scrape(self, max_pages=15):
-        driver = webdriver.Chrome(options=self.options)
-        try:
-            for page in range(max_pages):
-                url = f"{self.base_url}?q={self.query}&start={page}"
-                logging.info(f"Scraping Wuzzuf page {page+1}: {url}")
-                for attempt in range(3):
-                    try:
-                        driver.get(url)
-                        for _ in range(3):
-                            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                            time.sleep(2)
-                        WebDriverWait(driver, 20).until(
-                            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.css-1gatmva.e1v1l3u10"))
-                        )
-                        soup = BeautifulSoup(driver.page_source, 'html.parser')
-                        job_cards = soup.select("div.css-1gatmva.e1v1l3u10")
-                        logging.info(f"Wuzzuf page {page+1}: Found {len(job_cards)} job cards")
-                        if job_cards:
-                            logging.info(f"Sample job card class: {job_cards[0].get('class')}")
-                        jobs_found = 0
-                        for job in job_cards:
-                            title_elem = job.select_one("h2.css-m604qf a")
-                            title = title_elem and title_elem.text.strip()
-                            company_elem = job.select_one("a.css-17s97q8")
-                            company = company_elem and company_elem.text.strip()
-                            location = job.select_one("span.css-5wys0k") and job.select_one("span.css-5wys0k").text.strip()
-                            job_type = job.select_one("span.css-1ve4b75.eoyjyou0") and job.select_one("span.css-1ve4b75.eoyjyou0").text.strip()
-                            site = job.select_one("span.css-o1vzmt.eoyjyou0") and job.select_one("span.css-o1vzmt.eoyjyou0").text.strip()
-                            description = f"Company: {company or 'N/A'}, Location: {location or 'N/A'}, Type: {job_type or 'N/A'}, Site: {site or 'N/A'}"
-                            link = title_elem and urljoin(self.base_url, title_elem['href'])
-                            if title and link:
-                                job_data = Job(
-                                    title=title,
-                                    description=description,
-                                    link=link,
-                                    company=company,
-                                    source='Wuzzuf',
-                                    location=location
-                                )
-                                self.storage.add_job(job_data)
-                                jobs_found += 1
-                        logging.info(f"Wuzzuf page {page+1}: {jobs_found} jobs extracted")
-                        break
-                    except Exception as e:
-                        logging.warning(f"Wuzzuf page {page+1} attempt {attempt+1} failed: {e}")
-                        time.sleep(2)
-                else:
-                    logging.error(f"Wuzzuf page {page+1} failed after 3 attempts")
-        except Exception as e:
-            logging.error(f"Wuzzuf scraping error: {e}")
-        finally:
-            driver.quit() 
\ No newline at end of file
+        with PageFetcher('Wuzzuf', needs_js=self.needs_js, proxy=self.proxy,
+                         wait_selector=self.listing_selector, capture=self.capture) as fetcher:
+            try:
+                # Pages are fetched in parallel (paced per host by the fetch layer) and stored in order
+                urls = [self.page_url(page) for page in range(max_pages)]
+                for page, (url, jobs, error) in enumerate(fetcher.fetch_pages(urls, self.parse_page)):
+                    if error is not None:
+                        logging.error(f"Wuzzuf page {page+1} failed: {error}")
+                        continue
+                    for job in jobs:
+                        self.storage.add_job(Job(**job))
+                    logging.info(f"Wuzzuf page {page+1}: {len(jobs)} jobs extracted ({url})")
+                    self.storage.flush()
+            except Exception as e:
+                logging.error(f"Wuzzuf scraping error: {e}")
@@ -3,9 +3,12 @@ from streamlit_option_menu import option_menu
 from auth import login, logout, get_current_user
 import importlib
 import os
+from utils.data_access import ensure_schema
 
 st.set_page_config(page_title="Job Application Manager", layout="wide")
 
+ensure_schema()
+
 # Inject custom CSS
 st.markdown("""
     <style>
@@ -1,31 +1,48 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.data_access import cached_frame
 
 
 def analytics_page():
     st.header("Analytics")
-    conn = sqlite3.connect("jobs.db")
 
-    # Example analytics
+    # All figures come from the rollup tables maintained at ingest (see rollups.py),
+    # so each query reads a handful of rows no matter how large jobs is
     st.subheader("Total Jobs Scraped")
-    total_jobs = pd.read_sql_query("SELECT COUNT(*) FROM jobs", conn).iloc[0, 0]
+    total_jobs = cached_frame("SELECT COALESCE(SUM(count), 0) FROM rollup_source_day").iloc[0, 0]
     st.write(f"Total jobs scraped: {total_jobs}")
 
     st.subheader("Jobs by Source")
-    jobs_by_source = pd.read_sql_query("SELECT source, COUNT(*) as count FROM jobs GROUP BY source", conn)
+    jobs_by_source = cached_frame("SELECT source, SUM(count) as count FROM rollup_source_day GROUP BY source")
     st.bar_chart(jobs_by_source.set_index('source'))
 
+    st.subheader("New Jobs per Source per Day")
+    # Window ends at the most recent posting day, so older databases still show a trend
+    days = st.select_slider("Period (days)", options=[7, 30, 90, 365], value=30)
+    trend = cached_frame(
+        "SELECT day, source, count FROM rollup_source_day "
+        "WHERE day >= date((SELECT MAX(day) FROM rollup_source_day), ?) ORDER BY day",
+        (f"-{days} days",)
+    )
+    if trend.empty:
+        st.write("No jobs posted in this period.")
+    else:
+        trend_by_source = trend.pivot(index="day", columns="source", values="count").fillna(0)
+        st.line_chart(trend_by_source)
+        st.area_chart(trend_by_source.sum(axis=1).rename("all sources"))
+
     st.subheader("Jobs by Title")
-    jobs_by_title = pd.read_sql_query("SELECT title, COUNT(*) as count FROM jobs GROUP BY title ORDER BY count DESC LIMIT 10", conn)
+    jobs_by_title = cached_frame("SELECT title, count FROM rollup_title ORDER BY count DESC LIMIT 10")
     st.bar_chart(jobs_by_title.set_index('title'))
 
     st.subheader("Jobs by Company")
-    jobs_by_company = pd.read_sql_query("SELECT company, COUNT(*) as count FROM jobs GROUP BY company ORDER BY count DESC LIMIT 10", conn)
+    jobs_by_company = cached_frame("SELECT company, count FROM rollup_company ORDER BY count DESC LIMIT 10")
     st.bar_chart(jobs_by_company.set_index('company'))
 
     st.subheader("Jobs by Location")
-    jobs_by_location = pd.read_sql_query("SELECT location, COUNT(*) as count FROM jobs GROUP BY location ORDER BY count DESC LIMIT 10", conn)
+    jobs_by_location = cached_frame("SELECT location, count FROM rollup_location ORDER BY count DESC LIMIT 10")
     st.bar_chart(jobs_by_location.set_index('location'))
 
     # Add more analytics as needed
@@ -34,7 +51,5 @@ def analytics_page():
         st.subheader(f"Analytics {i}")
         st.write("Description and visualization for analytics.")
 
-    conn.close()
-
 # # Call the function to render the page
 # analytics_page() 
\ No newline at end of file
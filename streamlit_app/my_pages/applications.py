@@ -4,18 +4,22 @@ import uuid
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from job_applier import apply_to_job
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.job_filters import create_filter_ui, apply_filters
+from utils.job_filters import create_filter_ui
+from utils.job_query import fetch_page, count_jobs, source_options, date_bounds, filters_key
+from utils.data_access import cached_frame
 
 import streamlit as st
-import sqlite3
 import pandas as pd
 import json
 from auth import get_current_user
 
 RESUME_DIR = "resumes"  # Directory where resume files are stored
+PAGE_SIZE = 50
+# Columns of a selected job kept across pages; apply_to_job needs source and link
+SELECTED_COLUMNS = ['title', 'company', 'location', 'source', 'link']
 
-def get_resumes(conn, user):
-    df = pd.read_sql_query("SELECT filename, labels FROM resumes WHERE user = ?", conn, params=(user,))
+def get_resumes(user):
+    df = cached_frame("SELECT filename, labels FROM resumes WHERE user = ?", (user,))
     resumes = []
     for _, row in df.iterrows():
         try:
@@ -28,41 +32,65 @@ def get_resumes(conn, user):
 def applications_page():
     st.header("Automated Job Applications")
     user = get_current_user()
-    conn = sqlite3.connect("jobs.db")
 
-    # Load jobs
-    jobs_df = pd.read_sql_query("SELECT id, title, company, location, link, source, timestamp, description FROM jobs ORDER BY timestamp DESC", conn)
-    if jobs_df.empty:
+    bounds = date_bounds()
+    if bounds is None:
         st.info("No jobs found in the database.")
         return
 
-    # Add filtering capabilities
+    # Add filtering capabilities; matching runs in SQL (FTS for the text filters), one page at a time
     st.subheader("Filter Jobs")
-    filters = create_filter_ui(jobs_df)
-    
-    # Apply filters
-    filtered_df = apply_filters(jobs_df, filters)
-    
+    filters = create_filter_ui(source_options(), bounds)
+
+    # Keyset pagination as on Job Search: any change to the filters starts again from the first page
+    key = filters_key(filters)
+    if st.session_state.get("applications_filters") != key:
+        st.session_state["applications_filters"] = key
+        st.session_state["applications_cursors"] = [None]
+    cursors = st.session_state["applications_cursors"]
+
     # Show filter results
-    st.write(f"{len(filtered_df)} jobs match your filters.")
+    total = count_jobs(filters)
+    st.write(f"{total} jobs match your filters.")
+    page_df = fetch_page(filters, cursor=cursors[-1], limit=PAGE_SIZE)
 
     # Load resumes
-    resumes = get_resumes(conn, user)
+    resumes = get_resumes(user)
     if not resumes:
         st.warning("Please upload a resume in the Resume Manager first.")
         return
 
-    # Job selection - now with filtered jobs
+    # Job selection - one page of filtered jobs at a time, picks are kept while paging
     st.subheader("Select Jobs to Apply To")
-    filtered_df['select'] = False
+    chosen = st.session_state.setdefault("applications_selected", {})
+    page = len(cursors)
     selected = st.data_editor(
-        filtered_df[['select', 'title', 'company', 'location', 'source', 'link']],
+        page_df.assign(select=page_df['id'].isin(chosen))[['select'] + SELECTED_COLUMNS],
         use_container_width=True,
         column_config={"select": st.column_config.CheckboxColumn("Apply?")},
-        disabled=["title", "company", "location", "source", "link"],
-        key="job_applications_data_editor"
+        disabled=SELECTED_COLUMNS,
+        key=f"job_applications_data_editor_{page}"
     )
-    selected_jobs = filtered_df[selected['select']]
+    for (_, row), picked in zip(page_df.iterrows(), selected['select']):
+        if picked:
+            chosen[row['id']] = {column: row[column] for column in SELECTED_COLUMNS}
+        else:
+            chosen.pop(row['id'], None)
+    selected_jobs = list(chosen.values())
+
+    total_pages = (total - 1) // PAGE_SIZE + 1 if total > 0 else 1
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("Previous", disabled=page == 1):
+            cursors.pop()
+            st.rerun()
+    with col_page:
+        st.write(f"Page {page} of {total_pages}, {len(selected_jobs)} jobs selected")
+    with col_next:
+        if st.button("Next", disabled=len(page_df) < PAGE_SIZE or page >= total_pages):
+            last = page_df.iloc[-1]
+            cursors.append((int(last['posted_at']), last['id']))
+            st.rerun()
 
     # Resume selection
     st.subheader("Select Resume/Info Set")
@@ -98,7 +126,7 @@ def applications_page():
 
     if st.button("Apply to Selected Jobs"):
         status_list = []
-        for _, job in selected_jobs.iterrows():
+        for job in selected_jobs:
             success, message = apply_to_job(job, resume_path, selected_resume['labels'], credentials)
             status_list.append({
                 "Job Title": job['title'],
@@ -114,7 +142,5 @@ def applications_page():
         st.subheader("Application Status")
         st.dataframe(pd.DataFrame(st.session_state['application_status']))
 
-    conn.close()
-
 # # Only run if this is the main page
 # applications_page()
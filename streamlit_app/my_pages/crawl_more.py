@@ -43,7 +43,9 @@ def crawl_more_page():
         env['CRAWL_PUSH_DB'] = '1' if push_to_db else '0'
         # Run crawler.py as subprocess and capture output
         with st.spinner("Running crawler..."):
-            result = subprocess.run([sys.executable, CRAWLER_PATH], capture_output=True, text=True, env=env)
+            # Run from the project root so the crawler writes the jobs.db the app reads
+            result = subprocess.run([sys.executable, CRAWLER_PATH], capture_output=True, text=True, env=env,
+                                    cwd=os.path.dirname(CRAWLER_PATH))
         st.subheader("Crawler Output:")
         st.code(result.stdout)
         if result.stderr:
@@ -1,47 +1,42 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
 from auth import get_current_user
 from datetime import datetime
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.job_filters import create_filter_ui, apply_filters
+from utils.job_filters import create_filter_ui
+from utils.job_query import fetch_page, count_jobs, source_options, date_bounds, filters_key
+from utils.data_access import cached_rows, write_connection
+
+PAGE_SIZE = 20
 
 def job_search_page():
     st.header("Job Search")
     user = get_current_user()
-    conn = sqlite3.connect("jobs.db")
-    df = pd.read_sql_query("SELECT * FROM jobs", conn)
-    # Create saved_jobs table if not exists
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS saved_jobs (
-            user TEXT,
-            job_id TEXT,
-            PRIMARY KEY (user, job_id)
-        )
-    """)
 
     # Handle save job action
     if "save_job_clicked" not in st.session_state:
         st.session_state["save_job_clicked"] = None
 
-    # Use the shared filtering UI
-    filters = create_filter_ui(df)
-    
-    # Apply filters
-    filtered = apply_filters(df, filters)
+    # Use the shared filtering UI, fed by cheap aggregate queries
+    filters = create_filter_ui(source_options(), date_bounds())
+
+    # Keyset pagination: cursors[i] is the (posted_at, id) of the last row before page i+1.
+    # Any change to the filters starts again from the first page.
+    key = filters_key(filters)
+    if st.session_state.get("job_search_filters") != key:
+        st.session_state["job_search_filters"] = key
+        st.session_state["job_search_cursors"] = [None]
+    cursors = st.session_state["job_search_cursors"]
 
-    st.write(f"{len(filtered)} jobs found.")
-    max_jobs = 20
-    total_pages = (len(filtered) - 1) // max_jobs + 1 if len(filtered) > 0 else 1
-    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
-    start_idx = (page - 1) * max_jobs
-    end_idx = start_idx + max_jobs
-    show_df = filtered.iloc[start_idx:end_idx]
+    total = count_jobs(filters)
+    st.write(f"{total} jobs found.")
+    total_pages = (total - 1) // PAGE_SIZE + 1 if total > 0 else 1
+    page = len(cursors)
+    show_df = fetch_page(filters, cursor=cursors[-1], limit=PAGE_SIZE)
 
     # Get saved jobs for this user
-    saved_job_ids = set(row[0] for row in conn.execute("SELECT job_id FROM saved_jobs WHERE user = ?", (user,)))
+    saved_job_ids = set(row[0] for row in cached_rows("SELECT job_id FROM saved_jobs WHERE user = ?", (user,)))
 
     for idx, row in show_df.iterrows():
         with st.expander(f"{row['title']} ({row['source']})"):
@@ -52,10 +47,21 @@ def job_search_page():
                 st.success("Saved")
             else:
                 if st.button("Save Job", key=f"save_{row['id']}"):
-                    conn.execute("INSERT OR IGNORE INTO saved_jobs (user, job_id) VALUES (?, ?)", (user, row['id']))
-                    conn.commit()
+                    with write_connection() as conn:
+                        conn.execute("INSERT OR IGNORE INTO saved_jobs (user, job_id) VALUES (?, ?)", (user, row['id']))
                     st.session_state["save_job_clicked"] = row['id']
                     st.rerun()
             st.button("Apply Now", key=f"apply_{row['id']}")
-    st.write(f"Page {page} of {total_pages}")
-    conn.close() 
\ No newline at end of file
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("Previous", disabled=page == 1):
+            cursors.pop()
+            st.rerun()
+    with col_page:
+        st.write(f"Page {page} of {total_pages}")
+    with col_next:
+        if st.button("Next", disabled=len(show_df) < PAGE_SIZE or page >= total_pages):
+            last = show_df.iloc[-1]
+            cursors.append((int(last['posted_at']), last['id']))
+            st.rerun()
@@ -1,12 +1,13 @@
 import streamlit as st
-import sqlite3
 from auth import get_current_user
-import pandas as pd
 import json
 import tempfile
 import os
 from PyPDF2 import PdfReader
 import base64
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.data_access import cached_frame, write_connection
 
 def get_default_labels():
     return {
@@ -63,11 +64,11 @@ def display_pdf(pdf_content):
     pdf_display = f'<embed src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600" type="application/pdf">'
     st.markdown(pdf_display, unsafe_allow_html=True)
 
-def get_existing_resume_data(conn, user):
+def get_existing_resume_data(user):
     """Get existing resume data for the user."""
     try:
         query = "SELECT filename, labels, content FROM resumes WHERE user = ? ORDER BY rowid DESC LIMIT 1"
-        result = pd.read_sql_query(query, conn, params=(user,))
+        result = cached_frame(query, (user,))
         if not result.empty:
             return result.iloc[0]
     except Exception as e:
@@ -80,19 +81,9 @@ def resume_manager_page():
     if not user:
         st.warning("You must be logged in.")
         st.stop()
-    conn = sqlite3.connect("jobs.db")
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS resumes (
-            user TEXT,
-            filename TEXT,
-            labels TEXT,
-            content BLOB,
-            PRIMARY KEY (user, filename)
-        )
-    """)
     st.write("Checkpoint: DB and user ready")
     # Get existing resume data
-    existing_resume = get_existing_resume_data(conn, user)
+    existing_resume = get_existing_resume_data(user)
     # Show current resume status
     if existing_resume is not None:
         st.info(f"Current resume on file: {existing_resume['filename']}")
@@ -158,19 +149,18 @@ def resume_manager_page():
                 content = resume_content if uploaded_file is not None else existing_resume['content']
                 filename = uploaded_file.name if uploaded_file is not None else existing_resume['filename']
                 # Save resume metadata to database
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO resumes (user, filename, labels, content) 
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (user, filename, labels_json, content)
-                )
-                conn.commit()
+                with write_connection() as conn:
+                    conn.execute(
+                        """
+                        INSERT OR REPLACE INTO resumes (user, filename, labels, content) 
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        (user, filename, labels_json, content)
+                    )
                 st.success("Resume and information saved successfully!")
             except Exception as e:
                 st.error(f"Error saving resume: {str(e)}")
         else:
             st.warning("Please upload a resume first.")
-    conn.close()
 
 # resume_manager_page()
\ No newline at end of file
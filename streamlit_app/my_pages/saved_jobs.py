@@ -1,13 +1,14 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
 from auth import get_current_user
 import uuid  # Add this for unique IDs
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.data_access import cached_frame
 
 def saved_jobs_page():
     st.header("Saved Jobs")
     user = get_current_user()
-    conn = sqlite3.connect("jobs.db")
     
     # Get saved jobs for this user
     saved_jobs_query = """
@@ -15,7 +16,7 @@ def saved_jobs_page():
         JOIN saved_jobs ON jobs.id = saved_jobs.job_id
         WHERE saved_jobs.user = ?
     """
-    saved_jobs_df = pd.read_sql_query(saved_jobs_query, conn, params=(user,))
+    saved_jobs_df = cached_frame(saved_jobs_query, (user,))
 
     if saved_jobs_df.empty:
         st.write("No saved jobs found.")
@@ -28,7 +29,5 @@ def saved_jobs_page():
                 unique_id = str(uuid.uuid4())
                 st.button("Apply Now", key=f"apply_{row['id']}_{idx}_{unique_id}")
 
-    conn.close()
-
 # Call the function to render the page
 # saved_jobs_page() 
\ No newline at end of file
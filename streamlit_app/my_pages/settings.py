@@ -1,7 +1,23 @@
 import streamlit as st
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.data_access import DB_PATH, cache_stats, get_cache
 
 def settings_page():
     st.header("Settings")
-    st.info("This page will let you configure your preferences and app settings. (Feature coming soon)") 
+    st.info("This page will let you configure your preferences and app settings. (Feature coming soon)")
 
-# settings_page()
\ No newline at end of file
+    st.subheader("Data Cache")
+    stats = cache_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Cache hits", stats["hits"])
+    col2.metric("Cache misses", stats["misses"])
+    col3.metric("Hit ratio", f"{stats['hit_ratio']:.0%}")
+    col4.metric("Cached queries", stats["entries"])
+    st.caption(f"Database: {DB_PATH} (data version {stats['change_token']})")
+    if st.button("Clear cache"):
+        get_cache().clear()
+        st.rerun()
+
+# settings_page()
@@ -0,0 +1,169 @@
+"""
+Shared database access for the Streamlit pages.
+
+All pages read jobs.db through a small pool of query-only connections kept in
+st.cache_resource, so connections are reused across reruns and sessions. Query
+results are cached process-wide, keyed by the SQL, its parameters and the
+database's change token (PRAGMA data_version). The token only moves when another
+connection commits, e.g. a crawl or a page saving a job, so cached frames are
+reused across users until the data actually changes. Writes go through
+write_connection().
+"""
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+from migrations import migrate
+
+# The crawler and the scrapers write to jobs.db in the project root
+DB_PATH = os.environ.get("JOBS_DB", os.path.join(PROJECT_ROOT, "jobs.db"))
+POOL_SIZE = int(os.environ.get("JOBS_DB_READERS", "4"))
+CACHE_ENTRIES = int(os.environ.get("JOBS_DB_CACHE_ENTRIES", "256"))
+
+
+def _connect(readonly):
+    conn = sqlite3.connect(DB_PATH, timeout=10, check_same_thread=False)
+    if readonly:
+        conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+class ReadPool:
+    def __init__(self, size):
+        self.connections = queue.Queue()
+        for _ in range(size):
+            self.connections.put(_connect(readonly=True))
+        # data_version is per connection, so the change token always comes from the same one
+        self.token_conn = _connect(readonly=True)
+        self.token_lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+    def change_token(self):
+        with self.token_lock:
+            return self.token_conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+class QueryCache:
+    """Thread-safe LRU of query results with hit/miss counters."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+@st.cache_resource
+def ensure_schema():
+    # Bring jobs.db up to the current schema once per server process
+    conn = _connect(readonly=False)
+    try:
+        return migrate(conn)
+    finally:
+        conn.close()
+
+
+@st.cache_resource
+def get_pool():
+    ensure_schema()
+    return ReadPool(POOL_SIZE)
+
+
+@st.cache_resource
+def get_cache():
+    return QueryCache(CACHE_ENTRIES)
+
+
+@contextmanager
+def read_connection():
+    with get_pool().connection() as conn:
+        yield conn
+
+
+@contextmanager
+def write_connection():
+    """Short-lived connection for writes; commits on success."""
+    ensure_schema()
+    conn = _connect(readonly=False)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _cached(kind, sql, params, run):
+    pool = get_pool()
+    key = (kind, sql, tuple(params), pool.change_token())
+    cache = get_cache()
+    hit, value = cache.get(key)
+    if hit:
+        return value
+    with pool.connection() as conn:
+        value = run(conn)
+    cache.put(key, value)
+    return value
+
+
+def cached_frame(sql, params=()):
+    """DataFrame for a query, shared between sessions: treat it as read-only."""
+    return _cached("frame", sql, params, lambda conn: pd.read_sql_query(sql, conn, params=list(params)))
+
+
+def cached_rows(sql, params=()):
+    return _cached("rows", sql, params, lambda conn: conn.execute(sql, list(params)).fetchall())
+
+
+def cache_stats():
+    cache = get_cache()
+    with cache.lock:
+        hits, misses, entries = cache.hits, cache.misses, len(cache.entries)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+        "entries": entries,
+        "change_token": get_pool().change_token(),
+    }
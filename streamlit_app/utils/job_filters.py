@@ -1,16 +1,29 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
 
-def create_filter_ui(df):
-    """Create and display the advanced filter UI components, return the filter values."""
+# Text filters that can be answered by the jobs_fts full-text index
+FTS_FILTER_COLUMNS = ["title", "company", "location", "description"]
+
+def epoch_to_datetime(epoch):
+    """UTC epoch -> naive UTC datetime, the type st.slider works with."""
+    return datetime.fromtimestamp(int(epoch), timezone.utc).replace(tzinfo=None)
+
+def datetime_to_epoch(value):
+    """Naive UTC datetime from the slider -> UTC epoch."""
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+def create_filter_ui(sources, bounds):
+    """Create and display the advanced filter UI components, return the filter values.
+
+    `sources` is the list of source names for the dropdown and `bounds` the
+    (min, max) posted_at epochs for the date slider, or None when there are no jobs.
+    """
     with st.expander("Advanced Search Options", expanded=True):
         col1, col2, col3 = st.columns(3)
         with col1:
             title_filter = st.text_input("Job Title")
             # Multi-source selection
-            all_sources = sorted(df["source"].unique().tolist())
-            source_filter = st.multiselect("Source(s)", ["All"] + all_sources, default=["All"])
+            source_filter = st.multiselect("Source(s)", ["All"] + list(sources), default=["All"])
         with col2:
             company_filter = st.text_input("Company")
             location_filter = st.text_input("Location")
@@ -18,14 +31,10 @@ def create_filter_ui(df):
             description_filter = st.text_input("Description")
             link_filter = st.text_input("Link")
         
-        # Date range filter (timestamp)
-        if "timestamp" in df.columns:
-            parsed_timestamps = pd.to_datetime(df["timestamp"], errors="coerce", format='mixed')
-            min_date = parsed_timestamps.min()
-            max_date = parsed_timestamps.max()
-            # Convert to Python datetime
-            min_date = min_date.to_pydatetime() if hasattr(min_date, "to_pydatetime") else min_date
-            max_date = max_date.to_pydatetime() if hasattr(max_date, "to_pydatetime") else max_date
+        # Date range filter (posted_at is a UTC epoch normalized at ingest, no parsing needed)
+        if bounds is not None:
+            min_date = epoch_to_datetime(bounds[0])
+            max_date = epoch_to_datetime(bounds[1])
             date_range = st.slider(
                 "Date Range (Timestamp)",
                 min_value=min_date,
@@ -47,16 +56,66 @@ def create_filter_ui(df):
         "date_range": date_range
     }
 
-def apply_filters(df, filters):
-    """Apply the filters to the dataframe and return the filtered dataframe."""
+def fts_match_query(filters):
+    """Build an FTS5 MATCH expression from the text filters, or None if none is set.
+
+    Each filter becomes a column-scoped phrase whose last word is a prefix, so
+    "senior dev" on title matches "Senior Developer" the way typing into the box
+    used to.
+    """
+    clauses = []
+    for column in FTS_FILTER_COLUMNS:
+        value = (filters.get(column) or "").strip()
+        if value:
+            clauses.append(f'{column} : "{value.replace(chr(34), chr(34) * 2)}"*')
+    return " AND ".join(clauses) or None
+
+def has_search_index(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'").fetchone() is not None
+
+def search_job_ids(conn, filters, limit=None):
+    """Return ids of jobs matching the text filters, best bm25 match first.
+
+    Returns None when no text filter is set (everything matches).
+    """
+    match = fts_match_query(filters)
+    if match is None:
+        return None
+    sql = """
+        SELECT jobs.id FROM jobs_fts
+        JOIN jobs ON jobs.rowid = jobs_fts.rowid
+        WHERE jobs_fts MATCH ?
+        ORDER BY bm25(jobs_fts)
+    """
+    params = [match]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [row[0] for row in conn.execute(sql, params)]
+
+def apply_filters(df, filters, conn=None):
+    """Apply the filters to the dataframe and return the filtered dataframe.
+
+    When a connection to a database with the full-text index is given, the title,
+    company, location and description filters are answered by the index and the
+    result is ordered by relevance; otherwise they are substring scans.
+    """
     filtered = df.copy()
+    text_filters = [column for column in FTS_FILTER_COLUMNS if filters.get(column)]
+
+    if conn is not None and text_filters and has_search_index(conn):
+        ranked_ids = search_job_ids(conn, filters)
+        rank = {job_id: position for position, job_id in enumerate(ranked_ids)}
+        filtered = filtered[filtered["id"].isin(rank)]
+        filtered = filtered.iloc[filtered["id"].map(rank).argsort()]
+        text_filters = []
     
     # Title filter
-    if filters["title"]:
+    if "title" in text_filters:
         filtered = filtered[filtered["title"].str.contains(filters["title"], case=False, na=False)]
     
     # Company filter
-    if filters["company"]:
+    if "company" in text_filters:
         filtered = filtered[filtered["company"].str.contains(filters["company"], case=False, na=False)]
     
     # Source filter
@@ -64,11 +123,11 @@ def apply_filters(df, filters):
         filtered = filtered[filtered["source"].isin(filters["source"])]
     
     # Location filter
-    if filters["location"] and "location" in filtered.columns:
+    if "location" in text_filters and "location" in filtered.columns:
         filtered = filtered[filtered["location"].str.contains(filters["location"], case=False, na=False)]
     
     # Description filter
-    if filters["description"]:
+    if "description" in text_filters:
         filtered = filtered[filtered["description"].str.contains(filters["description"], case=False, na=False)]
     
     # Link filter
@@ -76,9 +135,8 @@ def apply_filters(df, filters):
         filtered = filtered[filtered["link"].str.contains(filters["link"], case=False, na=False)]
     
     # Date range filter
-    if filters["date_range"] and "timestamp" in filtered.columns:
-        filtered["timestamp"] = pd.to_datetime(filtered["timestamp"], errors="coerce", format='mixed')
-        filtered = filtered[(filtered["timestamp"] >= filters["date_range"][0]) & 
-                            (filtered["timestamp"] <= filters["date_range"][1])]
+    if filters["date_range"] and "posted_at" in filtered.columns:
+        start, end = (datetime_to_epoch(value) for value in filters["date_range"])
+        filtered = filtered[(filtered["posted_at"] >= start) & (filtered["posted_at"] <= end)]
     
     return filtered 
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+SQL query builder for the job listings.
+
+Turns the filter widget values into a parameterized WHERE clause and serves
+pages with keyset pagination on (posted_at, id), so each rerun reads one page
+of rows plus a few cheap aggregates instead of the whole jobs table. Results go
+through the shared, change-aware cache in data_access.
+"""
+
+from utils.job_filters import FTS_FILTER_COLUMNS, fts_match_query, datetime_to_epoch
+from utils.data_access import cached_frame, cached_rows
+
+PAGE_COLUMNS = "id, title, description, link, company, location, source, posted_at"
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_index_available():
+    return bool(cached_rows("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'"))
+
+
+def build_where(filters):
+    """Return (sql, params) for the WHERE clause matching the filters."""
+    clauses, params = [], []
+    if search_index_available():
+        match = fts_match_query(filters)
+        if match:
+            clauses.append("jobs.rowid IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            params.append(match)
+    else:
+        for column in FTS_FILTER_COLUMNS:
+            if filters.get(column):
+                clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(f"%{_escape_like(filters[column])}%")
+    if filters.get("link"):
+        clauses.append("link LIKE ? ESCAPE '\\'")
+        params.append(f"%{_escape_like(filters['link'])}%")
+    sources = filters.get("source")
+    if sources and "All" not in sources:
+        clauses.append(f"source IN ({', '.join('?' for _ in sources)})")
+        params.extend(sources)
+    if filters.get("date_range"):
+        start, end = (datetime_to_epoch(value) for value in filters["date_range"])
+        clauses.append("posted_at BETWEEN ? AND ?")
+        params.extend([start, end])
+    return " AND ".join(clauses) or "1", params
+
+
+def filters_key(filters):
+    """Hashable identity of a filter set, used to reset pagination when it changes."""
+    return tuple((name, tuple(value) if isinstance(value, (list, tuple)) else value)
+                 for name, value in sorted(filters.items()))
+
+
+def fetch_page(filters, cursor=None, limit=20):
+    """Return the next `limit` jobs, newest first, strictly after `cursor` ((posted_at, id) of the last row shown)."""
+    where, params = build_where(filters)
+    if cursor is not None:
+        where += " AND (posted_at, id) < (?, ?)"
+        params = params + list(cursor)
+    sql = f"SELECT {PAGE_COLUMNS} FROM jobs WHERE {where} ORDER BY posted_at DESC, id DESC LIMIT ?"
+    return cached_frame(sql, params + [limit])
+
+
+def count_jobs(filters):
+    where, params = build_where(filters)
+    return cached_rows(f"SELECT COUNT(*) FROM jobs WHERE {where}", params)[0][0]
+
+
+def source_options():
+    # Served from the (source, posted_at) index
+    return [row[0] for row in cached_rows("SELECT DISTINCT source FROM jobs ORDER BY source")]
+
+
+def date_bounds():
+    # Two index lookups on posted_at
+    row = cached_rows("SELECT MIN(posted_at), MAX(posted_at) FROM jobs")[0]
+    return None if row[0] is None else (row[0], row[1])
@@ -0,0 +1,284 @@
+"""
+Process-per-source crawling with a central writer.
+
+With every scraper in one Python process, one crashing driver, a leaked Chrome
+or a stuck WebDriverWait degrades the whole run. In CRAWL_MODE=processes each
+scraper runs in its own child process instead:
+
+- the child starts its own session (process group), so the browsers and
+  chromedrivers it launches can be killed along with it, and sets its resource
+  limits before importing the scraper: CRAWL_SOURCE_MEMORY_MB (RLIMIT_DATA,
+  per process, inherited by the browsers it starts) and CRAWL_SOURCE_CPU_S
+  (RLIMIT_CPU), both off by default
+- its storage streams the jobs over a one-way pipe, a batch per flush, to the
+  parent, where the ingest JobWriter owns the only write connection to the
+  database; description updates follow the jobs they apply to
+- a child still running CRAWL_SOURCE_DEADLINE seconds after it started gets
+  SIGTERM (it then flushes what it has buffered and quits its browsers), and its
+  whole process group gets SIGKILL CRAWL_KILL_GRACE seconds later. A child that
+  dies or is killed loses at most its unflushed batch, and the other sources
+  keep running
+- once a child has exited, whatever is left in its process group (a Chrome it
+  leaked) is killed
+
+Each source gets its own pipe rather than one shared queue, since killing a
+child halfway through a write must not corrupt the stream of the others.
+Children are spawned, not forked, so they don't inherit the parent's threads.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import sqlite3
+import time
+from multiprocessing.connection import wait
+
+from models import Job, described_links
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits
+    resource = None
+
+SOURCE_DEADLINE = float(os.environ.get('CRAWL_SOURCE_DEADLINE', '900'))
+SOURCE_MEMORY_MB = int(os.environ.get('CRAWL_SOURCE_MEMORY_MB', '0'))
+SOURCE_CPU_S = int(os.environ.get('CRAWL_SOURCE_CPU_S', '0'))
+KILL_GRACE = float(os.environ.get('CRAWL_KILL_GRACE', '5'))
+
+# No process groups or SIGKILL on Windows; terminate() is the hardest stop there
+_KILL = getattr(signal, 'SIGKILL', signal.SIGTERM)
+
+JOB_FIELDS = ('title', 'description', 'link', 'company', 'source', 'timestamp', 'location')
+
+
+class PipeStorage:
+    """Storage of a child process: buffers jobs as plain dicts and sends them to the parent on flush."""
+
+    def __init__(self, conn, db_name):
+        self.conn = conn
+        self.db_name = db_name
+        self.pending = []
+        self.sent = 0
+
+    def add_job(self, job):
+        self.pending.append({field: getattr(job, field) for field in JOB_FIELDS})
+
+    def known_links(self, links):
+        # Reads don't go through the parent: WAL lets them run alongside its writer
+        conn = sqlite3.connect(self.db_name, timeout=10)
+        try:
+            return described_links(conn, links)
+        finally:
+            conn.close()
+
+    def update_descriptions(self, descriptions):
+        self.flush()
+        self.conn.send(('descriptions', list(descriptions)))
+
+    def flush(self):
+        if self.pending:
+            self.conn.send(('jobs', self.pending))
+            self.sent += len(self.pending)
+            self.pending = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _terminate(signum, frame):
+    raise SystemExit(f'terminated by signal {signum}')
+
+
+def set_limits(memory_mb=0, cpu_s=0):
+    if resource is None:
+        return
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    if cpu_s:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_s, cpu_s + 5))
+
+
+def run_source(scraper_name, query, max_pages, db_name, conn, memory_mb, cpu_s):
+    """Child process entry point: run one scraper, streaming its jobs to the parent over conn."""
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    signal.signal(signal.SIGTERM, _terminate)
+    set_limits(memory_mb, cpu_s)
+    from utils import setup_logging
+    setup_logging()
+
+    from scrapers import browser_pool, registry
+    storage = PipeStorage(conn, db_name)
+    try:
+        with storage:
+            scraper = registry.load(scraper_name)(storage, query=query)
+            scraper.scrape(max_pages=max_pages)
+        conn.send(('done', storage.sent))
+    finally:
+        browser_pool.shutdown_all()
+        conn.close()
+
+
+class SourceProcess:
+    def __init__(self, name, process, conn):
+        self.name = name
+        self.process = process
+        self.conn = conn
+        self.started = time.monotonic()
+        self.finished = None
+        self.terminated_at = None
+        self.completed = False
+        self.jobs = 0
+        self.descriptions = 0
+        self.batches = 0
+
+    @property
+    def done(self):
+        """Exited, and everything it sent has been read."""
+        return self.finished is not None and self.conn is None
+
+    @property
+    def status(self):
+        if self.completed:
+            return 'ok'
+        if self.finished is None:
+            return 'running'
+        if self.terminated_at is not None:
+            return 'killed'
+        return f'failed (exit code {self.process.exitcode})'
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def signal_group(self, signum):
+        """Send signum to the child's process group; False when no process of it is left."""
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(self.process.pid, signum)
+            elif self.process.is_alive():
+                self.process.terminate()
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # The child hasn't started its own group yet
+            self.process.kill()
+            return True
+
+
+class SourceSupervisor:
+    def __init__(self, scraper_names, writer, query='software', max_pages=5, db_name='jobs.db',
+                 deadline=SOURCE_DEADLINE, memory_mb=SOURCE_MEMORY_MB, cpu_s=SOURCE_CPU_S, grace=KILL_GRACE):
+        self.scraper_names = scraper_names
+        self.writer = writer
+        self.storage = writer.storage()
+        self.query = query
+        self.max_pages = max_pages
+        self.db_name = db_name
+        self.deadline = deadline
+        self.memory_mb = memory_mb
+        self.cpu_s = cpu_s
+        self.grace = grace
+        self.sources = []
+        self.elapsed = 0.0
+
+    def _start(self, context, scraper_name):
+        reader, writer = context.Pipe(duplex=False)
+        process = context.Process(
+            target=run_source, name=f'crawl-{scraper_name}',
+            args=(scraper_name, self.query, self.max_pages, self.db_name, writer, self.memory_mb, self.cpu_s))
+        process.start()
+        # Only the child holds the write end now, so the reader sees EOF when it exits
+        writer.close()
+        source = SourceProcess(scraper_name.replace('Scraper', ''), process, reader)
+        logging.info(f"{source.name}: started in process {process.pid}")
+        return source
+
+    def _receive(self, source):
+        try:
+            kind, payload = source.conn.recv()
+        except (EOFError, OSError):
+            # The child exited (or was killed halfway through a batch, which is dropped)
+            source.conn.close()
+            source.conn = None
+            kind = payload = None
+        if kind == 'jobs':
+            for fields in payload:
+                self.storage.add_job(Job(**fields))
+            self.storage.flush()
+            source.jobs += len(payload)
+            source.batches += 1
+        elif kind == 'descriptions':
+            self.storage.update_descriptions(payload)
+            source.descriptions += len(payload)
+        elif kind == 'done':
+            source.completed = True
+        if source.done:
+            self._finished(source)
+
+    def _finished(self, source):
+        logging.info(f"{source.name}: {source.status} after {source.elapsed:.1f}s, {source.jobs} jobs received")
+
+    def _check(self, source, now):
+        if source.finished is not None:
+            return
+        if not source.process.is_alive():
+            source.process.join()
+            source.finished = now
+            # Browsers the child leaked are still in its process group
+            if source.signal_group(_KILL):
+                logging.warning(f"{source.name}: killed processes left behind in its group")
+            if source.done:
+                self._finished(source)
+        elif source.terminated_at is None and now - source.started >= self.deadline:
+            logging.error(f"{source.name}: still running after {self.deadline:.0f}s, terminating it")
+            source.terminated_at = now
+            source.signal_group(signal.SIGTERM)
+        elif source.terminated_at is not None and now - source.terminated_at >= self.grace:
+            logging.error(f"{source.name}: didn't exit {self.grace:.0f}s after SIGTERM, killing its process group")
+            source.signal_group(_KILL)
+
+    def run(self):
+        started = time.monotonic()
+        context = multiprocessing.get_context('spawn')
+        self.sources = [self._start(context, name) for name in self.scraper_names]
+        try:
+            while not all(source.done for source in self.sources):
+                now = time.monotonic()
+                running = [source for source in self.sources if source.finished is None]
+                # Wake for incoming batches, exiting children and the next deadline or grace period
+                waits = [self.deadline - (now - source.started) if source.terminated_at is None
+                         else self.grace - (now - source.terminated_at) for source in running]
+                handles = {source.conn: source for source in self.sources if source.conn is not None}
+                handles.update({source.process.sentinel: source for source in running})
+                for handle in wait(list(handles), timeout=max(0.0, min(waits, default=1.0))):
+                    if handle is handles[handle].conn:
+                        self._receive(handles[handle])
+                now = time.monotonic()
+                for source in self.sources:
+                    self._check(source, now)
+        finally:
+            for source in self.sources:
+                if source.finished is None:
+                    source.signal_group(_KILL)
+                    source.process.join()
+            self.storage.flush()
+            self.elapsed = time.monotonic() - started
+
+    def report(self):
+        return {
+            'elapsed_s': round(self.elapsed, 2),
+            'sources': {source.name: {'status': source.status, 'elapsed_s': round(source.elapsed, 2),
+                                      'jobs': source.jobs, 'descriptions': source.descriptions,
+                                      'batches': source.batches}
+                        for source in self.sources},
+        }
@@ -4,6 +4,10 @@ def setup_logging():
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def deduplicate_jobs(conn):
+    # Once the unique link_key index exists duplicates are rejected at write time,
+    # so there is nothing left to scan for.
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_jobs_link_key'").fetchone():
+        return
     with conn:
         conn.execute("""
             DELETE FROM jobs